@@ -0,0 +1,16 @@
+if __name__ == "__main__":
+	import argparse
+	import os
+	import sys
+	from importlib import util
+
+	sys.path.append(os.path.join(os.path.dirname(__file__), "NeonOcean.S4.Refer"))
+	Correction = util.find_spec("Mod_NeonOcean_S4_Refer.Benchmarking.Correction").loader.load_module()
+
+	argumentParser = argparse.ArgumentParser(description = "Benchmark correcting gendered text for sims with different pronoun selections, without running the game.")
+	argumentParser.add_argument("--calls", type = int, default = 2000, help = "The number of timed calls for each pronoun selection and tag pair count.")
+	argumentParser.add_argument("--allocation-calls", type = int, default = 100, help = "The number of calls traced for allocations for each pronoun selection and tag pair count.")
+	arguments = argumentParser.parse_args()
+
+	print("Latencies are in microseconds, blocks and peak bytes are allocations per call.")
+	print(Correction.FormatResults(Correction.RunBenchmark(callCount = arguments.calls, allocationCallCount = arguments.allocation_calls)))
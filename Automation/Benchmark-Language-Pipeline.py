@@ -0,0 +1,44 @@
+if __name__ == "__main__":
+	import argparse
+	import os
+	import sys
+	from importlib import util
+
+	sys.path.append(os.path.join(os.path.dirname(__file__), "NeonOcean.S4.Refer"))
+	Pipeline = util.find_spec("Mod_NeonOcean_S4_Refer.Benchmarking.Pipeline").loader.load_module()
+
+	argumentParser = argparse.ArgumentParser(description = "Benchmark the mod's language loading pipeline over synthetic localization packages, without running the game.")
+	argumentParser.add_argument("--profile", choices = sorted(Pipeline.Profiles.keys()), action = "append", help = "A package size profile to run, every profile is run if none are given.")
+	argumentParser.add_argument("--repeat", type = int, default = 5, help = "The number of times each stage is timed, the best time is reported.")
+	argumentParser.add_argument("--update-baselines", action = "store_true", help = "Save these results as the new baselines instead of comparing against the old ones.")
+	arguments = argumentParser.parse_args()
+
+	baselines = Pipeline.ReadBaselines()
+	regressions = list()
+	baselinesChanged = False
+
+	for profileName in arguments.profile if arguments.profile else sorted(Pipeline.Profiles.keys()):
+		results = Pipeline.RunBenchmark(profileName, repeatCount = arguments.repeat)
+
+		print("Profile: " + profileName)
+		print(Pipeline.FormatResults(results) + "\n")
+
+		if arguments.update_baselines:
+			baselines[profileName] = results
+			baselinesChanged = True
+			continue
+
+		profileBaselines = baselines.setdefault(profileName, dict())
+		regressions.extend(profileName + " " + regression for regression in Pipeline.GetRegressions(results, profileBaselines))
+
+		# Throughput baselines are only comparable between runs on the same machine, so the first run on each machine makes its own.
+		if Pipeline.AddMissingBaselines(profileBaselines, results):
+			baselinesChanged = True
+
+	if baselinesChanged:
+		Pipeline.WriteBaselines(baselines)
+		print("Baselines written to '" + Pipeline.BaselinesFilePath + "' and '" + Pipeline.LocalBaselinesFilePath + "'.")
+
+	if len(regressions) != 0:
+		print("Regressions:\n" + "\n".join(regressions), file = sys.stderr)
+		sys.exit(1)
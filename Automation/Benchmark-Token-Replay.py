@@ -0,0 +1,15 @@
+if __name__ == "__main__":
+	import argparse
+	import os
+	import sys
+	from importlib import util
+
+	sys.path.append(os.path.join(os.path.dirname(__file__), "NeonOcean.S4.Refer"))
+	Replay = util.find_spec("Mod_NeonOcean_S4_Refer.Benchmarking.Replay").loader.load_module()
+
+	argumentParser = argparse.ArgumentParser(description = "Replay gendered string traffic recorded in game through the mod's create tokens patch, without running the game.")
+	argumentParser.add_argument("corpus", help = "The path of a corpus file written by the mod's '.diagnostics.stop_token_recording' console command.")
+	argumentParser.add_argument("--repeat", type = int, default = 3, help = "The number of times to replay the whole corpus.")
+	arguments = argumentParser.parse_args()
+
+	print(Replay.FormatResults(Replay.RunReplay(Replay.ReadCorpus(arguments.corpus), repeatCount = arguments.repeat)))
@@ -0,0 +1,47 @@
+if __name__ == "__main__":
+	import argparse
+	import os
+	import sys
+	from importlib import util
+
+	sys.path.append(os.path.join(os.path.dirname(__file__), "NeonOcean.S4.Refer"))
+	Differential = util.find_spec("Mod_NeonOcean_S4_Refer.Benchmarking.Differential").loader.load_module()
+
+	argumentParser = argparse.ArgumentParser(description = "Correct every gendered string for every pronoun set and compare the results to a golden file, without running the game.")
+	argumentParser.add_argument("--cache", default = None, help = "A language cache location to read gendered strings from, such as one written by Prebuild-Language-Cache.py. Synthetic strings are used if this isn't given.")
+	argumentParser.add_argument("--golden", default = Differential.GoldenFilePath, help = "The golden file to compare to.")
+	argumentParser.add_argument("--update-golden", action = "store_true", help = "Write the results to the golden file instead of comparing them.")
+	argumentParser.add_argument("--show", type = int, default = 20, help = "The number of mismatched texts to show.")
+	arguments = argumentParser.parse_args()
+
+	source, genderedStrings = Differential.ReadGenderedStrings(arguments.cache)
+	outputs, timings = Differential.RunDifferential(genderedStrings)
+
+	print(Differential.FormatTimings(timings, len(genderedStrings)))
+
+	if arguments.update_golden:
+		Differential.WriteGolden(arguments.golden, source, outputs)
+		print("Wrote %s strings for %s variants to '%s'." % (len(genderedStrings), len(outputs), arguments.golden))
+		sys.exit(0)
+
+	golden = Differential.ReadGolden(arguments.golden)
+
+	if golden is None:
+		print("No golden file exists at '%s', run with '--update-golden' before making a change." % arguments.golden)
+		sys.exit(1)
+
+	if golden["Source"] != source:
+		print("The golden file was made from '%s', not '%s'." % (golden["Source"], source))
+		sys.exit(1)
+
+	mismatches = Differential.GetMismatches(outputs, golden)
+
+	if len(mismatches) != 0:
+		print("%s outputs differ from the golden file." % len(mismatches))
+
+		for variantName, textKeyString in mismatches[:arguments.show]:
+			print("%s %s: %r" % (variantName, textKeyString, Differential.CorrectText(genderedStrings, variantName, int(textKeyString))))
+
+		sys.exit(1)
+
+	print("Every output matches the golden file.")
@@ -0,0 +1,15 @@
+if __name__ == "__main__":
+	import os
+	import sys
+	from importlib import util
+
+	sys.path.append(os.path.join(os.path.dirname(__file__), "NeonOcean.S4.Refer"))
+	HeadlessCheck = util.find_spec("Mod_NeonOcean_S4_Refer.Tools.HeadlessCheck").loader.load_module()
+
+	failures = HeadlessCheck.RunChecks()
+
+	if len(failures) != 0:
+		print("\n".join(failures))
+		sys.exit(1)
+
+	print("The mod's language modules work outside of the game.")
@@ -0,0 +1,174 @@
+import time
+import tracemalloc
+import typing
+
+from Mod_NeonOcean_S4_Refer.Tools import Headless
+
+# Benchmarks correcting a single gendered localization string for a sim, across the different shapes a sim's pronoun selection can take and across
+# texts with different numbers of gender tag pairs. The standard library's statistics module is not used here, the stand-in for the game's statistics
+# package replaces it once headless mode is installed.
+
+TextKey = 3848466204  # type: int  # One of the keys the english they / them set has a case for, so sets with cases take their case path.
+
+TagPairCounts = (1, 2, 4, 8)  # type: typing.Tuple[int, ...]
+
+Percentiles = (50, 90, 99)  # type: typing.Tuple[int, ...]
+
+IntegerSetIdentifier = "Benchmark-Integers"  # type: str
+StringSetIdentifier = "Benchmark-Strings"  # type: str
+
+_tagPairs = [
+	("{F0.She}", "{M0.He}"),
+	("{F0.her}", "{M0.him}"),
+	("{F0.her}", "{M0.his}"),
+	("{F0.She's}", "{M0.He's}"),
+	("{F0.herself}", "{M0.himself}"),
+	("{F0.Ms.}", "{M0.Mr.}"),
+	("{F0.girlfriend}", "{M0.boyfriend}"),
+	("{F0.sister}", "{M0.brother}"),
+]  # type: typing.List[typing.Tuple[str, str]]
+
+_simID = 100  # type: int
+
+def CreateText (tagPairCount: int) -> str:
+	textParts = [ "{0.SimFirstName} went to the party." ]  # type: typing.List[str]
+
+	for tagPairIndex in range(tagPairCount):  # type: int
+		femaleTag, maleTag = _tagPairs[tagPairIndex % len(_tagPairs)]  # type: str, str
+		textParts.append("Then %s%s said hello." % (femaleTag, maleTag))
+
+	return " ".join(textParts)
+
+def GetSelections () -> typing.List[typing.Tuple[str, str]]:
+	"""
+	Get every pronoun selection to benchmark, as pairs of a readable name and the selection's value.
+	"""
+
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+
+	languageHandler = English.EnglishLanguageHandler
+
+	selections = [
+		("Default", ""),
+		("Female", "0"),
+		("Male", "1"),
+		("CustomIntegers", IntegerSetIdentifier),
+		("CustomStrings", StringSetIdentifier),
+	]  # type: typing.List[typing.Tuple[str, str]]
+
+	for standardSetIdentifier, standardSet in languageHandler.GetStandardPronounSets().items():  # type: str, dict
+		selections.append(("Standard " + standardSet["Title"], standardSetIdentifier))
+
+	return selections
+
+def RunBenchmark (callCount: int = 2000, allocationCallCount: int = 100) -> typing.List[typing.Dict[str, typing.Any]]:
+	"""
+	Time the correction of texts for a sim using every benchmarked pronoun selection.
+	:param callCount: The number of timed calls for each combination of selection and tag pair count.
+	:type callCount: int
+	:param allocationCallCount: The number of calls traced for allocations for each combination, tracing is slow so this should be smaller.
+	:type allocationCallCount: int
+	:return: A list of results, one for each combination of selection and tag pair count. Latencies are in microseconds.
+	"""
+
+	Headless.Install()
+	Headless.InstallSettingsPersistence()
+
+	from NeonOcean.S4.Refer import GenderedLanguage, PronounSettings, Settings
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+
+	languageHandler = English.EnglishLanguageHandler
+	editablePairIdentifiers = languageHandler.GetCustomPronounSetEditableGenderTagPairs()  # type: typing.List[str]
+
+	Settings.CustomPronounSets.Set({
+		IntegerSetIdentifier: {
+			"Title": "Integers",
+			"Set": { pairIdentifier: pairIndex % 2 for pairIndex, pairIdentifier in enumerate(editablePairIdentifiers) }
+		},
+		StringSetIdentifier: {
+			"Title": "Strings",
+			"Set": { pairIdentifier: "zir" for pairIdentifier in editablePairIdentifiers }
+		},
+	})
+
+	simInfo = Headless.HeadlessSimInfo(_simID, "Alex", "Doe", False)  # type: Headless.HeadlessSimInfo
+	tokens = (simInfo,)  # type: tuple
+
+	results = list()  # type: typing.List[typing.Dict[str, typing.Any]]
+
+	for selectionName, selectionValue in GetSelections():  # type: str, str
+		PronounSettings.PronounSetSelection.Set(str(_simID), selectionValue)
+
+		for tagPairCount in TagPairCounts:  # type: int
+			text = CreateText(tagPairCount)  # type: str
+
+			for warmUpIndex in range(10):  # type: int
+				GenderedLanguage.CorrectGenderedSTBLText(TextKey, text, tokens)
+
+			latencies = list()  # type: typing.List[int]
+
+			for callIndex in range(callCount):  # type: int
+				callStartTime = time.perf_counter_ns()  # type: int
+				GenderedLanguage.CorrectGenderedSTBLText(TextKey, text, tokens)
+				latencies.append(time.perf_counter_ns() - callStartTime)
+
+			latencies.sort()
+
+			result = {
+				"Selection": selectionName,
+				"TagPairs": tagPairCount,
+			}  # type: typing.Dict[str, typing.Any]
+
+			for percentile in Percentiles:  # type: int
+				result["P%s" % percentile] = round(_GetPercentile(latencies, percentile) / 1000, 1)
+
+			result["Max"] = round(latencies[-1] / 1000, 1)
+
+			result.update(_MeasureAllocations(lambda: GenderedLanguage.CorrectGenderedSTBLText(TextKey, text, tokens), allocationCallCount))
+
+			results.append(result)
+
+	PronounSettings.PronounSetSelection.Reset(str(_simID))
+	Settings.CustomPronounSets.Reset()
+
+	return results
+
+def FormatResults (results: typing.List[typing.Dict[str, typing.Any]]) -> str:
+	columnNames = [ "Selection", "TagPairs" ] + [ "P%s" % percentile for percentile in Percentiles ] + [ "Max", "Blocks", "PeakBytes" ]  # type: typing.List[str]
+	resultLines = [ "%-26s" % columnNames[0] + "".join("%10s" % columnName for columnName in columnNames[1:]) ]  # type: typing.List[str]
+
+	for result in results:  # type: typing.Dict[str, typing.Any]
+		resultLines.append("%-26s" % result[columnNames[0]] + "".join("%10s" % result[columnName] for columnName in columnNames[1:]))
+
+	return "\n".join(resultLines)
+
+def _GetPercentile (sortedValues: typing.List[int], percentile: int) -> int:
+	valueIndex = min(len(sortedValues) - 1, int(round(percentile / 100 * (len(sortedValues) - 1))))  # type: int
+	return sortedValues[valueIndex]
+
+def _MeasureAllocations (call: typing.Callable[[], typing.Any], callCount: int) -> typing.Dict[str, float]:
+	# Blocks are the memory blocks a call allocated that were still alive when it returned, including its result. Peak bytes are the most memory a call had
+	# allocated at once. Both are averaged over every traced call.
+
+	blockTotal = 0  # type: int
+	peakBytesTotal = 0  # type: int
+
+	tracemalloc.start()
+
+	try:
+		for callIndex in range(callCount):  # type: int
+			tracemalloc.clear_traces()
+			callResult = call()
+			peakBytesTotal += tracemalloc.get_traced_memory()[1]
+
+			callSnapshot = tracemalloc.take_snapshot()  # type: tracemalloc.Snapshot
+			blockTotal += sum(statistic.count for statistic in callSnapshot.statistics("filename"))
+
+			del callResult
+	finally:
+		tracemalloc.stop()
+
+	return {
+		"Blocks": round(blockTotal / callCount, 1),
+		"PeakBytes": round(peakBytesTotal / callCount),
+	}
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import time
+import typing
+
+from Mod_NeonOcean_S4_Refer import Paths
+from Mod_NeonOcean_S4_Refer.Benchmarking import Synthetic
+from Mod_NeonOcean_S4_Refer.Tools import Headless
+
+# Corrects every gendered string in a language cache, or in a synthetic table when no cache is given, for sims using every standard pronoun set and a
+# few custom sets, then compares the results to a golden file made before a change. Outputs are stored as short digests so golden files for a whole
+# game stay small, a mismatch lists the new text so it can be checked by hand. Strings whose correction raises an exception are recorded as the
+# exception's type, a rewrite should raise for the same strings the old engine did.
+
+GoldenFilePath = os.path.join(Paths.AutomationPath, "Correction-Golden.json")  # type: str
+
+GoldenVersion = 1  # type: int
+
+SyntheticStringCount = 20000  # type: int
+
+TokenCount = 10  # type: int  # Tokens alternate between a female and a male sim, both using the variant's pronoun set.
+
+_femaleSimID = 300  # type: int
+_maleSimID = 301  # type: int
+
+def ReadGenderedStrings (cacheRootPath: typing.Optional[str]) -> typing.Tuple[str, typing.Dict[int, str]]:
+	"""
+	Read every gendered string in a language cache location.
+	:param cacheRootPath: The directory the 'Gendered Language Cache' directory is in. Synthetic strings will be made instead if this is none.
+	:type cacheRootPath: typing.Optional[str]
+	:return: A description of where the strings came from and the strings.
+	"""
+
+	Headless.Install()
+
+	from NeonOcean.S4.Refer import GenderedLanguageHandler, LanguageCache
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+	from NeonOcean.S4.Refer.Tools import StringTable
+
+	if cacheRootPath is None:
+		localizationStrings = Synthetic.CreateLocalizationStrings(SyntheticStringCount, genderedRatio = 0.5)  # type: typing.Dict[int, str]
+		return "Synthetic:%s" % SyntheticStringCount, GenderedLanguageHandler.FilterAndFixLocalizationStrings(English.EnglishLanguageHandler, localizationStrings)
+
+	genderedCacheDirectoryPath = LanguageCache.LanguageCacheLocation(cacheRootPath).GenderedLanguageCacheDirectoryPath  # type: str
+
+	if not os.path.isdir(genderedCacheDirectoryPath):
+		raise Exception("No gendered language cache exists at '" + genderedCacheDirectoryPath + "'.")
+
+	genderedStrings = dict()  # type: typing.Dict[int, str]
+
+	for directoryRoot, directoryNames, fileNames in sorted(os.walk(genderedCacheDirectoryPath)):  # type: str, typing.List[str], typing.List[str]
+		for fileName in sorted(fileNames):  # type: str
+			if not fileName.endswith(".table"):
+				continue
+
+			genderedStrings.update(StringTable.CompactStringTable.Open(os.path.join(directoryRoot, fileName)).items())
+
+	return "Cache:%s" % os.path.abspath(cacheRootPath), genderedStrings
+
+def GetVariants () -> typing.List[typing.Tuple[str, str, typing.Optional[dict]]]:
+	"""
+	Get every pronoun selection the strings are corrected for, as the variant's name, the selection's value and, for custom variants, the custom set.
+	"""
+
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+
+	languageHandler = English.EnglishLanguageHandler
+	editablePairIdentifiers = languageHandler.GetCustomPronounSetEditableGenderTagPairs()  # type: typing.List[str]
+
+	variants = [
+		("Default", "", None),
+		("Female", "0", None),
+		("Male", "1", None),
+	]  # type: typing.List[typing.Tuple[str, str, typing.Optional[dict]]]
+
+	for standardSetIdentifier in sorted(languageHandler.GetStandardPronounSets().keys()):  # type: str
+		variants.append(("Standard:" + standardSetIdentifier, standardSetIdentifier, None))
+
+	variants.append(("Custom:Integers", "Differential-Integers", {
+		"Title": "Integers",
+		"Set": { pairIdentifier: pairIndex % 2 for pairIndex, pairIdentifier in enumerate(editablePairIdentifiers) }
+	}))
+
+	variants.append(("Custom:Strings", "Differential-Strings", {
+		"Title": "Strings",
+		"Set": { pairIdentifier: "zir" for pairIdentifier in editablePairIdentifiers }
+	}))
+
+	variants.append(("Custom:Sparse", "Differential-Sparse", {
+		"Title": "Sparse",
+		"Set": { pairIdentifier: "zir" for pairIndex, pairIdentifier in enumerate(editablePairIdentifiers) if pairIndex % 3 == 0 }
+	}))
+
+	return variants
+
+def RunDifferential (genderedStrings: typing.Dict[int, str]) -> typing.Tuple[typing.Dict[str, typing.Dict[str, typing.Optional[str]]], typing.Dict[str, float]]:
+	"""
+	Correct every string for every variant.
+	:return: The digest of every corrected text by variant then by string key, none where the string was left for the game to handle, and the time each
+	variant took in milliseconds.
+	"""
+
+	Headless.Install()
+	Headless.InstallSettingsPersistence()
+
+	from NeonOcean.S4.Refer import GenderedLanguage, PronounSettings, Settings
+
+	variants = GetVariants()  # type: typing.List[typing.Tuple[str, str, typing.Optional[dict]]]
+
+	Settings.CustomPronounSets.Set({ variantSelection: variantSet for variantName, variantSelection, variantSet in variants if variantSet is not None })
+
+	femaleSimInfo = Headless.HeadlessSimInfo(_femaleSimID, "Alex", "Doe", True)  # type: Headless.HeadlessSimInfo
+	maleSimInfo = Headless.HeadlessSimInfo(_maleSimID, "Sam", "Doe", False)  # type: Headless.HeadlessSimInfo
+	tokens = tuple(femaleSimInfo if tokenIndex % 2 == 0 else maleSimInfo for tokenIndex in range(TokenCount))  # type: tuple
+
+	sortedStrings = sorted(genderedStrings.items())  # type: typing.List[typing.Tuple[int, str]]
+
+	outputs = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Optional[str]]]
+	timings = dict()  # type: typing.Dict[str, float]
+
+	try:
+		for variantName, variantSelection, variantSet in variants:  # type: str, str, typing.Optional[dict]
+			PronounSettings.PronounSetSelection.Set(str(_femaleSimID), variantSelection)
+			PronounSettings.PronounSetSelection.Set(str(_maleSimID), variantSelection)
+
+			variantOutputs = dict()  # type: typing.Dict[str, typing.Optional[str]]
+			variantDuration = 0  # type: int
+
+			for textKey, text in sortedStrings:  # type: int, str
+				correctionStartTime = time.perf_counter_ns()  # type: int
+
+				try:
+					variantOutputs[str(textKey)] = GetDigest(GenderedLanguage.CorrectGenderedSTBLText(textKey, text, tokens))
+				except Exception as e:
+					variantOutputs[str(textKey)] = "!" + type(e).__name__
+
+				variantDuration += time.perf_counter_ns() - correctionStartTime
+
+			outputs[variantName] = variantOutputs
+			timings[variantName] = round(variantDuration / 1000000, 2)
+	finally:
+		PronounSettings.PronounSetSelection.Reset(str(_femaleSimID))
+		PronounSettings.PronounSetSelection.Reset(str(_maleSimID))
+		Settings.CustomPronounSets.Reset()
+
+	return outputs, timings
+
+def CorrectText (genderedStrings: typing.Dict[int, str], variantName: str, textKey: int) -> typing.Optional[str]:
+	"""
+	Correct a single string for one variant, used to show the new text of a mismatch.
+	"""
+
+	from NeonOcean.S4.Refer import GenderedLanguage, PronounSettings, Settings
+
+	variants = { variant[0]: variant for variant in GetVariants() }  # type: typing.Dict[str, typing.Tuple[str, str, typing.Optional[dict]]]
+	_, variantSelection, variantSet = variants[variantName]  # type: str, str, typing.Optional[dict]
+
+	if variantSet is not None:
+		Settings.CustomPronounSets.Set({ variantSelection: variantSet })
+
+	PronounSettings.PronounSetSelection.Set(str(_femaleSimID), variantSelection)
+	PronounSettings.PronounSetSelection.Set(str(_maleSimID), variantSelection)
+
+	try:
+		femaleSimInfo = Headless.HeadlessSimInfo(_femaleSimID, "Alex", "Doe", True)  # type: Headless.HeadlessSimInfo
+		maleSimInfo = Headless.HeadlessSimInfo(_maleSimID, "Sam", "Doe", False)  # type: Headless.HeadlessSimInfo
+		tokens = tuple(femaleSimInfo if tokenIndex % 2 == 0 else maleSimInfo for tokenIndex in range(TokenCount))  # type: tuple
+
+		return GenderedLanguage.CorrectGenderedSTBLText(textKey, genderedStrings[textKey], tokens)
+	except Exception as e:
+		return "!" + type(e).__name__
+	finally:
+		PronounSettings.PronounSetSelection.Reset(str(_femaleSimID))
+		PronounSettings.PronounSetSelection.Reset(str(_maleSimID))
+		Settings.CustomPronounSets.Reset()
+
+def GetDigest (text: typing.Optional[str]) -> typing.Optional[str]:
+	if text is None:
+		return None
+
+	return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def ReadGolden (goldenFilePath: str) -> typing.Optional[dict]:
+	if not os.path.exists(goldenFilePath):
+		return None
+
+	with open(goldenFilePath) as goldenFile:
+		golden = json.JSONDecoder().decode(goldenFile.read())  # type: dict
+
+	if golden.get("Version", None) != GoldenVersion:
+		raise Exception("Unsupported golden file version '%s', expected version '%s'." % (golden.get("Version", None), GoldenVersion))
+
+	return golden
+
+def WriteGolden (goldenFilePath: str, source: str, outputs: typing.Dict[str, typing.Dict[str, typing.Optional[str]]]) -> None:
+	with open(goldenFilePath, "w+", newline = "\n") as goldenFile:
+		goldenFile.write(json.JSONEncoder(indent = "\t", sort_keys = True).encode({
+			"Version": GoldenVersion,
+			"Source": source,
+			"Outputs": outputs,
+		}) + "\n")
+
+def GetMismatches (outputs: typing.Dict[str, typing.Dict[str, typing.Optional[str]]], golden: dict) -> typing.List[typing.Tuple[str, str]]:
+	"""
+	Compare outputs to a golden file's outputs.
+	:return: The variant name and string key of every output that differs from, or is missing in, the golden file.
+	"""
+
+	mismatches = list()  # type: typing.List[typing.Tuple[str, str]]
+	goldenOutputs = golden["Outputs"]  # type: typing.Dict[str, typing.Dict[str, typing.Optional[str]]]
+
+	for variantName, variantOutputs in outputs.items():  # type: str, typing.Dict[str, typing.Optional[str]]
+		goldenVariantOutputs = goldenOutputs.get(variantName, dict())  # type: typing.Dict[str, typing.Optional[str]]
+
+		for textKeyString, outputDigest in variantOutputs.items():  # type: str, typing.Optional[str]
+			if textKeyString not in goldenVariantOutputs or goldenVariantOutputs[textKeyString] != outputDigest:
+				mismatches.append((variantName, textKeyString))
+
+	return mismatches
+
+def FormatTimings (timings: typing.Dict[str, float], stringCount: int) -> str:
+	resultLines = [ "%-30s %12s %14s" % ("Variant", "Total ms", "Per string us") ]  # type: typing.List[str]
+
+	for variantName, variantMilliseconds in timings.items():  # type: str, float
+		resultLines.append("%-30s %12s %14s" % (variantName, variantMilliseconds, round(variantMilliseconds * 1000 / max(stringCount, 1), 2)))
+
+	return "\n".join(resultLines)
@@ -0,0 +1,281 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from Mod_NeonOcean_S4_Refer import Paths
+from Mod_NeonOcean_S4_Refer.Benchmarking import Synthetic
+from Mod_NeonOcean_S4_Refer.Tools import Headless
+
+# Benchmarks the language loading pipeline outside of the game: reading a package's index, reading and decompressing its entries, parsing the STBL
+# files, detecting gendered strings, filtering and fixing them with the english language handler and merging cached gendered string tables.
+
+BaselinesFilePath = os.path.join(Paths.AutomationPath, "Benchmark-Baselines.json")  # type: str
+LocalBaselinesFilePath = os.path.join(Paths.AutomationPath, "Benchmark-Baselines.Local.json")  # type: str
+
+# Entry counts, byte counts and peak memory come out the same on every machine for the same synthetic packages, so their baselines are kept in the
+# repository where changes to them show up in diffs. Throughput depends on the machine, its baselines are kept in a local file that isn't committed.
+CommittedResultNames = ("EntryCount", "ByteCount", "PeakMemoryMegabytes")  # type: typing.Tuple[str, ...]
+
+# Entry and string counts roughly match the game's own files, a pack's 'Strings_ENG_US.package' holds a couple of tables with a few thousand strings
+# each, the base game's holds several tables with tens of thousands of strings each. The python RefPack decoder is slow enough that the base game
+# profile only measures it over a couple of entries.
+Profiles = {
+	"Pack": {
+		"EntryCount": 2,
+		"StringCount": 6000,
+		"InternalCompressionEntryCount": 2,
+	},
+
+	"BaseGame": {
+		"EntryCount": 8,
+		"StringCount": 25000,
+		"InternalCompressionEntryCount": 2,
+	},
+}  # type: typing.Dict[str, typing.Dict[str, int]]
+
+RegressionTolerance = 0.25  # type: float
+
+_compressionTypeNames = {
+	Synthetic.UncompressedCompressionType: "Uncompressed",
+	Synthetic.ZLIBCompressionType: "ZLIB",
+	Synthetic.InternalCompressionType: "Internal",
+}  # type: typing.Dict[int, str]
+
+def RunBenchmark (profileName: str, repeatCount: int = 5) -> typing.Dict[str, typing.Dict[str, float]]:
+	"""
+	Run every stage of the pipeline over synthetic packages made to this profile.
+	:return: A dictionary of results for each stage, keyed by stage name. Each stage's results contain the number of entries and bytes it processed, its
+	throughput in megabytes and entries per second and the peak memory in megabytes python allocated while running the stage once. Timings are the best
+	of the repeat count.
+	"""
+
+	profile = Profiles[profileName]  # type: typing.Dict[str, int]
+
+	Headless.Install()
+
+	from NeonOcean.S4.Refer import GenderedLanguage, GenderedLanguageHandler
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+	from NeonOcean.S4.Refer.Tools import Package, STBL, StringTable
+
+	languageHandler = English.EnglishLanguageHandler
+
+	entryTables = list()  # type: typing.List[typing.Tuple[int, int, bytes]]
+
+	for entryIndex in range(profile["EntryCount"]):  # type: int
+		entryLocalizationStrings = Synthetic.CreateLocalizationStrings(profile["StringCount"], seed = entryIndex, firstKey = entryIndex + 1)  # type: typing.Dict[int, str]
+		entryTables.append((0, 0x0000000000001000 + entryIndex, Synthetic.CreateSTBLBytes(entryLocalizationStrings)))
+
+	stblBytesTotal = sum(len(entryTable[2]) for entryTable in entryTables)  # type: int
+	results = dict()  # type: typing.Dict[str, typing.Dict[str, float]]
+
+	with tempfile.TemporaryDirectory() as packageDirectoryPath:
+		packageFilePaths = dict()  # type: typing.Dict[int, str]
+
+		for compressionType in _compressionTypeNames.keys():  # type: int
+			if compressionType == Synthetic.InternalCompressionType:
+				packageEntryTables = entryTables[:profile["InternalCompressionEntryCount"]]  # type: typing.List[typing.Tuple[int, int, bytes]]
+			else:
+				packageEntryTables = entryTables  # type: typing.List[typing.Tuple[int, int, bytes]]
+
+			packageFilePath = os.path.join(packageDirectoryPath, "Strings_" + _compressionTypeNames[compressionType] + ".package")  # type: str
+
+			with open(packageFilePath, "wb") as packageFile:
+				packageFile.write(Synthetic.CreatePackageBytes(packageEntryTables, compressionType))
+
+			packageFilePaths[compressionType] = packageFilePath
+
+		zlibPackageFilePath = packageFilePaths[Synthetic.ZLIBCompressionType]  # type: str
+		indexByteCount = 4 + 32 * len(entryTables)  # type: int
+		results["Index"] = _MeasureStage(lambda: Package.GetPackageLocalizationStrings(zlibPackageFilePath), indexByteCount, len(entryTables), repeatCount)
+
+		for compressionType, packageFilePath in packageFilePaths.items():  # type: int, str
+			packageEntries = Package.GetPackageLocalizationStrings(packageFilePath)  # type: typing.List[Package.PackageEntry]
+
+			if compressionType == Synthetic.InternalCompressionType:
+				stageRepeatCount = 1  # type: int
+			else:
+				stageRepeatCount = repeatCount  # type: int
+
+			results["Read" + _compressionTypeNames[compressionType]] = _MeasureStage(
+				lambda: [ packageEntry.Read() for packageEntry in packageEntries ],
+				sum(packageEntry.FileSizeDecompressed for packageEntry in packageEntries),
+				len(packageEntries),
+				stageRepeatCount
+			)
+
+		results["Parse"] = _MeasureStage(lambda: [ STBL.ParseSTBLFileBytes(entryTable[2]) for entryTable in entryTables ], stblBytesTotal, len(entryTables), repeatCount)
+
+		parsedEntries = [ STBL.ParseSTBLFileBytes(entryTable[2]) for entryTable in entryTables ]  # type: typing.List[typing.Dict[int, str]]
+
+		def detectGendered () -> None:
+			for parsedEntry in parsedEntries:  # type: typing.Dict[int, str]
+				for text in parsedEntry.values():  # type: str
+					GenderedLanguage.TextIsGendered(text)
+
+		results["Detect"] = _MeasureStage(detectGendered, stblBytesTotal, len(entryTables), repeatCount)
+
+		results["Filter"] = _MeasureStage(
+			lambda: [ GenderedLanguageHandler.FilterAndFixLocalizationStrings(languageHandler, parsedEntry) for parsedEntry in parsedEntries ],
+			stblBytesTotal,
+			len(entryTables),
+			repeatCount
+		)
+
+		# Loading from the language cache maps each entry's gendered table file and merges the tables without decoding their strings.
+		tableFilePaths = list()  # type: typing.List[str]
+
+		for entryIndex, parsedEntry in enumerate(parsedEntries):  # type: int, typing.Dict[int, str]
+			tableFilePath = os.path.join(packageDirectoryPath, "Gendered_%s.table" % entryIndex)  # type: str
+
+			with open(tableFilePath, "wb") as tableFile:
+				tableFile.write(StringTable.CompactStringTable.FromDictionary(GenderedLanguageHandler.FilterAndFixLocalizationStrings(languageHandler, parsedEntry)).ToBytes())
+
+			tableFilePaths.append(tableFilePath)
+
+		def mergeCachedTables () -> None:
+			cachedTables = [ StringTable.CompactStringTable.Open(tableFilePath, useMemoryMap = True) for tableFilePath in tableFilePaths ]  # type: typing.List[StringTable.CompactStringTable]
+
+			try:
+				StringTable.CompactStringTable.Merge(cachedTables)
+			finally:
+				for cachedTable in cachedTables:  # type: StringTable.CompactStringTable
+					cachedTable.Close()
+
+		results["CacheMerge"] = _MeasureStage(mergeCachedTables, sum(os.path.getsize(tableFilePath) for tableFilePath in tableFilePaths), len(tableFilePaths), repeatCount)
+
+	return results
+
+def ReadBaselines () -> typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]:
+	"""
+	Read the committed baselines and this machine's local baselines, combined into one set of results for each profile.
+	"""
+
+	baselines = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]
+
+	for baselinesFilePath in (BaselinesFilePath, LocalBaselinesFilePath):  # type: str
+		for profileName, profileBaselines in _ReadBaselinesFile(baselinesFilePath).items():  # type: str, typing.Dict[str, typing.Dict[str, float]]
+			for stageName, stageBaselines in profileBaselines.items():  # type: str, typing.Dict[str, float]
+				baselines.setdefault(profileName, dict()).setdefault(stageName, dict()).update(stageBaselines)
+
+	return baselines
+
+def WriteBaselines (baselines: typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]) -> None:
+	"""
+	Write these baselines, the results named in the committed result names go to the committed baselines file and the rest go to the local one.
+	"""
+
+	committedBaselines = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]
+	localBaselines = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]
+
+	for profileName, profileBaselines in baselines.items():  # type: str, typing.Dict[str, typing.Dict[str, float]]
+		for stageName, stageBaselines in profileBaselines.items():  # type: str, typing.Dict[str, float]
+			for resultName, resultValue in stageBaselines.items():  # type: str, float
+				splitBaselines = committedBaselines if resultName in CommittedResultNames else localBaselines  # type: typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]
+				splitBaselines.setdefault(profileName, dict()).setdefault(stageName, dict())[resultName] = resultValue
+
+	_WriteBaselinesFile(BaselinesFilePath, committedBaselines)
+	_WriteBaselinesFile(LocalBaselinesFilePath, localBaselines)
+
+def AddMissingBaselines (profileBaselines: typing.Dict[str, typing.Dict[str, float]], results: typing.Dict[str, typing.Dict[str, float]]) -> bool:
+	"""
+	Fill in any result these baselines don't have yet from these results, such as the throughput baselines on a machine's first run.
+	:return: True if any baseline was added.
+	:rtype: bool
+	"""
+
+	baselinesAdded = False  # type: bool
+
+	for stageName, stageResults in results.items():  # type: str, typing.Dict[str, float]
+		stageBaselines = profileBaselines.setdefault(stageName, dict())  # type: typing.Dict[str, float]
+
+		for resultName, resultValue in stageResults.items():  # type: str, float
+			if resultName not in stageBaselines:
+				stageBaselines[resultName] = resultValue
+				baselinesAdded = True
+
+	return baselinesAdded
+
+def GetRegressions (results: typing.Dict[str, typing.Dict[str, float]], baselineResults: typing.Dict[str, typing.Dict[str, float]]) -> typing.List[str]:
+	"""
+	Compare these results to a profile's baseline results.
+	:return: A description of every stage whose entry or byte count changed, or whose throughput dropped or peak memory rose by more than the regression
+	tolerance.
+	"""
+
+	regressions = list()  # type: typing.List[str]
+
+	for stageName, stageResults in results.items():  # type: str, typing.Dict[str, float]
+		stageBaselineResults = baselineResults.get(stageName, None)  # type: typing.Optional[typing.Dict[str, float]]
+
+		if stageBaselineResults is None:
+			continue
+
+		for countName in ("EntryCount", "ByteCount"):  # type: str
+			if countName in stageBaselineResults and stageResults[countName] != stageBaselineResults[countName]:
+				regressions.append("%s: %s changed from %s to %s." % (stageName, countName, stageBaselineResults[countName], stageResults[countName]))
+
+		if "MegabytesPerSecond" in stageBaselineResults:
+			baselineThroughput = stageBaselineResults["MegabytesPerSecond"]  # type: float
+
+			if stageResults["MegabytesPerSecond"] < baselineThroughput * (1 - RegressionTolerance):
+				regressions.append("%s: throughput fell from %s to %s MB/s." % (stageName, baselineThroughput, stageResults["MegabytesPerSecond"]))
+
+		if "PeakMemoryMegabytes" in stageBaselineResults:
+			baselinePeakMemory = stageBaselineResults["PeakMemoryMegabytes"]  # type: float
+
+			if stageResults["PeakMemoryMegabytes"] > baselinePeakMemory * (1 + RegressionTolerance) and stageResults["PeakMemoryMegabytes"] - baselinePeakMemory > 1:
+				regressions.append("%s: peak memory rose from %s to %s MB." % (stageName, baselinePeakMemory, stageResults["PeakMemoryMegabytes"]))
+
+	return regressions
+
+def FormatResults (results: typing.Dict[str, typing.Dict[str, float]]) -> str:
+	resultLines = [ "%-22s %12s %12s %14s" % ("Stage", "MB/s", "Entries/s", "Peak memory MB") ]  # type: typing.List[str]
+
+	for stageName, stageResults in results.items():  # type: str, typing.Dict[str, float]
+		resultLines.append("%-22s %12s %12s %14s" % (stageName, stageResults["MegabytesPerSecond"], stageResults["EntriesPerSecond"], stageResults["PeakMemoryMegabytes"]))
+
+	return "\n".join(resultLines)
+
+def _MeasureStage (stage: typing.Callable[[], typing.Any], byteCount: int, entryCount: int, repeatCount: int) -> typing.Dict[str, float]:
+	bestDuration = None  # type: typing.Optional[float]
+
+	for repeatIndex in range(repeatCount):  # type: int
+		startTime = time.perf_counter()  # type: float
+		stage()
+		duration = time.perf_counter() - startTime  # type: float
+
+		if bestDuration is None or duration < bestDuration:
+			bestDuration = duration
+
+	bestDuration = max(bestDuration, 1e-9)
+
+	# Memory is measured on a separate run, tracing allocations slows python down too much to time anything while it is on.
+	tracemalloc.start()
+
+	try:
+		stage()
+		peakMemory = tracemalloc.get_traced_memory()[1]  # type: int
+	finally:
+		tracemalloc.stop()
+
+	return {
+		"EntryCount": entryCount,
+		"ByteCount": byteCount,
+		"MegabytesPerSecond": round(byteCount / bestDuration / 1000000, 2),
+		"EntriesPerSecond": round(entryCount / bestDuration, 2),
+		"PeakMemoryMegabytes": round(peakMemory / 1000000, 2),
+	}
+
+def _ReadBaselinesFile (baselinesFilePath: str) -> typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]:
+	if not os.path.exists(baselinesFilePath):
+		return dict()
+
+	with open(baselinesFilePath) as baselinesFile:
+		return json.JSONDecoder().decode(baselinesFile.read())
+
+def _WriteBaselinesFile (baselinesFilePath: str, baselines: typing.Dict[str, typing.Dict[str, typing.Dict[str, float]]]) -> None:
+	with open(baselinesFilePath, "w+", newline = "\n") as baselinesFile:
+		baselinesFile.write(json.JSONEncoder(indent = "\t", sort_keys = True).encode(baselines) + "\n")
@@ -0,0 +1,185 @@
+import json
+import time
+import typing
+
+from Mod_NeonOcean_S4_Refer.Tools import Headless
+
+# Replays a corpus of gendered string traffic recorded in game with the mod's '.diagnostics.start_token_recording' console command through the create
+# tokens patch. Every recorded layout is rebuilt from stand-in tokens and called as many times as it was called in game, so results reflect the mix of
+# strings and pronoun selections real play produced.
+
+SupportedCorpusVersion = 1  # type: int
+
+CustomSetIdentifier = "Replay-Custom"  # type: str
+
+_firstSimID = 1000  # type: int
+
+def ReadCorpus (corpusFilePath: str) -> dict:
+	with open(corpusFilePath) as corpusFile:
+		corpus = json.JSONDecoder().decode(corpusFile.read())  # type: dict
+
+	if corpus.get("Version", None) != SupportedCorpusVersion:
+		raise Exception("Unsupported corpus version '%s', expected version '%s'." % (corpus.get("Version", None), SupportedCorpusVersion))
+
+	return corpus
+
+def RunReplay (corpus: dict, repeatCount: int = 3) -> typing.Dict[str, typing.Any]:
+	"""
+	Replay a corpus through the create tokens patch.
+	:param corpus: A corpus read from a file recorded in game.
+	:type corpus: dict
+	:param repeatCount: The number of times to replay the whole corpus. Per call latencies are taken from every pass, the total time is the best pass.
+	:type repeatCount: int
+	:return: The number of calls per pass, the best pass' total time in milliseconds, latency percentiles in microseconds, and the text keys that took the
+	most time in total.
+	"""
+
+	Headless.Install()
+	Headless.InstallSettingsPersistence()
+
+	from NeonOcean.S4.Refer import GenderedLanguageHandler, PronounSettings, Settings
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+
+	languageHandler = English.EnglishLanguageHandler
+
+	Headless.LoadLocalizationStrings({ int(textKey): text for textKey, text in corpus["Texts"].items() })
+
+	Settings.CustomPronounSets.Set({
+		CustomSetIdentifier: {
+			"Title": "Replay",
+			"Set": { pairIdentifier: "zir" for pairIdentifier in languageHandler.GetCustomPronounSetEditableGenderTagPairs() }
+		}
+	})
+
+	tokenSimInfos = dict()  # type: typing.Dict[str, Headless.HeadlessSimInfo]
+	replayCalls = list()  # type: typing.List[typing.Tuple[int, tuple, int]]
+
+	for textKey, tokenDescriptions, layoutCount in corpus["Records"]:  # type: int, typing.List[str], int
+		tokens = tuple(_CreateToken(tokenDescription, tokenSimInfos) for tokenDescription in tokenDescriptions)  # type: tuple
+		replayCalls.append((textKey, tokens, layoutCount))
+
+	latencies = list()  # type: typing.List[int]
+	keyDurations = dict()  # type: typing.Dict[int, int]
+	bestPassDuration = None  # type: typing.Optional[int]
+
+	try:
+		for passIndex in range(repeatCount):  # type: int
+			passDuration = 0  # type: int
+
+			for textKey, tokens, layoutCount in replayCalls:  # type: int, tuple, int
+				for callIndex in range(layoutCount):  # type: int
+					localizationString = Headless.LocalizedString(hash = textKey)  # type: Headless.LocalizedString
+					tokensMessage = Headless.HeadlessTokensMessage(localizationString)  # type: Headless.HeadlessTokensMessage
+
+					callStartTime = time.perf_counter_ns()  # type: int
+					# noinspection PyProtectedMember
+					GenderedLanguageHandler._CreateTokensPatch(_IgnoreCreateTokens, tokensMessage, *tokens)
+					callDuration = time.perf_counter_ns() - callStartTime  # type: int
+
+					latencies.append(callDuration)
+					keyDurations[textKey] = keyDurations.get(textKey, 0) + callDuration
+					passDuration += callDuration
+
+				# The stand-in timers never fire, so the true values the patch stores have to be cleaned out here.
+				# noinspection PyProtectedMember
+				GenderedLanguageHandler._trueLocalizationStringValues.clear()
+				# noinspection PyProtectedMember
+				GenderedLanguageHandler._trueLocalizationStringValueDeletionTimers.clear()
+
+			if bestPassDuration is None or passDuration < bestPassDuration:
+				bestPassDuration = passDuration
+	finally:
+		for simInfo in tokenSimInfos.values():  # type: Headless.HeadlessSimInfo
+			PronounSettings.PronounSetSelection.Reset(str(simInfo.sim_id))
+			PronounSettings.PronounFallback.Reset(str(simInfo.sim_id))
+			Headless.GetSimInfoManager().RemoveSimInfo(simInfo.sim_id)
+
+		Settings.CustomPronounSets.Reset()
+
+	latencies.sort()
+
+	if len(latencies) == 0:
+		raise Exception("The corpus contains no calls.")
+
+	return {
+		"Calls": len(latencies) // repeatCount,
+		"Layouts": len(replayCalls),
+		"TotalMilliseconds": round(bestPassDuration / 1000000, 2),
+		"P50": round(_GetPercentile(latencies, 50) / 1000, 1),
+		"P90": round(_GetPercentile(latencies, 90) / 1000, 1),
+		"P99": round(_GetPercentile(latencies, 99) / 1000, 1),
+		"Max": round(latencies[-1] / 1000, 1),
+		"SlowestKeys": [
+			(textKey, round(keyDuration / repeatCount / 1000000, 3))
+			for textKey, keyDuration in sorted(keyDurations.items(), key = lambda keyItem: -keyItem[1])[:10]
+		],
+	}
+
+def FormatResults (results: typing.Dict[str, typing.Any]) -> str:
+	resultLines = [
+		"Calls per pass: %s, distinct layouts: %s" % (results["Calls"], results["Layouts"]),
+		"Best pass: %s ms" % results["TotalMilliseconds"],
+		"Latency us: P50 %s, P90 %s, P99 %s, Max %s" % (results["P50"], results["P90"], results["P99"], results["Max"]),
+		"Keys with the most total time per pass:",
+	]  # type: typing.List[str]
+
+	for textKey, keyMilliseconds in results["SlowestKeys"]:  # type: int, float
+		resultLines.append("  %-12s %10s ms" % (textKey, keyMilliseconds))
+
+	return "\n".join(resultLines)
+
+def _CreateToken (tokenDescription: str, tokenSimInfos: typing.Dict[str, Headless.HeadlessSimInfo]) -> typing.Any:
+	if tokenDescription.startswith("Sim|"):
+		simInfo = tokenSimInfos.get(tokenDescription, None)  # type: typing.Optional[Headless.HeadlessSimInfo]
+
+		if simInfo is None:
+			simInfo = _CreateSimInfo(tokenDescription, _firstSimID + len(tokenSimInfos))
+			tokenSimInfos[tokenDescription] = simInfo
+
+		return simInfo
+
+	if tokenDescription == "Integer":
+		return 1
+
+	if tokenDescription == "Number":
+		return 1.5
+
+	if tokenDescription == "String":
+		return "Text"
+
+	if tokenDescription == "LocalizedString":
+		return Headless.LocalizedString()
+
+	return object()
+
+def _CreateSimInfo (tokenDescription: str, simID: int) -> Headless.HeadlessSimInfo:
+	from NeonOcean.S4.Refer import PronounSettings
+
+	_, gender, selectionDescription, fallback = tokenDescription.split("|")  # type: str, str, str, str
+
+	if selectionDescription == "Default":
+		selection = ""  # type: str
+	elif selectionDescription == "Female":
+		selection = "0"  # type: str
+	elif selectionDescription == "Male":
+		selection = "1"  # type: str
+	elif selectionDescription.startswith("Standard:"):
+		selection = selectionDescription[len("Standard:"):]  # type: str
+	else:
+		selection = CustomSetIdentifier  # type: str
+
+	simInfo = Headless.HeadlessSimInfo(simID, "Sim", str(simID), gender == "F")  # type: Headless.HeadlessSimInfo
+	Headless.GetSimInfoManager().AddSimInfo(simInfo)
+
+	PronounSettings.PronounSetSelection.Set(str(simID), selection)
+	PronounSettings.PronounFallback.Set(str(simID), fallback)
+
+	return simInfo
+
+def _GetPercentile (sortedValues: typing.List[int], percentile: int) -> int:
+	valueIndex = min(len(sortedValues) - 1, int(round(percentile / 100 * (len(sortedValues) - 1))))  # type: int
+	return sortedValues[valueIndex]
+
+# noinspection PyUnusedLocal
+def _IgnoreCreateTokens (tokensMessage, *tokens) -> None:
+	pass
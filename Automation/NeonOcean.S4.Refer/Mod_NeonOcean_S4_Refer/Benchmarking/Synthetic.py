@@ -0,0 +1,186 @@
+import random
+import typing
+import zlib
+
+# Builds synthetic localization packages shaped like the game's 'Strings_*.package' files. The package layout matches what the mod's package reader
+# expects: a DBPF 2.1 header, the entry bytes, then an index with a four byte flags field followed by 32 byte records.
+
+STBLTypeID = 570775514  # type: int
+
+UncompressedCompressionType = 0x0000  # type: int
+ZLIBCompressionType = 0x5A42  # type: int
+InternalCompressionType = 0xFFFF  # type: int
+
+_packageHeaderLength = 96  # type: int
+
+_words = [
+	"the", "a", "sim", "house", "friend", "party", "garden", "career", "skill", "mood", "happy", "tense", "flirty", "cook", "dinner", "paint", "read",
+	"book", "phone", "call", "visit", "neighbor", "family", "child", "teen", "adult", "elder", "work", "school", "money", "bills", "relationship",
+	"romance", "mischief", "great", "terrible", "wants", "needs", "fun", "social", "hunger", "energy", "hygiene", "bladder", "today", "tomorrow"
+]  # type: typing.List[str]
+
+_genderedTagPairs = [
+	("he", "she"),
+	("his", "her"),
+	("him", "her"),
+	("himself", "herself"),
+	("He", "She"),
+	("His", "Her"),
+	("boy", "girl"),
+	("Mr.", "Ms."),
+]  # type: typing.List[typing.Tuple[str, str]]
+
+def CreateLocalizationStrings (stringCount: int, genderedRatio: float = 0.08, seed: int = 0, firstKey: int = 1) -> typing.Dict[int, str]:
+	"""
+	Create localization strings made of random words and the kinds of tokens the game uses. About the gendered ratio of the strings will contain gender
+	tag pairs.
+	"""
+
+	generator = random.Random(seed)  # type: random.Random
+	localizationStrings = dict()  # type: typing.Dict[int, str]
+
+	for stringIndex in range(stringCount):  # type: int
+		stringWords = generator.choices(_words, k = generator.randint(3, 40))  # type: typing.List[str]
+
+		if generator.random() < 0.3:
+			stringWords.insert(generator.randrange(len(stringWords)), "{0.SimFirstName}")
+
+		if generator.random() < genderedRatio:
+			for tagPairIndex in range(generator.randint(1, 4)):  # type: int
+				maleTag, femaleTag = generator.choice(_genderedTagPairs)  # type: str, str
+				tokenIndex = generator.randint(0, 1)  # type: int
+				stringWords.insert(generator.randrange(len(stringWords)), "{M%s.%s}{F%s.%s}" % (tokenIndex, maleTag, tokenIndex, femaleTag))
+
+		localizationStrings[firstKey + stringIndex * 7919] = " ".join(stringWords) + "."
+
+	return localizationStrings
+
+def CreateSTBLBytes (localizationStrings: typing.Dict[int, str]) -> bytes:
+	encodedEntries = list()  # type: typing.List[bytes]
+	stringLengthTotal = 0  # type: int
+
+	for key, text in localizationStrings.items():  # type: int, str
+		encodedText = text.encode("utf-8")  # type: bytes
+		encodedEntries.append(key.to_bytes(4, "little") + b"\x00" + len(encodedText).to_bytes(2, "little") + encodedText)
+		stringLengthTotal += len(encodedText) + 1
+
+	header = b"STBL" + (5).to_bytes(2, "little") + b"\x00" + len(localizationStrings).to_bytes(8, "little") + b"\x00\x00" + stringLengthTotal.to_bytes(4, "little")  # type: bytes
+	return header + b"".join(encodedEntries)
+
+def CompressInternal (fileBytes: bytes) -> bytes:
+	"""
+	Compress these bytes with the package format's internal compression (RefPack), using a simple greedy matcher. The output always ends with a stop
+	control, the mod's decompressor only applies a copy once it reads the byte after it.
+	"""
+
+	compressedBytes = bytearray()  # type: bytearray
+
+	if len(fileBytes) > 0xFFFFFF:
+		compressedBytes += b"\x80\xFB" + len(fileBytes).to_bytes(4, "big")
+	else:
+		compressedBytes += b"\x10\xFB" + len(fileBytes).to_bytes(3, "big")
+
+	lastPositions = dict()  # type: typing.Dict[bytes, int]
+	literalStart = 0  # type: int
+	position = 0  # type: int
+
+	def writeLiterals (literalEnd: int) -> None:
+		# Writes all but the last zero to three pending literals with type 3 controls, the rest ride along with the next control.
+		nonlocal literalStart
+
+		while literalEnd - literalStart >= 4:
+			literalRunLength = min(112, (literalEnd - literalStart) & ~3)  # type: int
+			compressedBytes.append(0xE0 + (literalRunLength - 4) // 4)
+			compressedBytes.extend(fileBytes[literalStart: literalStart + literalRunLength])
+			literalStart += literalRunLength
+
+	while position + 4 <= len(fileBytes):
+		sequence = fileBytes[position: position + 4]  # type: bytes
+		matchPosition = lastPositions.get(sequence, None)  # type: typing.Optional[int]
+		lastPositions[sequence] = position
+
+		matchOffset = position - matchPosition if matchPosition is not None else 0  # type: int
+
+		if matchPosition is None or matchOffset > 131072:
+			position += 1
+			continue
+
+		matchLength = 4  # type: int
+
+		while position + matchLength < len(fileBytes) and matchLength < 1028 and fileBytes[matchPosition + matchLength] == fileBytes[position + matchLength]:
+			matchLength += 1
+
+		if matchOffset > 16384 and matchLength < 5:
+			position += 1
+			continue
+
+		writeLiterals(position)
+		literalCount = position - literalStart  # type: int
+		encodedOffset = matchOffset - 1  # type: int
+
+		if matchLength <= 10 and matchOffset <= 1024:
+			compressedBytes.append(((encodedOffset >> 3) & 0x60) | ((matchLength - 3) << 2) | literalCount)
+			compressedBytes.append(encodedOffset & 0xFF)
+		elif matchLength <= 67 and matchOffset <= 16384:
+			compressedBytes.append(0x80 | (matchLength - 4))
+			compressedBytes.append((literalCount << 6) | (encodedOffset >> 8))
+			compressedBytes.append(encodedOffset & 0xFF)
+		else:
+			compressedBytes.append(0xC0 | ((encodedOffset >> 16) << 4) | (((matchLength - 5) >> 8) << 2) | literalCount)
+			compressedBytes.append((encodedOffset >> 8) & 0xFF)
+			compressedBytes.append(encodedOffset & 0xFF)
+			compressedBytes.append((matchLength - 5) & 0xFF)
+
+		compressedBytes.extend(fileBytes[literalStart: position])
+
+		position += matchLength
+		literalStart = position
+
+	writeLiterals(len(fileBytes))
+	compressedBytes.append(0xFC + (len(fileBytes) - literalStart))
+	compressedBytes.extend(fileBytes[literalStart:])
+
+	return bytes(compressedBytes)
+
+def CreatePackageBytes (entries: typing.List[typing.Tuple[int, int, bytes]], compressionType: int) -> bytes:
+	"""
+	Create a package file containing these entries.
+	:param entries: A list of entries made up of the group id, the instance id and the entry's uncompressed bytes. Every entry is an STBL resource.
+	:param compressionType: The compression type to store every entry with.
+	"""
+
+	entryData = bytearray()  # type: bytearray
+	indexRecords = bytearray()  # type: bytearray
+
+	for groupID, instanceID, fileBytes in entries:  # type: int, int, bytes
+		if compressionType == ZLIBCompressionType:
+			storedBytes = zlib.compress(fileBytes)  # type: bytes
+		elif compressionType == InternalCompressionType:
+			storedBytes = CompressInternal(fileBytes)  # type: bytes
+		else:
+			storedBytes = fileBytes  # type: bytes
+
+		indexRecords += STBLTypeID.to_bytes(4, "little")
+		indexRecords += groupID.to_bytes(4, "little")
+		indexRecords += (instanceID >> 32).to_bytes(4, "little")
+		indexRecords += (instanceID & 0xFFFFFFFF).to_bytes(4, "little")
+		indexRecords += (_packageHeaderLength + len(entryData)).to_bytes(4, "little")
+		indexRecords += (len(storedBytes) | 0x80000000).to_bytes(4, "little")
+		indexRecords += len(fileBytes).to_bytes(4, "little")
+		indexRecords += compressionType.to_bytes(2, "little")
+		indexRecords += (1).to_bytes(2, "little")
+
+		entryData += storedBytes
+
+	indexPosition = _packageHeaderLength + len(entryData)  # type: int
+
+	header = bytearray(_packageHeaderLength)  # type: bytearray
+	header[0:4] = b"DBPF"
+	header[4:8] = (2).to_bytes(4, "little")
+	header[8:12] = (1).to_bytes(4, "little")
+	header[36:40] = len(entries).to_bytes(4, "little")
+	header[40:44] = indexPosition.to_bytes(4, "little")
+	header[44:48] = (len(indexRecords) + 4).to_bytes(4, "little")
+	header[64:72] = indexPosition.to_bytes(8, "little")
+
+	return bytes(header) + bytes(entryData) + b"\x00\x00\x00\x00" + bytes(indexRecords)
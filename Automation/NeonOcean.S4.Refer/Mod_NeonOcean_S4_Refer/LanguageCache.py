@@ -0,0 +1,127 @@
+import importlib
+import os
+import pkgutil
+import sys
+import time
+import typing
+from concurrent import futures
+
+from Mod_NeonOcean_S4_Refer.Tools import Exceptions, Headless
+
+def PrebuildLanguageCache (gameInstallPath: str, locale: str, outputPath: str, localLayout: bool = False, workerCount: typing.Optional[int] = None) -> bool:
+	"""
+	Read, filter and fix every localization string table of a game install outside of the game, and write the results as language cache files the mod
+	can load on its first launch.
+	:param gameInstallPath: The game's install directory. This is the 'The Sims 4' folder on Windows or the 'The Sims 4.app' bundle on Mac.
+	:type gameInstallPath: str
+	:param locale: The game locale to build caches for, for example "en-us". This decides which language handler is used.
+	:type locale: str
+	:param outputPath: The directory to write the caches to. Unless local layout is true, this should be the directory the 'Shared_Language_Cache_Path'
+	setting points to.
+	:type outputPath: str
+	:param localLayout: If true, the caches will be written directly to the output directory, as the mod would in its persistent data folder, instead of
+	in the shared cache layout.
+	:type localLayout: bool
+	:param workerCount: The number of processes to read packages with. Leave this as none to use one per processor.
+	:type workerCount: typing.Optional[int]
+	"""
+
+	if not os.path.isdir(gameInstallPath):
+		print("Cannot find a game install at '" + gameInstallPath + "'.", file = sys.stderr)
+		return False
+
+	buildStartTime = time.time()  # type: float
+
+	_Setup(gameInstallPath, locale)
+
+	from NeonOcean.S4.Refer import LanguageCache as ReferLanguageCache
+	from NeonOcean.S4.Refer.Tools import Package
+	from sims4 import common as Sims4Common
+
+	languageHandler = _GetLanguageHandler()
+
+	if languageHandler is None:
+		print("No language handler exists for the locale '" + locale + "'.", file = sys.stderr)
+		return False
+
+	if localLayout:
+		cacheRootPath = outputPath  # type: str
+	else:
+		basePackageFilePaths = languageHandler.GetPackLocalizationPackageFilePaths(Sims4Common.Pack.BASE_GAME)  # type: typing.List[str]
+
+		if len(basePackageFilePaths) == 0:
+			print("Cannot find the base game's localization package in the game install at '" + gameInstallPath + "'.", file = sys.stderr)
+			return False
+
+		gameBuildKey = ReferLanguageCache.GetGameBuildKey(basePackageFilePaths)  # type: str
+		cacheRootPath = ReferLanguageCache.GetSharedLanguageCacheRootPath(outputPath, gameBuildKey, languageHandler.HandlingLanguage.name, languageHandler.GetHandlerVersion())  # type: str
+
+	packageEntries = list()  # type: typing.List[typing.Tuple[str, typing.Any]]
+
+	for pack in Sims4Common.Pack:
+		for packageFilePath in languageHandler.GetPackLocalizationPackageFilePaths(pack):  # type: str
+			for packageEntry in Package.GetPackageLocalizationStrings(packageFilePath):
+				if languageHandler.IsHandlingLanguageSTBLFile(("%016x" % packageEntry.InstanceID).upper()):
+					packageEntries.append((pack.name, packageEntry))
+
+	print("Building language caches for " + str(len(packageEntries)) + " string tables to '" + cacheRootPath + "'.")
+
+	failedEntryCount = 0  # type: int
+	localizationStringCount = 0  # type: int
+	genderedLocalizationStringCount = 0  # type: int
+
+	with futures.ProcessPoolExecutor(max_workers = workerCount, initializer = _Setup, initargs = (gameInstallPath, locale)) as executor:
+		entryFutures = dict()  # type: typing.Dict[futures.Future, typing.Tuple[str, typing.Any]]
+
+		for packName, packageEntry in packageEntries:  # type: str, typing.Any
+			entryFutures[executor.submit(_BuildEntryCache, packName, packageEntry, cacheRootPath)] = (packName, packageEntry)
+
+		for entryFuture in futures.as_completed(entryFutures):  # type: futures.Future
+			packName, packageEntry = entryFutures[entryFuture]
+
+			try:
+				entryLocalizationStringCount, entryGenderedLocalizationStringCount = entryFuture.result()  # type: int, int
+			except Exception as e:
+				failedEntryCount += 1
+
+				print("Failed to build the language cache for a string table.\n" + \
+					  "Pack: '" + packName + "' Package: '" + packageEntry.PackageFilePath + "' Entry: '" + packageEntry.IdentifiersToString() + "'\n" + \
+					  Exceptions.FormatException(e), file = sys.stderr)
+
+				continue
+
+			localizationStringCount += entryLocalizationStringCount
+			genderedLocalizationStringCount += entryGenderedLocalizationStringCount
+
+	print("Cached %s localization strings, %s of which are gendered, in %.2f seconds." % (localizationStringCount, genderedLocalizationStringCount, time.time() - buildStartTime))
+
+	return failedEntryCount == 0
+
+def _Setup (gameInstallPath: str, locale: str) -> None:
+	Headless.Install(appRootPath = Headless.GetAppRootPath(gameInstallPath), locale = locale)
+
+	from NeonOcean.S4.Refer import GenderedLanguageHandler, LanguageHandlers
+
+	for languageHandlerModuleInformation in pkgutil.iter_modules(LanguageHandlers.__path__):
+		importlib.import_module(LanguageHandlers.__name__ + "." + languageHandlerModuleInformation.name)
+
+def _GetLanguageHandler () -> typing.Any:
+	from NeonOcean.S4.Refer import LanguageHandlers
+
+	return LanguageHandlers.GetCurrentLanguageHandler()
+
+def _BuildEntryCache (packName: str, packageEntry: typing.Any, cacheRootPath: str) -> typing.Tuple[int, int]:
+	from NeonOcean.S4.Refer import GenderedLanguageHandler, LanguageCache as ReferLanguageCache, This
+	from NeonOcean.S4.Refer.Tools import Package, STBL
+
+	languageHandler = _GetLanguageHandler()
+	cacheLocation = ReferLanguageCache.LanguageCacheLocation(cacheRootPath)
+	cacheInfo = ReferLanguageCache.LanguageCacheInfo(int(languageHandler.HandlingLanguage), This.Mod.Version, Package.GetPackageFingerprint(packageEntry.PackageFilePath))
+
+	localizationStrings = STBL.ParseSTBLFileBytes(packageEntry.Read())  # type: typing.Dict[int, str]
+	genderedLocalizationStrings = GenderedLanguageHandler.FilterAndFixLocalizationStrings(languageHandler, localizationStrings)  # type: typing.Dict[int, str]
+
+	cacheLocation.WriteGamePackLanguageCache(packName, packageEntry, localizationStrings, cacheInfo)
+	cacheLocation.WriteGamePackGenderedLanguageCache(packName, packageEntry, genderedLocalizationStrings, cacheInfo)
+
+	return len(localizationStrings), len(genderedLocalizationStrings)
@@ -0,0 +1,508 @@
+import enum
+import functools
+import importlib
+import importlib.abc
+import importlib.machinery
+import os
+import sys
+import types
+import typing
+
+from Mod_NeonOcean_S4_Refer import Mod
+from Mod_NeonOcean_S4_Refer.Tools import Exceptions
+
+# Lets the mod's python be imported outside of the game. Every game module and every module from NeonOcean.S4.Main is replaced by stand-ins. Stand-ins
+# accept any call or attribute access and do nothing, except for the few modules below that the language pipeline actually needs to work.
+
+StandInRootModules = {
+	"alarms",
+	"clock",
+	"date_and_time",
+	"event_testing",
+	"game_services",
+	"interactions",
+	"objects",
+	"paths",
+	"protocolbuffers",
+	"server",
+	"services",
+	"sims",
+	"sims4",
+	"statistics",  # The game's statistics package shadows the standard library module of the same name, just like it does in the game.
+	"ui",
+	"zone",
+
+	"NeonOcean.S4.Main",
+}  # type: typing.Set[str]
+
+_installed = False  # type: bool
+_locale = "en-us"  # type: str
+
+class _StandInType(type):
+	def __getattr__ (cls, name: str) -> typing.Any:
+		if name.startswith("__") and name.endswith("__"):
+			raise AttributeError(name)
+
+		return StandIn
+
+	def __iter__ (cls):
+		return iter(())
+
+	def __bool__ (cls) -> bool:
+		return True
+
+class StandIn(metaclass = _StandInType):
+	def __init__ (self, *args, **kwargs):
+		pass
+
+	def __getattr__ (self, name: str) -> typing.Any:
+		if name.startswith("__") and name.endswith("__"):
+			raise AttributeError(name)
+
+		return StandIn()
+
+	def __call__ (self, *args, **kwargs) -> typing.Any:
+		return StandIn()
+
+	def __iter__ (self):
+		return iter(())
+
+	def __enter__ (self):
+		return self
+
+	def __exit__ (self, *args) -> bool:
+		return False
+
+class _StandInModule(types.ModuleType):
+	def __getattr__ (self, name: str) -> typing.Any:
+		if name.startswith("__") and name.endswith("__"):
+			raise AttributeError(name)
+
+		subModule = sys.modules.get(self.__name__ + "." + name, None)  # type: typing.Optional[types.ModuleType]
+
+		if subModule is not None:
+			return subModule
+
+		standInType = _StandInType(name, (StandIn,), { "__module__": self.__name__ })  # type: type
+		setattr(self, name, standInType)
+		return standInType
+
+class _StandInLoader(importlib.abc.Loader):
+	def create_module (self, spec: importlib.machinery.ModuleSpec) -> types.ModuleType:
+		return _StandInModule(spec.name)
+
+	def exec_module (self, module: types.ModuleType) -> None:
+		module.__path__ = list()
+
+class _StandInFinder(importlib.abc.MetaPathFinder):
+	def find_spec (self, fullName: str, path, target = None) -> typing.Optional[importlib.machinery.ModuleSpec]:
+		if not IsStandInModule(fullName):
+			return None
+
+		return importlib.machinery.ModuleSpec(fullName, _StandInLoader(), is_package = True)
+
+class Version:
+	def __init__ (self, versionString: str = "0.0.0"):
+		if not isinstance(versionString, str):
+			raise Exceptions.IncorrectTypeException(versionString, "versionString", (str,))
+
+		versionParts = versionString.split("-", 1)[0].split(".")  # type: typing.List[str]
+
+		self._versionString = versionString  # type: str
+		self._versionNumbers = tuple(int(versionPart) for versionPart in versionParts)  # type: typing.Tuple[int, ...]
+
+	def __str__ (self) -> str:
+		return self._versionString
+
+	def __repr__ (self) -> str:
+		return "Version(%r)" % self._versionString
+
+	def __eq__ (self, other) -> bool:
+		return isinstance(other, Version) and self._versionNumbers == other._versionNumbers
+
+	def __lt__ (self, other) -> bool:
+		return self._versionNumbers < other._versionNumbers
+
+	def __le__ (self, other) -> bool:
+		return self._versionNumbers <= other._versionNumbers
+
+	def __gt__ (self, other) -> bool:
+		return self._versionNumbers > other._versionNumbers
+
+	def __ge__ (self, other) -> bool:
+		return self._versionNumbers >= other._versionNumbers
+
+	def __hash__ (self) -> int:
+		return hash(self._versionNumbers)
+
+class LocalizedStringToken:
+	INVALID = 0  # type: int
+	SIM = 1  # type: int
+	STRING = 2  # type: int
+	RAW_TEXT = 3  # type: int
+	NUMBER = 4  # type: int
+	OBJECT = 5  # type: int
+
+	def __init__ (self):
+		self.type = self.INVALID  # type: int
+
+		self.first_name = ""  # type: str
+		self.last_name = ""  # type: str
+		self.full_name_key = 0  # type: int
+		self.is_female = False  # type: bool
+
+		self.text_string = None  # type: typing.Optional[LocalizedString]
+		self.raw_text = ""  # type: str
+		self.number = 0  # type: typing.Union[float, int]
+
+		self.custom_name = ""  # type: str
+		self.custom_description = ""  # type: str
+		self.catalog_name_key = 0  # type: int
+		self.catalog_description_key = 0  # type: int
+
+class LocalizedString:
+	def __init__ (self, hash: int = 0, tokens: typing.Sequence = ()):
+		self.hash = hash  # type: int
+		self.tokens = list(tokens)  # type: list
+
+class HeadlessSimInfo(StandIn):
+	def __init__ (self, simID: int, firstName: str, lastName: str, isFemale: bool):
+		super().__init__()
+
+		self.id = simID  # type: int
+		self.sim_id = simID  # type: int
+		self.first_name = firstName  # type: str
+		self.last_name = lastName  # type: str
+		self.is_female = isFemale  # type: bool
+
+	def populate_localization_token (self, token: LocalizedStringToken) -> None:
+		token.type = LocalizedStringToken.SIM
+		token.first_name = self.first_name
+		token.last_name = self.last_name
+		token.is_female = self.is_female
+
+class HeadlessSimInfoManager(StandIn):
+	def __init__ (self):
+		"""
+		Holds the sims that the game's 'services.sim_info_manager' would return. Sims have to be added before the mod can look them up.
+		"""
+
+		super().__init__()
+
+		self._simInfos = dict()  # type: typing.Dict[int, HeadlessSimInfo]
+
+	def __len__ (self) -> int:
+		return len(self._simInfos)
+
+	def __iter__ (self):
+		return iter(self._simInfos.keys())
+
+	def __contains__ (self, simID: int) -> bool:
+		return simID in self._simInfos
+
+	def get (self, simID: int) -> typing.Optional[HeadlessSimInfo]:
+		return self._simInfos.get(simID, None)
+
+	def get_all (self) -> typing.List[HeadlessSimInfo]:
+		return list(self._simInfos.values())
+
+	def values (self):
+		return self._simInfos.values()
+
+	def AddSimInfo (self, simInfo: HeadlessSimInfo) -> None:
+		self._simInfos[simInfo.sim_id] = simInfo
+
+	def RemoveSimInfo (self, simID: int) -> None:
+		self._simInfos.pop(simID, None)
+
+	def Clear (self) -> None:
+		self._simInfos = dict()
+
+class HeadlessTokensMessage(list):
+	def __init__ (self, localizationString: LocalizedString):
+		"""
+		Stands in for the tokens message the game passes to 'sims4.localization.create_tokens'. Tokens are held in this list and the string they belong to
+		is held by the '_message' attribute, the same place the mod's create tokens patch looks for it.
+		"""
+
+		super().__init__(localizationString.tokens)
+
+		self._message = localizationString  # type: LocalizedString
+
+class HeadlessMod(StandIn):
+	def __init__ (self, namespace: str, name: str, version: Version, persistentPath: str):
+		super().__init__()
+
+		self.Namespace = namespace  # type: str
+		self.Name = name  # type: str
+		self.Version = version  # type: Version
+		self.PersistentPath = persistentPath  # type: str
+
+class HeadlessPersistentBranchedSection:
+	def __init__ (self):
+		"""
+		Holds branched setting values in memory, in place of the save file backed section the mod's pronoun settings use in game.
+		"""
+
+		self._defaults = dict()  # type: typing.Dict[str, typing.Any]
+		self._branches = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Any]]
+
+	def Setup (self, key: str, valueType: type, default: typing.Any, verify: typing.Callable) -> None:
+		self._defaults[key] = default
+
+	def IsSetup (self, key: str) -> bool:
+		return key in self._defaults
+
+	def Get (self, branch: str, key: str) -> typing.Any:
+		branchValues = self._branches.get(branch, None)  # type: typing.Optional[typing.Dict[str, typing.Any]]
+
+		if branchValues is None or not key in branchValues:
+			return self._defaults[key]
+
+		return branchValues[key]
+
+	def GetAllBranchIdentifiers (self, key: str) -> typing.Set[str]:
+		return { branch for branch, branchValues in self._branches.items() if key in branchValues }
+
+	def ValueIsSet (self, branch: str, key: str) -> bool:
+		return key in self._branches.get(branch, dict())
+
+	def Set (self, branch: str, key: str, value: typing.Any, autoSave: bool = True, autoUpdate: bool = True) -> None:
+		self._branches.setdefault(branch, dict())[key] = value
+
+	def Reset (self, branch: str = None, key: str = None, autoSave: bool = True, autoUpdate: bool = True) -> None:
+		for resettingBranch in list(self._branches.keys()) if branch is None else [ branch ]:  # type: str
+			if key is None:
+				self._branches.pop(resettingBranch, None)
+			else:
+				self._branches.get(resettingBranch, dict()).pop(key, None)
+
+	def Save (self) -> None:
+		pass
+
+	def Update (self) -> None:
+		pass
+
+class HeadlessPersistentSection:
+	def __init__ (self):
+		"""
+		Holds setting values in memory, in place of the settings file the mod's global settings use in game.
+		"""
+
+		self._defaults = dict()  # type: typing.Dict[str, typing.Any]
+		self._values = dict()  # type: typing.Dict[str, typing.Any]
+
+	def Setup (self, key: str, valueType: type, default: typing.Any, verify: typing.Callable) -> None:
+		self._defaults[key] = default
+
+	def IsSetup (self, key: str) -> bool:
+		return key in self._defaults
+
+	def Get (self, key: str) -> typing.Any:
+		return self._values.get(key, self._defaults[key])
+
+	def ValueIsSet (self, key: str) -> bool:
+		return key in self._values
+
+	def Set (self, key: str, value: typing.Any, autoSave: bool = True, autoUpdate: bool = True) -> None:
+		self._values[key] = value
+
+	def Reset (self, key: str = None, autoSave: bool = True, autoUpdate: bool = True) -> None:
+		if key is None:
+			self._values = dict()
+		else:
+			self._values.pop(key, None)
+
+	def Load (self) -> None:
+		pass
+
+	def Save (self) -> None:
+		pass
+
+	def Update (self) -> None:
+		pass
+
+def IsStandInModule (fullName: str) -> bool:
+	for standInRootModule in StandInRootModules:  # type: str
+		if fullName == standInRootModule or fullName.startswith(standInRootModule + "."):
+			return True
+
+	return False
+
+def Install (appRootPath: str = "", persistentPath: str = "", locale: str = "en-us") -> None:
+	"""
+	Install the stand-in modules and add the mod's python source to the import path. This should be called before anything from the mod is imported.
+	:param appRootPath: The value the game's 'paths.APP_ROOT' should have. Language handlers find the game's localization packages relative to this path.
+	:type appRootPath: str
+	:param persistentPath: The path the mod's persistent data would be saved to.
+	:type persistentPath: str
+	:param locale: The value the game's 'services.get_locale' function should return.
+	:type locale: str
+	"""
+
+	global _installed
+
+	if _installed:
+		return
+
+	pythonSourceRootPath = Mod.GetCurrentMod().PythonSourceRootPath  # type: str
+
+	if not pythonSourceRootPath in sys.path:
+		sys.path.append(pythonSourceRootPath)
+
+	sys.meta_path.insert(0, _StandInFinder())
+
+	_CreateConcreteModules(appRootPath, persistentPath, locale)
+
+	_installed = True
+
+def SetLocale (locale: str) -> None:
+	"""
+	Change the value the game's 'services.get_locale' function returns. Language handlers are picked using this value.
+	"""
+
+	global _locale
+
+	if not isinstance(locale, str):
+		raise Exceptions.IncorrectTypeException(locale, "locale", (str,))
+
+	_locale = locale
+
+def GetSimInfoManager () -> HeadlessSimInfoManager:
+	return _simInfoManager
+
+def LoadLocalizationStrings (localizationStrings: typing.Dict[int, str]) -> None:
+	"""
+	Replace the mod's localization strings with these, filtering and fixing the gendered strings with the current language handler, the same way they would
+	be after the mod loaded the game's strings. This needs to be called after the install function.
+	"""
+
+	from NeonOcean.S4.Refer import GenderedLanguage, GenderedLanguageHandler, LanguageHandlers
+	from NeonOcean.S4.Refer.Tools import StringTable
+
+	languageHandler = LanguageHandlers.GetCurrentLanguageHandler()
+
+	if languageHandler is None:
+		raise Exception("No language handler exists for the locale '" + _locale + "'. The handler's module may not have been imported yet.")
+
+	genderedLocalizationStrings = GenderedLanguageHandler.FilterAndFixLocalizationStrings(languageHandler, localizationStrings)  # type: typing.Dict[int, str]
+
+	GenderedLanguage._allLocalizationStrings = dict(localizationStrings)
+	GenderedLanguage._genderedLocalizationStrings = StringTable.CompactStringTable.FromDictionary(genderedLocalizationStrings)
+
+def InstallSettingsPersistence () -> None:
+	"""
+	Give the mod's global and pronoun settings in memory persistence, so settings can be read and written the same way they are in game. This needs to
+	be called after the install function.
+	"""
+
+	from NeonOcean.S4.Refer import PronounSettings, Settings
+	from NeonOcean.S4.Refer.PronounSettings import Base as PronounSettingsBase
+	from NeonOcean.S4.Refer.Settings import Base as SettingsBase
+
+	if SettingsBase.SettingsPersistence is None:
+		SettingsBase.SettingsPersistence = HeadlessPersistentSection()
+
+		for setting in Settings.GetAllSettings():
+			setting.Setup()
+
+	if PronounSettingsBase.SettingsPersistence is None:
+		PronounSettingsBase.SettingsPersistence = HeadlessPersistentBranchedSection()
+		PronounSettingsBase.DefaultSettings = HeadlessPersistentSection()
+
+		for pronounSetting in PronounSettings.GetAllSettings():
+			pronounSetting.Setup()
+
+def _CreateConcreteModules (appRootPath: str, persistentPath: str, locale: str) -> None:
+	SetLocale(locale)
+
+	enumLibModule = types.ModuleType("enum_lib")  # type: types.ModuleType
+	enumLibModule.Enum = enum.Enum
+	enumLibModule.IntEnum = enum.IntEnum
+	enumLibModule.IntFlag = enum.IntFlag
+	enumLibModule.Flag = enum.Flag
+	sys.modules["enum_lib"] = enumLibModule
+
+	exceptionsModule = _ImportStandIn("NeonOcean.S4.Main.Tools.Exceptions")  # type: types.ModuleType
+	exceptionsModule.IncorrectTypeException = Exceptions.IncorrectTypeException
+	exceptionsModule.FormatException = Exceptions.FormatException
+
+	versionModule = _ImportStandIn("NeonOcean.S4.Main.Tools.Version")  # type: types.ModuleType
+	versionModule.Version = Version
+
+	headlessMod = HeadlessMod(Mod.GetCurrentMod().Namespace, Mod.GetCurrentMod().Name, Version(Mod.GetCurrentMod().Version), persistentPath)  # type: HeadlessMod
+
+	modsModule = _ImportStandIn("NeonOcean.S4.Main.Mods")  # type: types.ModuleType
+	modsModule.GetMod = lambda namespace: headlessMod
+
+	mainPathsModule = _ImportStandIn("NeonOcean.S4.Main.Paths")  # type: types.ModuleType
+	mainPathsModule.UserDataPath = persistentPath
+
+	abstractSettingsModule = _ImportStandIn("NeonOcean.S4.Main.Abstract.Settings")  # type: types.ModuleType
+	abstractSettingsModule.SettingAbstract = _CreateSettingAbstract()
+	abstractSettingsModule.SettingBranchedAbstract = _CreateSettingAbstract()
+
+	commonModule = _ImportStandIn("sims4.common")  # type: types.ModuleType
+	commonModule.Pack = _CreatePackEnum()
+	commonModule.get_available_packs = lambda: list(commonModule.Pack)
+
+	localizationModule = _ImportStandIn("protocolbuffers.Localization_pb2")  # type: types.ModuleType
+	localizationModule.LocalizedStringToken = LocalizedStringToken
+	localizationModule.LocalizedString = LocalizedString
+
+	simInfoModule = _ImportStandIn("sims.sim_info")  # type: types.ModuleType
+	simInfoModule.SimInfo = HeadlessSimInfo
+
+	pathsModule = _ImportStandIn("paths")  # type: types.ModuleType
+	pathsModule.APP_ROOT = appRootPath
+
+	servicesModule = _ImportStandIn("services")  # type: types.ModuleType
+	servicesModule.get_locale = lambda: _locale
+	servicesModule.sim_info_manager = lambda: _simInfoManager
+
+def _ImportStandIn (fullName: str) -> types.ModuleType:
+	module = importlib.import_module(fullName)  # type: types.ModuleType
+
+	if not isinstance(module, _StandInModule):
+		raise Exception("Expected the module '" + fullName + "' to be a stand-in module.")
+
+	parentName, _, childName = fullName.rpartition(".")  # type: str, str, str
+
+	if parentName != "":
+		setattr(sys.modules[parentName], childName, module)
+
+	return module
+
+def _CreateSettingAbstract () -> type:
+	class SettingAbstract(StandIn):
+		@classmethod
+		def OnInitializeSubclass (cls) -> None:
+			pass
+
+		@classmethod
+		def SetDefault (cls) -> None:
+			pass
+
+	return SettingAbstract
+
+@functools.lru_cache(maxsize = None)
+def _CreatePackEnum () -> type:
+	packNames = [ "BASE_GAME" ]  # type: typing.List[str]
+	packNames.extend("EP%02d" % packNumber for packNumber in range(1, 21))
+	packNames.extend("GP%02d" % packNumber for packNumber in range(1, 21))
+	packNames.extend("SP%02d" % packNumber for packNumber in range(1, 81))
+	packNames.extend("FP%02d" % packNumber for packNumber in range(1, 6))
+
+	return enum.IntEnum("Pack", [ (packName, packIndex) for packIndex, packName in enumerate(packNames) ])
+
+def GetAppRootPath (gameInstallPath: str) -> str:
+	"""
+	Get what the game's 'paths.APP_ROOT' would be for a game installed to this directory.
+	"""
+
+	if sys.platform.lower() == "darwin":
+		return os.path.join(gameInstallPath, "Contents")  # ".../Applications/The Sims 4.app" > ".../Applications/The Sims 4.app/Contents"
+	else:
+		return os.path.join(gameInstallPath, "Game", "Bin")  # "...\The Sims 4" > "...\The Sims 4\Game\Bin"
+
+_simInfoManager = HeadlessSimInfoManager()  # type: HeadlessSimInfoManager
@@ -0,0 +1,202 @@
+import importlib.machinery
+import os
+import sys
+import tempfile
+import typing
+import warnings
+import zipfile
+import zipimport
+
+from Mod_NeonOcean_S4_Refer.Tools import Headless
+
+# Checks that the mod's language modules can be imported and used outside of the game through the headless stand-ins. Performance tests rely on these
+# modules behaving the way they do in game, so this should be run after any change to the stand-ins.
+
+_femaleSimID = 200  # type: int
+_maleSimID = 201  # type: int
+
+_localizationStrings = {
+	1: "{0.SimFirstName} said hello to {F1.her}{M1.him}.",
+	2: "{0.SimFirstName} waved at {F0.her}{M0.his} friend.",
+	3: "There is nothing gendered here.",
+}  # type: typing.Dict[int, str]
+
+def RunChecks () -> typing.List[str]:
+	"""
+	Run every check.
+	:return: A description of every check that failed. Nothing will be returned if everything passed.
+	"""
+
+	Headless.Install()
+	Headless.InstallSettingsPersistence()
+
+	failures = list()  # type: typing.List[str]
+
+	for check in (_CheckLanguageHandler, _CheckPronounSets, _CheckGenderedLanguage, _CheckCreateTokensPatch, _CheckZipImportTiming):  # type: typing.Callable[[], typing.Optional[str]]
+		try:
+			failure = check()  # type: typing.Optional[str]
+		except Exception as e:
+			failure = "%s raised %s: %s" % (check.__name__, type(e).__name__, e)
+
+		if failure is not None:
+			failures.append(failure)
+
+	return failures
+
+def _CheckLanguageHandler () -> typing.Optional[str]:
+	from NeonOcean.S4.Refer import LanguageHandlers
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+
+	if LanguageHandlers.GetCurrentLanguageHandler() is not English.EnglishLanguageHandler:
+		return "The current language handler was not the english handler for the locale 'en-us'."
+
+	Headless.SetLocale("xx-xx")
+
+	try:
+		if LanguageHandlers.GetCurrentLanguageHandler() is not None:
+			return "A language handler was returned for an unsupported locale."
+	finally:
+		Headless.SetLocale("en-us")
+
+	return None
+
+def _CheckPronounSets () -> typing.Optional[str]:
+	from NeonOcean.S4.Refer import PronounSets
+	from NeonOcean.S4.Refer.LanguageHandlers import English
+
+	allPronounSets = PronounSets.GetAllPronounSets(English.EnglishLanguageHandler)  # type: dict
+
+	for standardSetIdentifier in English.EnglishLanguageHandler.GetStandardPronounSets().keys():  # type: str
+		if not standardSetIdentifier in allPronounSets:
+			return "The standard pronoun set '%s' was missing from every pronoun set." % standardSetIdentifier
+
+	return None
+
+def _CheckGenderedLanguage () -> typing.Optional[str]:
+	from NeonOcean.S4.Refer import GenderedLanguage, PronounSettings
+
+	Headless.LoadLocalizationStrings(_localizationStrings)
+
+	if GenderedLanguage.GetGenderedLocalizationStringText(3) is not None:
+		return "A string with no gendered terms was kept as a gendered string."
+
+	femaleSimInfo, maleSimInfo = _AddSimInfos()  # type: Headless.HeadlessSimInfo, Headless.HeadlessSimInfo
+
+	if GenderedLanguage.CorrectGenderedSTBLText(2, _localizationStrings[2], (femaleSimInfo,)) is not None:
+		return "A string was corrected for a sim without a pronoun set selection, the game should have been left to handle it."
+
+	PronounSettings.PronounSetSelection.Set(str(_femaleSimID), "1")
+
+	try:
+		correctedText = GenderedLanguage.CorrectGenderedSTBLText(2, _localizationStrings[2], (femaleSimInfo,))  # type: typing.Optional[str]
+	finally:
+		PronounSettings.PronounSetSelection.Reset(str(_femaleSimID))
+
+	if correctedText != "Alex waved at his friend.":
+		return "Correcting a string for a sim using male pronouns gave %r." % correctedText
+
+	return None
+
+def _CheckCreateTokensPatch () -> typing.Optional[str]:
+	from NeonOcean.S4.Refer import GenderedLanguageHandler, PronounSettings
+
+	Headless.LoadLocalizationStrings(_localizationStrings)
+
+	femaleSimInfo, maleSimInfo = _AddSimInfos()  # type: Headless.HeadlessSimInfo, Headless.HeadlessSimInfo
+
+	localizationString = Headless.LocalizedString(hash = 1)  # type: Headless.LocalizedString
+	tokensMessage = Headless.HeadlessTokensMessage(localizationString)  # type: Headless.HeadlessTokensMessage
+
+	PronounSettings.PronounSetSelection.Set(str(_maleSimID), "0")
+
+	try:
+		# noinspection PyProtectedMember
+		GenderedLanguageHandler._CreateTokensPatch(lambda *args: None, tokensMessage, femaleSimInfo, maleSimInfo)
+	finally:
+		PronounSettings.PronounSetSelection.Reset(str(_maleSimID))
+		# noinspection PyProtectedMember
+		GenderedLanguageHandler._trueLocalizationStringValues.pop(localizationString, None)
+
+	if localizationString.hash != 2462885516 or len(tokensMessage) != 1:
+		return "The create tokens patch did not replace a gendered string with raw text."
+
+	if tokensMessage[0].raw_text != "Alex said hello to her.":
+		return "The create tokens patch replaced a string for a sim using female pronouns with %r." % tokensMessage[0].raw_text
+
+	return None
+
+def _CheckZipImportTiming () -> typing.Optional[str]:
+	import NeonOcean.S4.Refer
+	from NeonOcean.S4.Refer.Diagnostics import ImportTiming
+
+	# The game loads the mod from a zip archive. Newer versions of python give zip loaders an 'exec_module' method, the game's python only gives them
+	# 'load_module', so both kinds of loader are checked.
+
+	class LegacyZipLoader:
+		def __init__ (self, zipImporter: zipimport.zipimporter):
+			self._zipImporter = zipImporter
+
+		def load_module (self, fullName: str):
+			with warnings.catch_warnings():
+				warnings.simplefilter("ignore")
+				return self._zipImporter.load_module(fullName)
+
+	class LegacyZipFinder:
+		def __init__ (self, archivePackagePath: str, packageName: str):
+			self._archivePackagePath = archivePackagePath
+			self._packageName = packageName
+
+		def find_spec (self, fullName: str, path, target = None):
+			if fullName != self._packageName and not fullName.startswith(self._packageName + "."):
+				return None
+
+			# Zip importers only find modules directly in their own directory of the archive, the same as the importers python makes for each package.
+			parentNames = fullName.split(".")[3:-1]  # type: typing.List[str]
+			zipImporter = zipimport.zipimporter(os.path.join(self._archivePackagePath, *parentNames))  # type: zipimport.zipimporter
+
+			return importlib.machinery.ModuleSpec(fullName, LegacyZipLoader(zipImporter), is_package = fullName == self._packageName)
+
+	with tempfile.TemporaryDirectory() as archiveDirectoryPath:
+		archiveFilePath = os.path.join(archiveDirectoryPath, "Check.ts4script")  # type: str
+
+		with zipfile.ZipFile(archiveFilePath, "w") as archiveFile:
+			for packageName in ("_ZipImportCheck", "_LegacyZipImportCheck"):  # type: str
+				archiveFile.writestr("NeonOcean/S4/Refer/" + packageName + "/__init__.py", "from . import Child\n")
+				archiveFile.writestr("NeonOcean/S4/Refer/" + packageName + "/Child.py", "Value = sum(range(1000))\n")
+
+		archivePackagePath = os.path.join(archiveFilePath, "NeonOcean", "S4", "Refer")  # type: str
+		legacyFinder = LegacyZipFinder(archivePackagePath, "NeonOcean.S4.Refer._LegacyZipImportCheck")  # type: LegacyZipFinder
+
+		ImportTiming.Install()
+		NeonOcean.S4.Refer.__path__.append(archivePackagePath)
+		sys.meta_path.insert(sys.meta_path.index(ImportTiming._finder) + 1, legacyFinder)  # The legacy finder needs to come before python's own path finder.
+
+		try:
+			for packageName in ("NeonOcean.S4.Refer._ZipImportCheck", "NeonOcean.S4.Refer._LegacyZipImportCheck"):  # type: str
+				__import__(packageName)
+
+				timedModuleNames = { importTime.ModuleName for importTime in ImportTiming.GetImportTimes() }  # type: typing.Set[str]
+
+				for moduleName in (packageName, packageName + ".Child"):  # type: str
+					if not moduleName in timedModuleNames:
+						return "The module '%s' was imported from a zip archive without being timed." % moduleName
+		finally:
+			sys.meta_path.remove(legacyFinder)
+			NeonOcean.S4.Refer.__path__.remove(archivePackagePath)
+
+			for moduleName in list(sys.modules.keys()):  # type: str
+				if "ZipImportCheck" in moduleName:
+					sys.modules.pop(moduleName)
+
+	return None
+
+def _AddSimInfos () -> typing.Tuple[Headless.HeadlessSimInfo, Headless.HeadlessSimInfo]:
+	simInfoManager = Headless.GetSimInfoManager()  # type: Headless.HeadlessSimInfoManager
+
+	femaleSimInfo = Headless.HeadlessSimInfo(_femaleSimID, "Alex", "Doe", True)  # type: Headless.HeadlessSimInfo
+	maleSimInfo = Headless.HeadlessSimInfo(_maleSimID, "Sam", "Doe", False)  # type: Headless.HeadlessSimInfo
+
+	simInfoManager.AddSimInfo(femaleSimInfo)
+	simInfoManager.AddSimInfo(maleSimInfo)
+
+	return femaleSimInfo, maleSimInfo
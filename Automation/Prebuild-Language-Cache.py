@@ -0,0 +1,19 @@
+if __name__ == "__main__":
+	import argparse
+	import os
+	import sys
+	from importlib import util
+
+	sys.path.append(os.path.join(os.path.dirname(__file__), "NeonOcean.S4.Refer"))
+	LanguageCache = util.find_spec("Mod_NeonOcean_S4_Refer.LanguageCache").loader.load_module()
+
+	argumentParser = argparse.ArgumentParser(description = "Build the mod's language cache files from a game install, without running the game.")
+	argumentParser.add_argument("gameInstallPath", help = "The game's install directory.")
+	argumentParser.add_argument("outputPath", help = "The shared language cache directory to write to.")
+	argumentParser.add_argument("--locale", default = "en-us", help = "The game locale to build caches for.")
+	argumentParser.add_argument("--local", action = "store_true", help = "Write the caches directly to the output directory, as the mod does in its persistent data folder.")
+	argumentParser.add_argument("--workers", type = int, default = None, help = "The number of processes to read packages with.")
+	arguments = argumentParser.parse_args()
+
+	if not LanguageCache.PrebuildLanguageCache(arguments.gameInstallPath, arguments.locale, arguments.outputPath, localLayout = arguments.local, workerCount = arguments.workers):
+		sys.exit(1)
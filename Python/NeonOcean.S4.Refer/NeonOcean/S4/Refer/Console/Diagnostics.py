@@ -0,0 +1,164 @@
+import os
+import typing
+
+from NeonOcean.S4.Refer import This
+from NeonOcean.S4.Refer.Console import Command
+from NeonOcean.S4.Refer.Diagnostics import ImportTiming, Memory, Sampler, Timing, TokenRecorder
+from NeonOcean.S4.Main import Debug, LoadingShared, Paths
+from sims4 import commands
+
+PrintTimingsCommand: Command.ConsoleCommand
+ResetTimingsCommand: Command.ConsoleCommand
+PrintMemoryCommand: Command.ConsoleCommand
+PrintImportTimesCommand: Command.ConsoleCommand
+StartSamplingCommand: Command.ConsoleCommand
+StopSamplingCommand: Command.ConsoleCommand
+StartTokenRecordingCommand: Command.ConsoleCommand
+StopTokenRecordingCommand: Command.ConsoleCommand
+
+def _Setup () -> None:
+	global PrintTimingsCommand, ResetTimingsCommand, PrintMemoryCommand, PrintImportTimesCommand, StartSamplingCommand, StopSamplingCommand, StartTokenRecordingCommand, StopTokenRecordingCommand
+
+	commandPrefix = This.Mod.Namespace.lower() + ".diagnostics"
+
+	PrintTimingsCommand = Command.ConsoleCommand(_PrintTimings, commandPrefix + ".print_timings", showHelp = True, helpInput = "{ reset }")
+	ResetTimingsCommand = Command.ConsoleCommand(_ResetTimings, commandPrefix + ".reset_timings", showHelp = True)
+	PrintMemoryCommand = Command.ConsoleCommand(_PrintMemory, commandPrefix + ".print_memory", showHelp = True)
+	PrintImportTimesCommand = Command.ConsoleCommand(_PrintImportTimes, commandPrefix + ".print_import_times", showHelp = True, helpInput = "{ count }")
+	StartSamplingCommand = Command.ConsoleCommand(_StartSampling, commandPrefix + ".start_sampling", showHelp = True, helpInput = "{ interval milliseconds }")
+	StopSamplingCommand = Command.ConsoleCommand(_StopSampling, commandPrefix + ".stop_sampling", showHelp = True)
+	StartTokenRecordingCommand = Command.ConsoleCommand(_StartTokenRecording, commandPrefix + ".start_token_recording", showHelp = True)
+	StopTokenRecordingCommand = Command.ConsoleCommand(_StopTokenRecording, commandPrefix + ".stop_token_recording", showHelp = True)
+
+def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
+	if cause:
+		pass
+
+	PrintTimingsCommand.RegisterCommand()
+	ResetTimingsCommand.RegisterCommand()
+	PrintMemoryCommand.RegisterCommand()
+	PrintImportTimesCommand.RegisterCommand()
+	StartSamplingCommand.RegisterCommand()
+	StopSamplingCommand.RegisterCommand()
+	StartTokenRecordingCommand.RegisterCommand()
+	StopTokenRecordingCommand.RegisterCommand()
+
+def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
+	if cause:
+		pass
+
+	PrintTimingsCommand.UnregisterCommand()
+	ResetTimingsCommand.UnregisterCommand()
+	PrintMemoryCommand.UnregisterCommand()
+	PrintImportTimesCommand.UnregisterCommand()
+	StartSamplingCommand.UnregisterCommand()
+	StopSamplingCommand.UnregisterCommand()
+	StartTokenRecordingCommand.UnregisterCommand()
+	StopTokenRecordingCommand.UnregisterCommand()
+
+def _PrintTimings (reset: bool = False, _connection: int = None) -> None:
+	try:
+		timingsText = Timing.FormatCounters()  # type: str
+
+		commands.cheat_output("Times are in microseconds.\n" + timingsText + "\n", _connection)
+		Debug.Log("Hot path timings:\n" + timingsText, This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+
+		if reset:
+			Timing.ResetAllCounters()
+	except Exception:
+		commands.cheat_output("Failed to print timings.", _connection)
+		Debug.Log("Failed to print timings.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _ResetTimings (_connection: int = None) -> None:
+	try:
+		Timing.ResetAllCounters()
+		commands.cheat_output("Timings reset.", _connection)
+	except Exception:
+		commands.cheat_output("Failed to reset timings.", _connection)
+		Debug.Log("Failed to reset timings.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _PrintMemory (_connection: int = None) -> None:
+	try:
+		memoryText = Memory.FormatEstimates(Memory.GetLanguageEstimates())  # type: str
+
+		commands.cheat_output("Sizes marked with '~' are extrapolated from samples.\n" + memoryText + "\n", _connection)
+		Debug.Log("Language memory estimates:\n" + memoryText, This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+	except Exception:
+		commands.cheat_output("Failed to print memory estimates.", _connection)
+		Debug.Log("Failed to print memory estimates.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _PrintImportTimes (count: int = 20, _connection: int = None) -> None:
+	try:
+		importTimesText = ImportTiming.FormatImportTimes(count = count)  # type: str
+
+		commands.cheat_output(importTimesText + "\n", _connection)
+		Debug.Log("Module import times:\n" + ImportTiming.FormatImportTimes(), This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+	except Exception:
+		commands.cheat_output("Failed to print import times.", _connection)
+		Debug.Log("Failed to print import times.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _StartSampling (intervalMilliseconds: float = 10, _connection: int = None) -> None:
+	try:
+		if Sampler.IsSampling():
+			commands.cheat_output("Already sampling, stop the current capture first.", _connection)
+			return
+
+		Sampler.StartSampling(interval = intervalMilliseconds / 1000)
+		commands.cheat_output("Started sampling every %s milliseconds." % intervalMilliseconds, _connection)
+	except Exception:
+		commands.cheat_output("Failed to start sampling.", _connection)
+		Debug.Log("Failed to start sampling.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _StopSampling (_connection: int = None) -> None:
+	try:
+		sampler = Sampler.StopSampling()  # type: typing.Optional[Sampler.StackSampler]
+
+		if sampler is None:
+			commands.cheat_output("Nothing is being sampled.", _connection)
+			return
+
+		captureFilePath = os.path.join(Paths.UserDataPath, Sampler.GetCaptureFileName())  # type: str
+		sampler.WriteCollapsedStacks(captureFilePath)
+
+		commands.cheat_output("Stopped sampling. Kept %s of %s samples, written to '%s'." % (sampler.SampleCount - sampler.SkippedSampleCount, sampler.SampleCount, captureFilePath), _connection)
+	except Exception:
+		commands.cheat_output("Failed to stop sampling.", _connection)
+		Debug.Log("Failed to stop sampling.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _StartTokenRecording (_connection: int = None) -> None:
+	try:
+		if TokenRecorder.Recording:
+			commands.cheat_output("Already recording, stop the current recording first.", _connection)
+			return
+
+		TokenRecorder.StartRecording()
+		commands.cheat_output("Started recording gendered string traffic.", _connection)
+	except Exception:
+		commands.cheat_output("Failed to start recording.", _connection)
+		Debug.Log("Failed to start recording gendered string traffic.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+def _StopTokenRecording (_connection: int = None) -> None:
+	try:
+		if not TokenRecorder.Recording:
+			commands.cheat_output("Nothing is being recorded.", _connection)
+			return
+
+		TokenRecorder.StopRecording()
+
+		corpusFilePath = os.path.join(Paths.UserDataPath, TokenRecorder.GetCorpusFileName())  # type: str
+		TokenRecorder.WriteCorpus(corpusFilePath)
+
+		commands.cheat_output("Stopped recording. Recorded %s calls with %s distinct layouts, written to '%s'." % (TokenRecorder.GetCallCount(), TokenRecorder.GetLayoutCount(), corpusFilePath), _connection)
+	except Exception:
+		commands.cheat_output("Failed to stop recording.", _connection)
+		Debug.Log("Failed to stop recording gendered string traffic.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+		return
+
+_Setup()
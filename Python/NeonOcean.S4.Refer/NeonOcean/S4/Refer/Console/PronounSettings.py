@@ -1,21 +1,34 @@
-from NeonOcean.S4.Refer import PronounSettings, This
+import typing
+
+import services
+from NeonOcean.S4.Refer import LanguageHandlers, PronounSets, PronounSettings, This
 from NeonOcean.S4.Refer.Console import Command
-from NeonOcean.S4.Refer.PronounSettings import Base as SettingsBase, List as SettingsList
+from NeonOcean.S4.Refer.PronounSettings import Assignment, Base as SettingsBase, List as SettingsList
 from NeonOcean.S4.Main import Debug, LoadingShared
 from sims4 import commands
 
 PrintNamesCommand: Command.ConsoleCommand
 ShowDialogCommand: Command.ConsoleCommand
 ShowListCommand: Command.ConsoleCommand
+AssignCommand: Command.ConsoleCommand
+CancelAssignmentCommand: Command.ConsoleCommand
+
+_selectionValues = {
+	"default": "",
+	"female": "0",
+	"male": "1"
+}  # type: typing.Dict[str, str]
 
 def _Setup () -> None:
-	global PrintNamesCommand, ShowDialogCommand, ShowListCommand
+	global PrintNamesCommand, ShowDialogCommand, ShowListCommand, AssignCommand, CancelAssignmentCommand
 
 	commandPrefix = This.Mod.Namespace.lower() + ".pronoun_settings"
 
 	PrintNamesCommand = Command.ConsoleCommand(_PrintNames, commandPrefix + ".print_names", showHelp = True)
 	ShowDialogCommand = Command.ConsoleCommand(_ShowDialog, commandPrefix + ".show_dialog", showHelp = True, helpInput = "{ setting name }")
 	ShowListCommand = Command.ConsoleCommand(_ShowList, commandPrefix + ".show_list", showHelp = True)
+	AssignCommand = Command.ConsoleCommand(_Assign, commandPrefix + ".assign", showHelp = True, helpInput = "{ set selection or keep } { fallback or keep } { household id, active or all } { ages or all } { trait id or 0 }")
+	CancelAssignmentCommand = Command.ConsoleCommand(_CancelAssignment, commandPrefix + ".cancel_assignment", showHelp = True)
 
 def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
 	if cause:
@@ -24,6 +37,8 @@ def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
 	PrintNamesCommand.RegisterCommand()
 	ShowDialogCommand.RegisterCommand()
 	ShowListCommand.RegisterCommand()
+	AssignCommand.RegisterCommand()
+	CancelAssignmentCommand.RegisterCommand()
 
 def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
 	if cause:
@@ -32,6 +47,8 @@ def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
 	PrintNamesCommand.UnregisterCommand()
 	ShowDialogCommand.UnregisterCommand()
 	ShowListCommand.UnregisterCommand()
+	AssignCommand.UnregisterCommand()
+	CancelAssignmentCommand.UnregisterCommand()
 
 def _PrintNames (_connection: int = None) -> None:
 	try:
@@ -75,4 +92,57 @@ def _ShowList (branch: str, _connection: int = None) -> None:
 		Debug.Log("Failed to show settings list dialog.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 		return
 
+def _Assign (selection: str, fallback: str = "keep", household: str = "all", ages: str = "all", trait: int = 0, _connection: int = None) -> None:
+	try:
+		assignmentValues = dict()  # type: typing.Dict[str, str]
+
+		if selection.lower() != "keep":
+			selectionValue = PronounSettings.PronounSetSelection.Verify(_selectionValues.get(selection.lower(), selection))  # type: str
+
+			if selectionValue not in _selectionValues.values() and selectionValue not in PronounSets.GetAllPronounSets(LanguageHandlers.GetCurrentLanguageHandler()):
+				commands.cheat_output("Cannot find a pronoun set with the identifier '" + selectionValue + "'.\n", _connection)
+				return
+
+			assignmentValues[PronounSettings.PronounSetSelection.Key] = selectionValue
+
+		if fallback.lower() != "keep":
+			assignmentValues[PronounSettings.PronounFallback.Key] = PronounSettings.PronounFallback.Verify(_selectionValues.get(fallback.lower(), fallback))
+
+		if len(assignmentValues) == 0:
+			commands.cheat_output("Nothing to assign, the set selection and fallback are both being kept.\n", _connection)
+			return
+
+		if household.lower() == "all":
+			householdID = None
+		elif household.lower() == "active":
+			householdID = services.active_household_id()
+
+			if not householdID:
+				# A filter without a household would assign the values to every sim, not just the active household's.
+				commands.cheat_output("There is no active household to assign pronoun settings to.\n", _connection)
+				return
+		else:
+			householdID = int(household)
+
+		ageNames = None if ages.lower() == "all" else set(ages.split(","))  # type: typing.Optional[typing.Set[str]]
+		traitID = None if trait == 0 else trait  # type: typing.Optional[int]
+
+		assignment = Assignment.StartAssignment(assignmentValues, Assignment.AssignmentFilter(householdID = householdID, ageNames = ageNames, traitID = traitID))  # type: Assignment.Assignment
+		commands.cheat_output("Started assigning pronoun settings, %s sims will be checked.\n" % assignment.TotalCount, _connection)
+	except Exception as e:
+		commands.cheat_output("Failed to start a pronoun assignment.\n" + str(e) + "\n", _connection)
+		Debug.Log("Failed to start a pronoun assignment.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__, exception = e)
+		return
+
+def _CancelAssignment (_connection: int = None) -> None:
+	try:
+		if Assignment.CancelAssignment():
+			commands.cheat_output("Canceled the running pronoun assignment.\n", _connection)
+		else:
+			commands.cheat_output("No pronoun assignment is running.\n", _connection)
+	except Exception as e:
+		commands.cheat_output("Failed to cancel the pronoun assignment.\n", _connection)
+		Debug.Log("Failed to cancel the pronoun assignment.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__, exception = e)
+		return
+
 _Setup()
@@ -4,7 +4,7 @@ The S4 console will always change inputs to be lower case, so this module must b
 If more than one settings exist with the same name the first found will be used.
 """
 
-from NeonOcean.S4.Refer import Settings, This
+from NeonOcean.S4.Refer import PronounSetPacks, Settings, This
 from NeonOcean.S4.Refer.Console import Command
 from NeonOcean.S4.Refer.Settings import Base as SettingsBase, List as SettingsList
 from NeonOcean.S4.Main import Debug, LoadingShared
@@ -13,15 +13,19 @@ from sims4 import commands
 PrintNamesCommand: Command.ConsoleCommand
 ShowDialogCommand: Command.ConsoleCommand
 ShowListCommand: Command.ConsoleCommand
+ExportPronounSetsCommand: Command.ConsoleCommand
+ImportPronounSetsCommand: Command.ConsoleCommand
 
 def _Setup () -> None:
-	global PrintNamesCommand, ShowDialogCommand, ShowListCommand
+	global PrintNamesCommand, ShowDialogCommand, ShowListCommand, ExportPronounSetsCommand, ImportPronounSetsCommand
 
 	commandPrefix = This.Mod.Namespace.lower() + ".settings"
 
 	PrintNamesCommand = Command.ConsoleCommand(_PrintNames, commandPrefix + ".print_names", showHelp = True)
 	ShowDialogCommand = Command.ConsoleCommand(_ShowDialog, commandPrefix + ".show_dialog", showHelp = True, helpInput = "{ setting name }")
 	ShowListCommand = Command.ConsoleCommand(_ShowList, commandPrefix + ".show_list", showHelp = True)
+	ExportPronounSetsCommand = Command.ConsoleCommand(_ExportPronounSets, commandPrefix + ".export_pronoun_sets", showHelp = True, helpInput = "{ file name }")
+	ImportPronounSetsCommand = Command.ConsoleCommand(_ImportPronounSets, commandPrefix + ".import_pronoun_sets", showHelp = True, helpInput = "{ file name } { replace existing }")
 
 def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
 	if cause:
@@ -30,6 +34,8 @@ def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
 	PrintNamesCommand.RegisterCommand()
 	ShowDialogCommand.RegisterCommand()
 	ShowListCommand.RegisterCommand()
+	ExportPronounSetsCommand.RegisterCommand()
+	ImportPronounSetsCommand.RegisterCommand()
 
 def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
 	if cause:
@@ -38,6 +44,8 @@ def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
 	PrintNamesCommand.UnregisterCommand()
 	ShowDialogCommand.UnregisterCommand()
 	ShowListCommand.UnregisterCommand()
+	ExportPronounSetsCommand.UnregisterCommand()
+	ImportPronounSetsCommand.UnregisterCommand()
 
 def _PrintNames (_connection: int = None) -> None:
 	try:
@@ -82,4 +90,27 @@ def _ShowList (_connection: int = None) -> None:
 		Debug.Log("Failed to show settings list dialog.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 		return
 
+def _ExportPronounSets (fileName: str = PronounSetPacks.DefaultPackFileName, _connection: int = None) -> None:
+	try:
+		packFilePath = PronounSetPacks.GetPackFilePath(fileName)  # type: str
+		exportedCount = PronounSetPacks.ExportPack(packFilePath)  # type: int
+
+		commands.cheat_output("Exported %s custom pronoun sets to '%s'.\n" % (exportedCount, packFilePath), _connection)
+	except Exception as e:
+		commands.cheat_output("Failed to export custom pronoun sets.\n" + str(e) + "\n", _connection)
+		Debug.Log("Failed to export custom pronoun sets.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__, exception = e)
+		return
+
+def _ImportPronounSets (fileName: str = PronounSetPacks.DefaultPackFileName, replaceExisting: bool = True, _connection: int = None) -> None:
+	try:
+		packFilePath = PronounSetPacks.GetPackFilePath(fileName)  # type: str
+		importResult = PronounSetPacks.ImportPack(packFilePath, replaceExisting = replaceExisting)  # type: PronounSetPacks.ImportResult
+
+		commands.cheat_output("Imported custom pronoun sets from '%s'. Added: %s, replaced: %s, kept existing: %s, invalid sets: %s, invalid pairs: %s\n" %
+							  (packFilePath, importResult.AddedCount, importResult.ReplacedCount, importResult.KeptCount, importResult.InvalidCount, importResult.DroppedPairCount), _connection)
+	except Exception as e:
+		commands.cheat_output("Failed to import custom pronoun sets.\n" + str(e) + "\n", _connection)
+		Debug.Log("Failed to import custom pronoun sets.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__, exception = e)
+		return
+
 _Setup()
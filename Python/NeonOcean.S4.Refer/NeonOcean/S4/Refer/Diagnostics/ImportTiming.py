@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import importlib.abc
+import sys
+import time
+import typing
+
+from NeonOcean.S4.Main import LoadingShared
+
+# The mod's root package installs this before any other module from the mod is imported, everything imported after that is timed.
+
+_modulePrefix = "NeonOcean.S4.Refer."  # type: str
+
+class ModuleImportTime:
+	def __init__ (self, moduleName: str, importIndex: int):
+		"""
+		How long a module took to run its top level code when it was imported. Cumulative time includes the modules it imported while it ran, self time
+		does not, the same way python's '-X importtime' option reports them.
+		"""
+
+		self.ModuleName = moduleName  # type: str
+		self.ImportIndex = importIndex  # type: int
+
+		self.CumulativeSeconds = 0.0  # type: float
+		self.SelfSeconds = 0.0  # type: float
+
+class _TimingLoader(importlib.abc.Loader):
+	def __init__ (self, wrappedLoader):
+		self._wrappedLoader = wrappedLoader
+
+	def __getattr__ (self, name: str) -> typing.Any:
+		return getattr(self._wrappedLoader, name)
+
+	def create_module (self, spec):
+		return self._wrappedLoader.create_module(spec)
+
+	def exec_module (self, module) -> None:
+		_TimeImport(module.__name__, lambda: self._wrappedLoader.exec_module(module))
+
+class _LegacyTimingLoader(importlib.abc.Loader):
+	# The game's python only gives loaders from zip archives, such as the mod's .ts4script file, the old 'load_module' method. A loader with no
+	# 'exec_module' method makes python fall back to calling 'load_module', so this wrapper must not have one either.
+
+	def __init__ (self, wrappedLoader):
+		self._wrappedLoader = wrappedLoader
+
+	def __getattr__ (self, name: str) -> typing.Any:
+		return getattr(self._wrappedLoader, name)
+
+	def load_module (self, fullName: str):
+		return _TimeImport(fullName, lambda: self._wrappedLoader.load_module(fullName))
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+	def find_spec (self, fullName: str, path, target = None):
+		if not fullName.startswith(_modulePrefix):
+			return None
+
+		for finder in sys.meta_path:
+			if finder is self:
+				continue
+
+			findSpec = getattr(finder, "find_spec", None)
+
+			if findSpec is None:
+				continue
+
+			spec = findSpec(fullName, path, target)
+
+			if spec is None:
+				continue
+
+			if spec.loader is not None:
+				if hasattr(spec.loader, "exec_module"):
+					spec.loader = _TimingLoader(spec.loader)
+				elif hasattr(spec.loader, "load_module"):
+					spec.loader = _LegacyTimingLoader(spec.loader)
+
+			return spec
+
+		return None
+
+def Install () -> None:
+	"""
+	Start timing the imports of the mod's modules. Timing stops once the mod has started, by then every module will have been imported.
+	"""
+
+	if _finder in sys.meta_path:
+		return
+
+	sys.meta_path.insert(0, _finder)
+
+def Uninstall () -> None:
+	try:
+		sys.meta_path.remove(_finder)
+	except ValueError:
+		pass
+
+def GetImportTimes () -> typing.List[ModuleImportTime]:
+	return list(_importTimes)
+
+def FormatImportTimes (count: typing.Optional[int] = None) -> str:
+	"""
+	Get a table of the modules with the highest self import times, in milliseconds.
+	:param count: The number of modules to list, all modules will be listed if this is none.
+	:type count: typing.Optional[int]
+	"""
+
+	if len(_importTimes) == 0:
+		return "No import times have been recorded."
+
+	sortedImportTimes = sorted(_importTimes, key = lambda importTime: -importTime.SelfSeconds)  # type: typing.List[ModuleImportTime]
+
+	if count is not None:
+		sortedImportTimes = sortedImportTimes[:count]
+
+	reportLines = [ "%-60s %10s %12s" % ("Module", "Self ms", "Cumulative ms") ]  # type: typing.List[str]
+
+	for importTime in sortedImportTimes:  # type: ModuleImportTime
+		reportLines.append("%-60s %10.2f %12.2f" % (importTime.ModuleName, importTime.SelfSeconds * 1000, importTime.CumulativeSeconds * 1000))
+
+	reportLines.append("%-60s %10.2f" % ("Total (%s modules)" % len(_importTimes), sum(importTime.SelfSeconds for importTime in _importTimes) * 1000))
+
+	return "\n".join(reportLines)
+
+def _TimeImport (moduleName: str, importCallable: typing.Callable[[], typing.Any]) -> typing.Any:
+	importTime = ModuleImportTime(moduleName, len(_importTimes))  # type: ModuleImportTime
+	_importTimes.append(importTime)
+
+	_childSeconds.append(0.0)
+	startTime = time.perf_counter()  # type: float
+
+	try:
+		return importCallable()
+	finally:
+		importTime.CumulativeSeconds = time.perf_counter() - startTime
+		importTime.SelfSeconds = importTime.CumulativeSeconds - _childSeconds.pop()
+
+		if len(_childSeconds) != 0:
+			_childSeconds[-1] += importTime.CumulativeSeconds
+
+def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
+	if cause:
+		pass
+
+	Uninstall()
+
+_finder = _TimingFinder()  # type: _TimingFinder
+
+_importTimes = list()  # type: typing.List[ModuleImportTime]
+_childSeconds = list()  # type: typing.List[float]  # The time spent importing child modules for every module currently being imported, innermost last.
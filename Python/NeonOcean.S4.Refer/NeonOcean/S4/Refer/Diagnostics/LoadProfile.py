@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import time
+import typing
+
+from NeonOcean.S4.Main.Tools import Exceptions
+
+class StageProfile:
+	def __init__ (self):
+		self.Seconds = 0.0  # type: float
+		self.Bytes = 0  # type: int
+		self.Count = 0  # type: int
+
+	def ToDictionary (self) -> dict:
+		return {
+			"Seconds": round(self.Seconds, 6),
+			"Bytes": self.Bytes,
+			"Count": self.Count
+		}
+
+class LoadProfile:
+	def __init__ (self):
+		"""
+		Records how long each stage of loading the localization strings took, and how many bytes it handled, separately for each pack. Mod strings are
+		recorded under a source named 'Mods'.
+		"""
+
+		self.Sources = dict()  # type: typing.Dict[str, typing.Dict[str, StageProfile]]
+		self.TotalSeconds = 0.0  # type: float
+
+	def Measure (self, sourceName: str, stageName: str, byteCount: int = 0) -> _StageMeasurement:
+		"""
+		Get a context manager that adds the time spent inside it to this source's stage.
+		"""
+
+		return _StageMeasurement(self.GetStage(sourceName, stageName), byteCount)
+
+	def Record (self, sourceName: str, stageName: str, seconds: float, byteCount: int = 0) -> None:
+		stage = self.GetStage(sourceName, stageName)  # type: StageProfile
+
+		stage.Seconds += seconds
+		stage.Bytes += byteCount
+		stage.Count += 1
+
+	def GetStage (self, sourceName: str, stageName: str) -> StageProfile:
+		if not isinstance(sourceName, str):
+			raise Exceptions.IncorrectTypeException(sourceName, "sourceName", (str,))
+
+		if not isinstance(stageName, str):
+			raise Exceptions.IncorrectTypeException(stageName, "stageName", (str,))
+
+		sourceStages = self.Sources.setdefault(sourceName, dict())  # type: typing.Dict[str, StageProfile]
+		stage = sourceStages.get(stageName, None)  # type: typing.Optional[StageProfile]
+
+		if stage is None:
+			stage = StageProfile()
+			sourceStages[stageName] = stage
+
+		return stage
+
+	def GetStageTotals (self) -> typing.Dict[str, StageProfile]:
+		stageTotals = dict()  # type: typing.Dict[str, StageProfile]
+
+		for sourceStages in self.Sources.values():  # type: typing.Dict[str, StageProfile]
+			for stageName, stage in sourceStages.items():  # type: str, StageProfile
+				stageTotal = stageTotals.setdefault(stageName, StageProfile())  # type: StageProfile
+				stageTotal.Seconds += stage.Seconds
+				stageTotal.Bytes += stage.Bytes
+				stageTotal.Count += stage.Count
+
+		return stageTotals
+
+	def ToDictionary (self) -> dict:
+		return {
+			"TotalSeconds": round(self.TotalSeconds, 6),
+			"StageTotals": { stageName: stage.ToDictionary() for stageName, stage in self.GetStageTotals().items() },
+			"Sources": {
+				sourceName: { stageName: stage.ToDictionary() for stageName, stage in sourceStages.items() }
+				for sourceName, sourceStages in self.Sources.items()
+			}
+		}
+
+	def Write (self, filePath: str) -> None:
+		with open(filePath, "w+") as profileFile:
+			profileFile.write(json.JSONEncoder(indent = "\t").encode(self.ToDictionary()))
+
+class _StageMeasurement:
+	def __init__ (self, stage: StageProfile, byteCount: int):
+		self._stage = stage  # type: StageProfile
+		self._byteCount = byteCount  # type: int
+		self._startTime = 0.0  # type: float
+
+	def __enter__ (self) -> _StageMeasurement:
+		self._startTime = time.perf_counter()
+		return self
+
+	def __exit__ (self, *args) -> bool:
+		self._stage.Seconds += time.perf_counter() - self._startTime
+		self._stage.Bytes += self._byteCount
+		self._stage.Count += 1
+		return False
+
+	def AddBytes (self, byteCount: int) -> None:
+		"""
+		Add to the bytes this measurement handled, for stages that don't know how many bytes they will handle until they are done.
+		"""
+
+		self._byteCount += byteCount
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import itertools
+import sys
+import typing
+
+from NeonOcean.S4.Main.Tools import Exceptions
+from NeonOcean.S4.Refer import GenderedLanguage, GenderedLanguageHandler, LanguageHandlers, LocalizationSources, PronounSets
+from NeonOcean.S4.Refer.Tools import StringTable
+
+SampleSize = 500  # type: int  # The number of entries measured in a large container, the size of the rest is extrapolated from these.
+
+class MemoryEstimate:
+	def __init__ (self, name: str, entryCount: int, byteCount: int, sampled: bool):
+		"""
+		An estimate of the memory a structure holds. Estimates count the containers and what they hold directly, objects shared with the game, such as sim
+		infos held as tokens, are not counted.
+		"""
+
+		self.Name = name  # type: str
+		self.EntryCount = entryCount  # type: int
+		self.ByteCount = byteCount  # type: int
+		self.Sampled = sampled  # type: bool
+
+def EstimateMappingSize (mapping: typing.Mapping, sampleSize: int = SampleSize) -> typing.Tuple[int, bool]:
+	"""
+	Estimate the bytes held by a mapping, its keys and its values, with the sizes of large mappings extrapolated from evenly spaced samples.
+	:return: The estimated number of bytes and whether or not the estimate was sampled.
+	"""
+
+	if not isinstance(sampleSize, int):
+		raise Exceptions.IncorrectTypeException(sampleSize, "sampleSize", (int,))
+
+	entryCount = len(mapping)  # type: int
+	containerSize = sys.getsizeof(mapping)  # type: int
+
+	if entryCount == 0:
+		return containerSize, False
+
+	sampleStep = max(1, entryCount // sampleSize)  # type: int
+	sampledItems = list(itertools.islice(mapping.items(), 0, None, sampleStep))  # type: list
+
+	sampledSize = sum(sys.getsizeof(key) + _GetShallowValueSize(value) for key, value in sampledItems)  # type: int
+
+	return containerSize + round(sampledSize / len(sampledItems) * entryCount), sampleStep != 1
+
+def EstimateDeepSize (value: typing.Any) -> int:
+	"""
+	Get the bytes held by a value and everything it contains, following dictionaries, lists, tuples and sets. Only use this on small structures.
+	"""
+
+	return _GetDeepSize(value, set())
+
+def GetLanguageEstimates () -> typing.List[MemoryEstimate]:
+	"""
+	Estimate the memory held by the loaded localization string tables, the create tokens patch's tracking and the pronoun sets.
+	"""
+
+	estimates = list()  # type: typing.List[MemoryEstimate]
+
+	# noinspection PyProtectedMember
+	estimates.append(_EstimateTable("All localization strings", GenderedLanguage._allLocalizationStrings))
+	# noinspection PyProtectedMember
+	estimates.append(_EstimateTable("Gendered localization strings", GenderedLanguage._genderedLocalizationStrings))
+
+	for sourceTableName, sourceTable in (("All string sources", LocalizationSources.AllLocalizationStringSources),
+										 ("Gendered string sources", LocalizationSources.GenderedLocalizationStringSources)):  # type: str, LocalizationSources.SourceTable
+		estimates.append(MemoryEstimate(sourceTableName, sourceTable.GetKeyCount(), sourceTable.GetMemorySize(), False))
+
+	# noinspection PyProtectedMember
+	trueValues = GenderedLanguageHandler._trueLocalizationStringValues  # type: dict
+	trueValuesSize, trueValuesSampled = EstimateMappingSize(trueValues)  # type: int, bool
+	estimates.append(MemoryEstimate("Create tokens true values", len(trueValues), trueValuesSize, trueValuesSampled))
+
+	# noinspection PyProtectedMember
+	deletionTimers = GenderedLanguageHandler._trueLocalizationStringValueDeletionTimers  # type: list
+	deletionTimersSize = sys.getsizeof(deletionTimers) + sum(sys.getsizeof(deletionTimer) + sys.getsizeof(getattr(deletionTimer, "__dict__", None)) for deletionTimer in deletionTimers)  # type: int
+	estimates.append(MemoryEstimate("Create tokens deletion timers", len(deletionTimers), deletionTimersSize, False))
+
+	customPronounSets = PronounSets.GetCustomPronounSets()  # type: dict
+	estimates.append(MemoryEstimate("Custom pronoun sets", len(customPronounSets), EstimateDeepSize(customPronounSets), False))
+
+	try:
+		languageHandler = LanguageHandlers.GetCurrentLanguageHandler()  # type: typing.Optional[typing.Type[LanguageHandlers.LanguageHandlerBase]]
+	except Exception:
+		languageHandler = None
+
+	if languageHandler is not None:
+		standardPronounSets = languageHandler.GetStandardPronounSets()  # type: dict
+		estimates.append(MemoryEstimate("Standard pronoun sets (built per call)", len(standardPronounSets), EstimateDeepSize(standardPronounSets), False))
+
+	return estimates
+
+def FormatEstimates (estimates: typing.List[MemoryEstimate]) -> str:
+	reportLines = [ "%-40s %10s %14s" % ("Name", "Entries", "Bytes") ]  # type: typing.List[str]
+
+	for estimate in estimates:  # type: MemoryEstimate
+		reportLines.append("%-40s %10d %14s" % (estimate.Name, estimate.EntryCount, ("~%d" if estimate.Sampled else "%d") % estimate.ByteCount))
+
+	reportLines.append("%-40s %10s %14d" % ("Total", "", sum(estimate.ByteCount for estimate in estimates)))
+
+	return "\n".join(reportLines)
+
+def _EstimateTable (name: str, table: typing.Union[typing.Dict[int, str], StringTable.CompactStringTable]) -> MemoryEstimate:
+	if isinstance(table, StringTable.CompactStringTable):
+		return MemoryEstimate(name, len(table), table.GetMemorySize(), False)
+
+	tableSize, tableSampled = EstimateMappingSize(table)  # type: int, bool
+	return MemoryEstimate(name, len(table), tableSize, tableSampled)
+
+def _GetShallowValueSize (value: typing.Any) -> int:
+	# Tuples are followed one level, so the true values' hash and token tuple are counted but the tokens, which the game owns, are not.
+	valueSize = sys.getsizeof(value)  # type: int
+
+	if isinstance(value, tuple):
+		valueSize += sum(sys.getsizeof(valueItem) for valueItem in value)
+
+	return valueSize
+
+def _GetDeepSize (value: typing.Any, seenIDs: typing.Set[int]) -> int:
+	if id(value) in seenIDs:
+		return 0
+
+	seenIDs.add(id(value))
+	valueSize = sys.getsizeof(value)  # type: int
+
+	if isinstance(value, dict):
+		for key, keyValue in value.items():
+			valueSize += _GetDeepSize(key, seenIDs) + _GetDeepSize(keyValue, seenIDs)
+	elif isinstance(value, (list, tuple, set, frozenset)):
+		for item in value:
+			valueSize += _GetDeepSize(item, seenIDs)
+
+	return valueSize
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+import typing
+
+from NeonOcean.S4.Main import LoadingShared
+from NeonOcean.S4.Main.Tools import Exceptions
+from NeonOcean.S4.Refer import This
+
+class StackSampler:
+	MaximumStackDepth = 128  # type: int
+
+	def __init__ (self, moduleNamePrefix: str, interval: float = 0.01):
+		"""
+		Periodically samples the stack of the thread that started it from a background thread. Only stacks that pass through a module whose name starts
+		with the prefix are kept, and each is trimmed to start at the outermost of those modules' frames. Identical stacks are counted rather than stored,
+		so a long capture stays small.
+
+		:param moduleNamePrefix: Stacks are only kept if one of their frames belongs to a module whose name starts with this.
+		:type moduleNamePrefix: str
+		:param interval: The time between samples, in seconds.
+		:type interval: float
+		"""
+
+		if not isinstance(moduleNamePrefix, str):
+			raise Exceptions.IncorrectTypeException(moduleNamePrefix, "moduleNamePrefix", (str,))
+
+		if not isinstance(interval, (float, int)):
+			raise Exceptions.IncorrectTypeException(interval, "interval", (float, int))
+
+		if interval <= 0:
+			raise ValueError("The interval must be greater than zero.")
+
+		self.ModuleNamePrefix = moduleNamePrefix  # type: str
+		self.Interval = interval  # type: float
+
+		self.SampleCount = 0  # type: int
+		self.SkippedSampleCount = 0  # type: int  # Samples taken while the target thread was outside the prefixed modules.
+		self.Stacks = dict()  # type: typing.Dict[typing.Tuple[str, ...], int]
+
+		self._targetThreadIdentifier = None  # type: typing.Optional[int]
+		self._samplingThread = None  # type: typing.Optional[threading.Thread]
+		self._stopEvent = threading.Event()  # type: threading.Event
+		self._frameNames = dict()  # type: typing.Dict[typing.Any, str]
+
+	@property
+	def IsRunning (self) -> bool:
+		return self._samplingThread is not None
+
+	def Start (self) -> None:
+		"""
+		Start sampling the calling thread.
+		"""
+
+		if self.IsRunning:
+			return
+
+		self._targetThreadIdentifier = threading.get_ident()
+		self._stopEvent.clear()
+
+		self._samplingThread = threading.Thread(target = self._SamplingLoop, name = This.Mod.Namespace + ".StackSampler", daemon = True)
+		self._samplingThread.start()
+
+	def Stop (self) -> None:
+		if not self.IsRunning:
+			return
+
+		self._stopEvent.set()
+		self._samplingThread.join()
+		self._samplingThread = None
+
+	def GetCollapsedStacks (self) -> typing.List[str]:
+		"""
+		Get the sampled stacks in the collapsed stack format flame graph tools read, one line per distinct stack with its frames separated by semicolons,
+		outermost first, followed by the number of samples that landed on it.
+		"""
+
+		return [ ";".join(stack) + " " + str(stackCount) for stack, stackCount in sorted(self.Stacks.items(), key = lambda stackItem: -stackItem[1]) ]
+
+	def WriteCollapsedStacks (self, filePath: str) -> None:
+		with open(filePath, "w+") as stacksFile:
+			stacksFile.write("\n".join(self.GetCollapsedStacks()))
+
+	def _SamplingLoop (self) -> None:
+		while not self._stopEvent.wait(self.Interval):
+			self._Sample()
+
+	def _Sample (self) -> None:
+		targetFrame = sys._current_frames().get(self._targetThreadIdentifier, None)
+
+		if targetFrame is None:
+			return
+
+		self.SampleCount += 1
+
+		frames = list()  # type: list
+		outermostScopedFrameIndex = -1  # type: int
+
+		while targetFrame is not None and len(frames) < self.MaximumStackDepth:
+			frames.append(targetFrame)
+
+			if targetFrame.f_globals.get("__name__", "").startswith(self.ModuleNamePrefix):
+				outermostScopedFrameIndex = len(frames) - 1
+
+			targetFrame = targetFrame.f_back
+
+		if outermostScopedFrameIndex == -1:
+			self.SkippedSampleCount += 1
+			return
+
+		stack = tuple(self._GetFrameName(frame) for frame in reversed(frames[:outermostScopedFrameIndex + 1]))  # type: typing.Tuple[str, ...]
+		self.Stacks[stack] = self.Stacks.get(stack, 0) + 1
+
+	def _GetFrameName (self, frame) -> str:
+		# Frame names are cached by code object, so building one only happens the first time a function is sampled.
+		frameName = self._frameNames.get(frame.f_code, None)  # type: typing.Optional[str]
+
+		if frameName is None:
+			frameName = "%s.%s" % (frame.f_globals.get("__name__", "?"), frame.f_code.co_name)
+			self._frameNames[frame.f_code] = frameName
+
+		return frameName
+
+def StartSampling (interval: float = 0.01) -> StackSampler:
+	"""
+	Start sampling the calling thread for this mod's modules, replacing any finished capture. Nothing happens if a capture is already running.
+	"""
+
+	global _activeSampler
+
+	if _activeSampler is not None and _activeSampler.IsRunning:
+		return _activeSampler
+
+	_activeSampler = StackSampler(This.Mod.Namespace, interval = interval)
+	_activeSampler.Start()
+	return _activeSampler
+
+def StopSampling () -> typing.Optional[StackSampler]:
+	"""
+	Stop the running capture.
+	:return: The sampler that was stopped, or None if nothing was being sampled.
+	"""
+
+	if _activeSampler is None or not _activeSampler.IsRunning:
+		return None
+
+	_activeSampler.Stop()
+	return _activeSampler
+
+def IsSampling () -> bool:
+	return _activeSampler is not None and _activeSampler.IsRunning
+
+def GetCaptureFileName () -> str:
+	return "Sampled Stacks %s.txt" % time.strftime("%Y-%m-%d %H-%M-%S")
+
+def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
+	if cause:
+		pass
+
+	StopSampling()
+
+_activeSampler = None  # type: typing.Optional[StackSampler]
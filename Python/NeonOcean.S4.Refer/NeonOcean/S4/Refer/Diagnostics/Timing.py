@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import array
+import functools
+import time
+import typing
+
+from NeonOcean.S4.Main.Tools import Exceptions
+
+class TimingCounter:
+	BucketCount = 48  # type: int  # Bucket 'n' holds durations of at least 2 ^ (n - 1) nanoseconds and less than 2 ^ n, the last bucket holds everything longer.
+
+	def __init__ (self, name: str):
+		"""
+		Aggregates the durations of a hot path. Durations are counted in fixed power of two buckets, so recording one never allocates a list entry and
+		the counter's size never grows.
+		"""
+
+		if not isinstance(name, str):
+			raise Exceptions.IncorrectTypeException(name, "name", (str,))
+
+		self.Name = name  # type: str
+
+		self.Count = 0  # type: int
+		self.TotalNanoseconds = 0  # type: int
+		self.MaximumNanoseconds = 0  # type: int
+
+		self._buckets = array.array("Q", bytes(8 * self.BucketCount))  # type: array.array
+
+	def Record (self, durationNanoseconds: int) -> None:
+		bucketIndex = durationNanoseconds.bit_length()  # type: int
+
+		if bucketIndex >= self.BucketCount:
+			bucketIndex = self.BucketCount - 1
+
+		self._buckets[bucketIndex] += 1
+
+		self.Count += 1
+		self.TotalNanoseconds += durationNanoseconds
+
+		if durationNanoseconds > self.MaximumNanoseconds:
+			self.MaximumNanoseconds = durationNanoseconds
+
+	def GetPercentile (self, percentile: typing.Union[float, int]) -> int:
+		"""
+		Get an upper bound of the duration, in nanoseconds, that this percent of recorded durations fall under. Because durations are bucketed, this can be
+		up to twice the true value.
+		"""
+
+		if self.Count == 0:
+			return 0
+
+		targetCount = self.Count * percentile / 100  # type: float
+		cumulativeCount = 0  # type: int
+
+		for bucketIndex in range(self.BucketCount):  # type: int
+			cumulativeCount += self._buckets[bucketIndex]
+
+			if cumulativeCount >= targetCount:
+				return min((1 << bucketIndex) - 1, self.MaximumNanoseconds)
+
+		return self.MaximumNanoseconds
+
+	def GetBuckets (self) -> typing.List[int]:
+		return list(self._buckets)
+
+	def Reset (self) -> None:
+		self.Count = 0
+		self.TotalNanoseconds = 0
+		self.MaximumNanoseconds = 0
+
+		for bucketIndex in range(self.BucketCount):  # type: int
+			self._buckets[bucketIndex] = 0
+
+def GetCounter (name: str) -> TimingCounter:
+	"""
+	Get the timing counter with this name, creating it if it doesn't already exist.
+	"""
+
+	counter = _counters.get(name, None)  # type: typing.Optional[TimingCounter]
+
+	if counter is None:
+		counter = TimingCounter(name)
+		_counters[name] = counter
+
+	return counter
+
+def GetAllCounters () -> typing.List[TimingCounter]:
+	return list(_counters.values())
+
+def ResetAllCounters () -> None:
+	for counter in _counters.values():  # type: TimingCounter
+		counter.Reset()
+
+def Timed (counterName: str) -> typing.Callable[[typing.Callable], typing.Callable]:
+	"""
+	Decorate a function so every call's duration is recorded to the timing counter with this name.
+	"""
+
+	counter = GetCounter(counterName)  # type: TimingCounter
+
+	def decorator (timedFunction: typing.Callable) -> typing.Callable:
+		@functools.wraps(timedFunction)
+		def timedWrapper (*args, **kwargs):
+			startTime = time.perf_counter_ns()  # type: int
+
+			try:
+				return timedFunction(*args, **kwargs)
+			finally:
+				counter.Record(time.perf_counter_ns() - startTime)
+
+		return timedWrapper
+
+	return decorator
+
+def FormatCounters () -> str:
+	"""
+	Get a table of every counter that has recorded something. Times are in microseconds, percentiles are bucket upper bounds.
+	"""
+
+	reportLines = [ "%-42s %10s %12s %10s %10s %10s %10s %10s" % ("Name", "Count", "Total ms", "Mean", "P50", "P90", "P99", "Max") ]  # type: typing.List[str]
+
+	for counter in sorted(_counters.values(), key = lambda sortingCounter: sortingCounter.Name):  # type: TimingCounter
+		if counter.Count == 0:
+			continue
+
+		reportLines.append("%-42s %10d %12.2f %10.1f %10.1f %10.1f %10.1f %10.1f" % (
+			counter.Name,
+			counter.Count,
+			counter.TotalNanoseconds / 1000000,
+			counter.TotalNanoseconds / counter.Count / 1000,
+			counter.GetPercentile(50) / 1000,
+			counter.GetPercentile(90) / 1000,
+			counter.GetPercentile(99) / 1000,
+			counter.MaximumNanoseconds / 1000
+		))
+
+	if len(reportLines) == 1:
+		return "No timings have been recorded."
+
+	return "\n".join(reportLines)
+
+_counters = dict()  # type: typing.Dict[str, TimingCounter]
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import numbers
+import time
+import typing
+
+from NeonOcean.S4.Main import LoadingShared
+from NeonOcean.S4.Refer import LanguageHandlers, PronounSettings
+from protocolbuffers import Localization_pb2
+from sims import sim_info
+
+CorpusVersion = 1  # type: int
+
+MaximumLayoutCount = 50000  # type: int  # Calls with layouts past this many distinct ones are counted as dropped, so a long recording can't grow without bound.
+
+Recording = False  # type: bool  # Checked by the create tokens patch before every call, recording does nothing unless this is true.
+
+DroppedCount = 0  # type: int
+
+# Records the shape of the gendered strings the game formats through the create tokens patch, so the correction pipeline can later be replayed offline
+# over a real workload. Only the string's key, its text and a description of each token are kept. Sim tokens are reduced to their gender, the kind of
+# pronoun set selected for them and their fallback, names, ids and custom set contents are never recorded.
+
+def StartRecording () -> None:
+	global Recording, DroppedCount
+
+	_layouts.clear()
+	_texts.clear()
+	DroppedCount = 0
+
+	Recording = True
+
+def StopRecording () -> None:
+	global Recording
+	Recording = False
+
+def Record (textKey: int, text: str, tokens: typing.Sequence) -> None:
+	global DroppedCount
+
+	layoutKey = (textKey, tuple(_DescribeToken(token) for token in tokens))  # type: typing.Tuple[int, typing.Tuple[str, ...]]
+	layoutCount = _layouts.get(layoutKey, None)  # type: typing.Optional[int]
+
+	if layoutCount is None:
+		if len(_layouts) >= MaximumLayoutCount:
+			DroppedCount += 1
+			return
+
+		_layouts[layoutKey] = 1
+		_texts[textKey] = text
+	else:
+		_layouts[layoutKey] = layoutCount + 1
+
+def GetCallCount () -> int:
+	return sum(_layouts.values())
+
+def GetLayoutCount () -> int:
+	return len(_layouts)
+
+def GetCorpus () -> dict:
+	"""
+	Get everything recorded so far as a corpus the automation replay tool can read. Records are sorted from most to least called.
+	"""
+
+	return {
+		"Version": CorpusVersion,
+		"DroppedCount": DroppedCount,
+		"Texts": { str(textKey): text for textKey, text in _texts.items() },
+		"Records": [
+			[ textKey, list(tokenDescriptions), layoutCount ]
+			for (textKey, tokenDescriptions), layoutCount in sorted(_layouts.items(), key = lambda layoutItem: -layoutItem[1])
+		]
+	}
+
+def WriteCorpus (filePath: str) -> None:
+	with open(filePath, "w+") as corpusFile:
+		corpusFile.write(json.JSONEncoder(separators = (",", ":")).encode(GetCorpus()))
+
+def GetCorpusFileName () -> str:
+	return "Create Tokens Corpus %s.json" % time.strftime("%Y-%m-%d %H-%M-%S")
+
+def _DescribeToken (token) -> str:
+	if isinstance(token, sim_info.SimInfo):
+		return "Sim|%s|%s|%s" % (
+			"F" if token.is_female else "M",
+			_DescribeSelection(PronounSettings.PronounSetSelection.Get(str(token.id))),
+			PronounSettings.PronounFallback.Get(str(token.id))
+		)
+
+	if isinstance(token, bool):
+		return "Other"
+
+	if isinstance(token, numbers.Integral):
+		return "Integer"
+
+	if isinstance(token, numbers.Number):
+		return "Number"
+
+	if isinstance(token, str):
+		return "String"
+
+	if isinstance(token, Localization_pb2.LocalizedString):
+		return "LocalizedString"
+
+	return "Other"
+
+def _DescribeSelection (selection: str) -> str:
+	if selection == "":
+		return "Default"
+	elif selection == "0":
+		return "Female"
+	elif selection == "1":
+		return "Male"
+
+	try:
+		languageHandler = LanguageHandlers.GetCurrentLanguageHandler()  # type: typing.Optional[typing.Type[LanguageHandlers.LanguageHandlerBase]]
+	except Exception:
+		languageHandler = None
+
+	if languageHandler is not None:
+		for standardSetIdentifier in languageHandler.GetStandardPronounSets().keys():  # type: str
+			if standardSetIdentifier.lower() == selection.lower():
+				return "Standard:" + standardSetIdentifier
+
+	return "Custom"
+
+def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
+	if cause:
+		pass
+
+	StopRecording()
+
+_layouts = dict()  # type: typing.Dict[typing.Tuple[int, typing.Tuple[str, ...]], int]
+_texts = dict()  # type: typing.Dict[int, str]
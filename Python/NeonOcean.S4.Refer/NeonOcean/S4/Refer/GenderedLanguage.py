@@ -7,6 +7,8 @@ import typing
 from NeonOcean.S4.Main import Debug
 from NeonOcean.S4.Main.Tools import Exceptions, Python, Types
 from NeonOcean.S4.Refer import LanguageHandlers, PronounSets, PronounSettings, This
+from NeonOcean.S4.Refer.Diagnostics import Timing
+from NeonOcean.S4.Refer.Tools import StringTable
 from protocolbuffers import Localization_pb2
 from sims import sim_info
 
@@ -47,6 +49,7 @@ def GetLocalizationStringText (localizationStringID: int) -> typing.Optional[str
 
 	return _allLocalizationStrings.get(localizationStringID, None)
 
+@Timing.Timed("GenderedLanguage.ResolveSTBLText")
 def ResolveSTBLText (text: str, tokens: typing.Sequence) -> typing.Optional[str]:
 	"""
 	Get the true text this STBL string combined with these tokens. This will return none if the text could not be resolved, or if the current language
@@ -76,6 +79,7 @@ def ResolveSTBLText (text: str, tokens: typing.Sequence) -> typing.Optional[str]
 
 	return resolvedText
 
+@Timing.Timed("GenderedLanguage.CorrectGenderedSTBLText")
 def CorrectGenderedSTBLText (textKey: int, text: str, tokens: typing.Sequence) -> typing.Optional[str]:
 	"""
 	Correct this text for these tokens. This will return none if the default, unmodified text should be used instead.
@@ -256,52 +260,29 @@ def _CorrectGenderedTagPairs (textKey: int, text: str, tokens: typing.Sequence,
 				elif tagTokenSetSelection == "1":  # Male selection
 					addMaleText()
 				else:
-					allPronounSets = PronounSets.GetAllPronounSets(languageHandler)  # type: dict
-					allPronounSets = { loweringSetIdentifier.lower(): loweringSetValue for loweringSetIdentifier, loweringSetValue in allPronounSets.items() }
-					tagTokenSetContainer = allPronounSets.get(tagTokenSetSelection, None)  # type: typing.Optional[dict]
+					tagTokenSet = PronounSets.GetCompiledPronounSet(tagTokenSetSelection, languageHandler)  # type: typing.Optional[PronounSets.CompiledPronounSet]
 
-					if tagTokenSetContainer is None:
+					if tagTokenSet is None:
 						addDefaultText()
 					else:
 						tagPairIdentifier = _GetGenderTagPairIdentifier(femaleText, maleText, languageHandler)  # type: str
-
-						tagTokenSet = tagTokenSetContainer["Set"]
-
-						tagTokenSetPairValue = tagTokenSet.get(tagPairIdentifier, None)  # type: typing.Union[None, int, str, dict]
+						tagTokenSetPairValue = tagTokenSet.Pairs.get(tagPairIdentifier, None)  # type: typing.Union[None, int, str, PronounSets.CompiledPairCases]
 
 						if tagTokenSetPairValue is None:  # Use default for this tag pair
 							addGenderText(tagTokenFallback)
 						elif isinstance(tagTokenSetPairValue, int):
 							addGenderText(tagTokenSetPairValue)
 						elif isinstance(tagTokenSetPairValue, str):
-							if tagTokenSetPairValue == "" or tagTokenSetPairValue.isspace():
-								addGenderText(tagTokenFallback)
-							else:
-								addSpecificText(tagTokenSetPairValue)
-						elif isinstance(tagTokenSetPairValue, dict):
-							tagTokenSetCasesDefault = tagTokenSetPairValue.get("Default", None)  # type: typing.Optional[str]
-							tagTokenSetCases = tagTokenSetPairValue["Cases"]  # type: dict
-
-							tagTokenSetChangeCase = tagTokenSetCases.get(textKey, None)  # type: typing.Optional[typing.List[str]]
-
-							if tagTokenSetChangeCase is None:
-								if tagTokenSetCasesDefault is not None:
-									addSpecificText(tagTokenSetCasesDefault)
-								else:
-									addGenderText(tagTokenFallback)
-							else:
-								try:
-									tagTokenSetChangeCaseText = tagTokenSetChangeCase[genderedTagGroupIndex]
-								except IndexError:
-									if tagTokenSetCasesDefault is not None:
-										addSpecificText(tagTokenSetCasesDefault)
-									else:
-										addGenderText(tagTokenFallback)
-								else:
-									addSpecificText(tagTokenSetChangeCaseText)
+							addSpecificText(tagTokenSetPairValue)
 						else:
-							Debug.Log("Unknown gendered pair set value for '%s' in the set '%s'." % (tagPairIdentifier, tagTokenSetSelection), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":" + str(Python.GetLineNumber()), lockThreshold = 2)
-							addGenderText(tagTokenFallback)
+							tagTokenSetChangeCase = tagTokenSetPairValue.Cases.get(textKey, None)  # type: typing.Optional[typing.Tuple[str, ...]]
+
+							if tagTokenSetChangeCase is not None and genderedTagGroupIndex < len(tagTokenSetChangeCase):
+								addSpecificText(tagTokenSetChangeCase[genderedTagGroupIndex])
+							elif tagTokenSetPairValue.Default is not None:
+								addSpecificText(tagTokenSetPairValue.Default)
+							else:
+								addGenderText(tagTokenFallback)
 
 		uncorrectedTextStartPosition = nextUnfixedTextStartPosition
 
@@ -509,4 +490,4 @@ HasTooManyGenderedTermsPattern = re.compile("{[FMU][0-9]+\.[^\}]+\}"
 											re.RegexFlag.IGNORECASE)  # Used to test an entry to see if the matched section has too many gendered terms in a row. This is only used if more than 2 open brackets and 2 closed brackets exist in the original match.
 
 _allLocalizationStrings = dict()  # type: typing.Dict[int, str]
-_genderedLocalizationStrings = dict()  # type: typing.Dict[int, str]
+_genderedLocalizationStrings = dict()  # type: typing.Union[typing.Dict[int, str], StringTable.CompactStringTable]  # Replaced by a compact table once every string has been loaded.
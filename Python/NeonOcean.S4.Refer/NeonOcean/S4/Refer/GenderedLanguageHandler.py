@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import os
 import time
 import typing
@@ -8,8 +7,9 @@ import typing
 from NeonOcean.S4.Main import Debug, Director, Language, Paths, LoadingShared, Reporting
 from NeonOcean.S4.Main.Tools import Exceptions, Patcher, Python, Timer, Version
 from NeonOcean.S4.Main.UI import Notifications
-from NeonOcean.S4.Refer import GenderedLanguage, LanguageHandlers, This
-from NeonOcean.S4.Refer.Tools import Package, STBL
+from NeonOcean.S4.Refer import GenderedLanguage, LanguageCache, LanguageHandlers, LocalizationSources, Settings, This
+from NeonOcean.S4.Refer.Diagnostics import LoadProfile, Timing, TokenRecorder
+from NeonOcean.S4.Refer.Tools import Package, STBL, StringTable
 from protocolbuffers import Localization_pb2
 from server import client
 import paths as Sims4Paths
@@ -74,54 +74,24 @@ PacksWithExpectedLanguageData = [
 	Sims4Common.Pack.SP20,
 ]
 
-LanguageCacheDirectoryPath = os.path.join(This.Mod.PersistentPath, "Language Cache")  # type: str
-GameLanguageCacheDirectoryPath = os.path.join(LanguageCacheDirectoryPath, "Game")  # type: str
+LocalLanguageCache = LanguageCache.LanguageCacheLocation(This.Mod.PersistentPath)  # type: LanguageCache.LanguageCacheLocation
 
-GenderedLanguageCacheDirectoryPath = os.path.join(This.Mod.PersistentPath, "Gendered Language Cache")  # type: str
-GameGenderedLanguageCacheDirectoryPath = os.path.join(GenderedLanguageCacheDirectoryPath, "Game")  # type: str
+LanguageCacheDirectoryPath = LocalLanguageCache.LanguageCacheDirectoryPath  # type: str
+GameLanguageCacheDirectoryPath = LocalLanguageCache.GameLanguageCacheDirectoryPath  # type: str
+
+GenderedLanguageCacheDirectoryPath = LocalLanguageCache.GenderedLanguageCacheDirectoryPath  # type: str
+GameGenderedLanguageCacheDirectoryPath = LocalLanguageCache.GameGenderedLanguageCacheDirectoryPath  # type: str
 
 GameFileStructureFileName = "Game File Structure.txt"  # type: str
 GameFileStructureFilePath = os.path.join(Paths.UserDataPath, GameFileStructureFileName)  # type: str
 # The path used to log the game program file structure, this file is created for debugging purposes and only appears when we couldn't find a language package file.
 
-class _LanguageCacheInfo:
-	_cachedHandlerLanguageSavingKey = "CachedHandlerLanguage"  # type: str
-	_cachedHandlerVersionSavingKey = "CachedHandlerVersion"  # type: str
-	_packageModifiedTimeSavingKey = "PackageModifiedTime"  # type: str
-
-	def __init__ (self, cachedHandlerLanguage: typing.Optional[int], cachedHandlerVersion: typing.Optional[Version.Version], packageModifiedTime: typing.Optional[float]):
-		if not isinstance(cachedHandlerLanguage, int) and cachedHandlerLanguage is not None:
-			raise Exceptions.IncorrectTypeException(cachedHandlerLanguage, "cachedHandlerLanguage", (int, None))
-
-		if not isinstance(cachedHandlerVersion, Version.Version) and cachedHandlerVersion is not None:
-			raise Exceptions.IncorrectTypeException(cachedHandlerVersion, "cachedHandlerVersion", (Version.Version, None))
-
-		if not isinstance(packageModifiedTime, (float, int)) and packageModifiedTime is not None:
-			raise Exceptions.IncorrectTypeException(packageModifiedTime, "packageModifiedTime", (float, int, None))
-
-		self.CachedHandlerLanguage = cachedHandlerLanguage  # type: typing.Optional[int]
-		self.CachedHandlerVersion = cachedHandlerVersion  # type: typing.Optional[Version.Version]
-		self.PackageModifiedTime = packageModifiedTime  # type: typing.Optional[float]
-
-	@classmethod
-	def FromDictionary (cls, sourceDictionary: dict) -> _LanguageCacheInfo:
-		cachedHandlerLanguage = sourceDictionary.get(cls._cachedHandlerLanguageSavingKey, None)  # type: typing.Optional[int]
-		cachedHandlerVersionString = sourceDictionary.get(cls._cachedHandlerVersionSavingKey, None)  # type: typing.Optional[str]
-
-		if cachedHandlerVersionString is not None:
-			cachedHandlerVersion = Version.Version(cachedHandlerVersionString)  # type: typing.Optional[Version.Version]
-		else:
-			cachedHandlerVersion = None  # type: typing.Optional[Version.Version]
-
-		packageModifiedTime = sourceDictionary.get(cls._packageModifiedTimeSavingKey, None)  # type: typing.Optional[float]
-		return cls(cachedHandlerLanguage, cachedHandlerVersion, packageModifiedTime)
+ModsLoadProfileSourceName = "Mods"  # type: str
+GenderedTablesLoadProfileSourceName = "Gendered Tables"  # type: str
 
-	def ToDictionary (self) -> dict:
-		return {
-			self._cachedHandlerLanguageSavingKey: self.CachedHandlerLanguage,
-			self._cachedHandlerVersionSavingKey: str(self.CachedHandlerVersion),
-			self._packageModifiedTimeSavingKey: self.PackageModifiedTime
-		}
+LoadProfileFileName = "Language Load Profile.json"  # type: str
+LoadProfileFilePath = os.path.join(Paths.UserDataPath, LoadProfileFileName)  # type: str
+# The path used to record how long each pack's localization strings took to load, broken down by stage. This is written every time the strings are loaded.
 
 class _Announcer(Director.Announcer):
 	Host = This.Mod
@@ -132,18 +102,39 @@ class _Announcer(Director.Announcer):
 	def OnClientConnect (cls, clientReference: client.Client) -> None:
 		if not cls._onClientConnectTriggered:
 			searchStartTime = time.time()  # type: float
+			searchLoadProfile = LoadProfile.LoadProfile()  # type: LoadProfile.LoadProfile
+			genderedLocalizationStringTables = list()  # type: typing.List[StringTable.CompactStringTable]
 
 			try:
 				# noinspection PyProtectedMember
-				_AddLocalizationStringsToDictionaries(GenderedLanguage._allLocalizationStrings, GenderedLanguage._genderedLocalizationStrings)
+				_AddLocalizationStringsToDictionaries(
+					GenderedLanguage._allLocalizationStrings,
+					genderedLocalizationStringTables,
+					allLocalizationStringSources = LocalizationSources.AllLocalizationStringSources,
+					genderedLocalizationStringSources = LocalizationSources.GenderedLocalizationStringSources,
+					loadProfile = searchLoadProfile)
+
+				LocalizationSources.AllLocalizationStringSources.Freeze()
+				LocalizationSources.GenderedLocalizationStringSources.Freeze()
+
+				with searchLoadProfile.Measure(GenderedTablesLoadProfileSourceName, "Merge"):
+					# noinspection PyProtectedMember
+					GenderedLanguage._genderedLocalizationStrings = StringTable.CompactStringTable.Merge(genderedLocalizationStringTables)
 			except:
 				_ShowGameSTBLPackageReadErrorNotification()
 				raise
+			finally:
+				for genderedLocalizationStringTable in genderedLocalizationStringTables:  # type: StringTable.CompactStringTable
+					genderedLocalizationStringTable.Close()
 
 			searchTime = time.time() - searchStartTime  # type: float
 
+			searchLoadProfile.TotalSeconds = searchTime
+			_WriteLoadProfile(searchLoadProfile)
+
 			# noinspection PyProtectedMember
 			Debug.Log("Found %s localization strings. Of those strings, we found %s with gendered terms we can handle. This operation took %s seconds to complete." % (len(GenderedLanguage._allLocalizationStrings), len(GenderedLanguage._genderedLocalizationStrings), searchTime), This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+			Debug.Log("Merging localization strings from %s sources replaced %s existing keys, %s of which were gendered." % (len(LocalizationSources.AllLocalizationStringSources.SourceNames), LocalizationSources.AllLocalizationStringSources.ConflictCount, LocalizationSources.GenderedLocalizationStringSources.ConflictCount), This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
 
 			cls._onClientConnectTriggered = True
 
@@ -158,31 +149,73 @@ def _Setup () -> None:
 # noinspection PyUnusedLocal
 def _OnStart (cause: LoadingShared.LoadingCauses) -> None:
 	Reporting.RegisterReportFileCollector(_GameFileStructureCollector)
+	Reporting.RegisterReportFileCollector(_LoadProfileCollector)
 
 # noinspection PyUnusedLocal
 def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
 	Reporting.UnregisterReportFileCollector(_GameFileStructureCollector)
+	Reporting.UnregisterReportFileCollector(_LoadProfileCollector)
+
+def FilterAndFixLocalizationStrings (languageHandler: LanguageHandlers.LanguageHandlerBase, localizationStrings: typing.Dict[int, str]) -> typing.Dict[int, str]:
+	"""
+	Get the localization strings that contain gendered terms the language handler can correct, with the handler's gender tag usage fixes applied.
+	:param languageHandler: The language handler of the language these strings are in.
+	:type languageHandler: LanguageHandlers.LanguageHandlerBase
+	:param localizationStrings: A dictionary of localization strings, keyed by their hash.
+	:type localizationStrings: typing.Dict[int, str]
+	"""
+
+	if not isinstance(localizationStrings, dict):
+		raise Exceptions.IncorrectTypeException(localizationStrings, "localizationStrings", (dict,))
+
+	filteredAndFixedLocalizationStrings = dict()  # type: typing.Dict[int, str]
+
+	for handlingSTBLEntryKey, handlingSTBLEntryText in localizationStrings.items():  # type: int, str
+		handlingSTBLEntryTextIsGendered, handlingSTBLEntryTextMatches = GenderedLanguage.TextIsGendered(handlingSTBLEntryText)  # type: bool, typing.List[GenderedLanguage.CachedGenderTagPairMatch]
+
+		if not handlingSTBLEntryTextIsGendered:
+			continue
+
+		fixedHandlingSTBLEntryText = languageHandler.FixGenderTagUsageInconsistency(handlingSTBLEntryText, handlingSTBLEntryTextMatches)
+		filteredAndFixedLocalizationStrings[handlingSTBLEntryKey] = fixedHandlingSTBLEntryText
+
+	return filteredAndFixedLocalizationStrings
+
+def _AddLocalizationStringsToDictionaries (
+		allLocalizationStrings: typing.Dict[int, str],
+		genderedLocalizationStringTables: typing.List[StringTable.CompactStringTable],
+		allLocalizationStringSources: typing.Optional[LocalizationSources.SourceTable] = None,
+		genderedLocalizationStringSources: typing.Optional[LocalizationSources.SourceTable] = None,
+		loadProfile: typing.Optional[LoadProfile.LoadProfile] = None) -> None:
+
+	"""
+	Add every localization string to the dictionary of all strings, and add a table of the gendered strings of each game pack STBL entry or mod STBL
+	resource to the list of gendered tables. The gendered tables are meant to be combined afterwards with the compact string table merge method,
+	tables read from the language cache are memory mapped and need to be closed once that is done.
+	"""
+
+	if allLocalizationStringSources is None:
+		allLocalizationStringSources = LocalizationSources.SourceTable()
+
+	if genderedLocalizationStringSources is None:
+		genderedLocalizationStringSources = LocalizationSources.SourceTable()
+
+	if loadProfile is None:
+		loadProfile = LoadProfile.LoadProfile()
 
-def _AddLocalizationStringsToDictionaries (allLocalizationStrings: typing.Dict[int, str], genderedLocalizationStrings: typing.Dict[int, str]) -> None:
 	currentLanguageHandler = LanguageHandlers.GetCurrentLanguageHandler()  # type: typing.Optional[LanguageHandlers.LanguageHandlerBase]
 
 	if currentLanguageHandler is None:
 		_ShowUnsupportedLanguageNotification()
 		return
 
-	def filterAndFixText (handlingLocalizationStrings: typing.Dict[int, str]) -> typing.Dict[int, str]:
-		filteredAndFixedLocalizationStrings = dict()  # type: typing.Dict[int, str]
+	cacheLocations = list()  # type: typing.List[LanguageCache.LanguageCacheLocation]
+	sharedLanguageCache = _GetSharedLanguageCache(currentLanguageHandler)  # type: typing.Optional[LanguageCache.LanguageCacheLocation]
 
-		for handlingSTBLEntryKey, handlingSTBLEntryText in handlingLocalizationStrings.items():  # type: int, str
-			handlingSTBLEntryTextIsGendered, handlingSTBLEntryTextMatches = GenderedLanguage.TextIsGendered(handlingSTBLEntryText)  # type: bool, typing.List[GenderedLanguage.CachedGenderTagPairMatch]
+	if sharedLanguageCache is not None:
+		cacheLocations.append(sharedLanguageCache)
 
-			if not handlingSTBLEntryTextIsGendered:
-				continue
-
-			fixedHandlingSTBLEntryText = currentLanguageHandler.FixGenderTagUsageInconsistency(handlingSTBLEntryText, handlingSTBLEntryTextMatches)
-			filteredAndFixedLocalizationStrings[handlingSTBLEntryKey] = fixedHandlingSTBLEntryText
-
-		return filteredAndFixedLocalizationStrings
+	cacheLocations.append(LocalLanguageCache)
 
 	missingPackLanguageData = False  # type: bool
 
@@ -194,94 +227,79 @@ def _AddLocalizationStringsToDictionaries (allLocalizationStrings: typing.Dict[i
 
 		for targetPackageFilePath in targetPackageFilePaths:  # type: str
 			try:
-				targetPackageModifiedTime = os.path.getmtime(targetPackageFilePath)  # type: float
-
-				targetPackageEntries = Package.GetPackageLocalizationStrings(targetPackageFilePath)  # type: typing.List[Package.PackageEntry]
+				with loadProfile.Measure(targetPack.name, "Index"):
+					targetPackageFingerprint = Package.GetPackageFingerprint(targetPackageFilePath)  # type: str
+					targetPackageEntries = Package.GetPackageLocalizationStrings(targetPackageFilePath)  # type: typing.List[Package.PackageEntry]
 
 				for targetPackageEntry in targetPackageEntries:  # type: Package.PackageEntry
 					if not currentLanguageHandler.IsHandlingLanguageSTBLFile(("%016x" % targetPackageEntry.InstanceID).upper()):
 						continue
 
-					targetLocalizationStrings = None  # type: typing.Optional[typing.Dict[int, str]]
-					targetGenderedLocalizationStrings = None  # type: typing.Optional[typing.Dict[int, str]]
-
-					minimumCacheHandlerVersion = currentLanguageHandler.GetMinimumCacheHandlerVersion()  # type: typing.Optional[Version.Version]
-
-					try:
-						targetPackageEntryCacheInfo = _GetGamePackLanguageCacheInfo(targetPack, targetPackageEntry)  # type: typing.Optional[_LanguageCacheInfo]
-					except:
-						Debug.Log("Failed to read language cache info file of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
-					else:
-						if targetPackageEntryCacheInfo is not None:
-							if targetPackageEntryCacheInfo.PackageModifiedTime == targetPackageModifiedTime and \
-									targetPackageEntryCacheInfo.CachedHandlerLanguage == currentLanguageHandler.HandlingLanguage and \
-									targetPackageEntryCacheInfo.CachedHandlerVersion is not None and \
-									(minimumCacheHandlerVersion is None or targetPackageEntryCacheInfo.CachedHandlerVersion >= minimumCacheHandlerVersion):
-
-								try:
-									targetLocalizationStrings = _GetGamePackLanguageCache(targetPack, targetPackageEntry)
-
-									if targetLocalizationStrings is not None:
-										allLocalizationStrings.update(targetLocalizationStrings)
-								except:
-									Debug.Log("Failed to read the language cache file of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
-
-					try:
-						targetPackageEntryGenderedCacheInfo = _GetGamePackGenderedLanguageCacheInfo(targetPack, targetPackageEntry)  # type: typing.Optional[_LanguageCacheInfo]
-					except:
-						Debug.Log("Failed to read the gendered language cache info file of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
-					else:
-						if targetPackageEntryGenderedCacheInfo is not None:
-
-							if targetPackageEntryGenderedCacheInfo.PackageModifiedTime == targetPackageModifiedTime and \
-									targetPackageEntryGenderedCacheInfo.CachedHandlerLanguage == currentLanguageHandler.HandlingLanguage and \
-									targetPackageEntryGenderedCacheInfo.CachedHandlerVersion is not None and \
-									(minimumCacheHandlerVersion is None or targetPackageEntryGenderedCacheInfo.CachedHandlerVersion >= minimumCacheHandlerVersion):
-
-								try:
-									targetGenderedLocalizationStrings = _GetGamePackGenderedLanguageCache(targetPack, targetPackageEntry)
-
-									if targetGenderedLocalizationStrings is not None:
-										genderedLocalizationStrings.update(targetGenderedLocalizationStrings)
-								except:
-									Debug.Log("Failed to read the gendered language cache file of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+					targetCacheInfo = LanguageCache.LanguageCacheInfo(int(currentLanguageHandler.HandlingLanguage), This.Mod.Version, targetPackageFingerprint)  # type: LanguageCache.LanguageCacheInfo
+					targetCacheDescription = "the package at '%s' and the STBL entry '%s'" % (targetPackageFilePath, targetPackageEntry.IdentifiersToString())  # type: str
+
+					with loadProfile.Measure(targetPack.name, "Cache Read"):
+						targetLocalizationStrings, targetLocalizationStringsSourceIndex = _ReadCache(
+							cacheLocations,
+							lambda cacheLocation: cacheLocation.GetGamePackLanguageCacheInfo(targetPack.name, targetPackageEntry),
+							lambda cacheLocation: cacheLocation.GetGamePackLanguageCache(targetPack.name, targetPackageEntry),
+							currentLanguageHandler,
+							targetPackageFingerprint,
+							"language cache of " + targetCacheDescription)  # type: typing.Optional[typing.Dict[int, str]], int
+
+						targetGenderedLocalizationStrings, targetGenderedLocalizationStringsSourceIndex = _ReadCache(
+							cacheLocations,
+							lambda cacheLocation: cacheLocation.GetGamePackGenderedLanguageCacheInfo(targetPack.name, targetPackageEntry),
+							lambda cacheLocation: cacheLocation.GetGamePackGenderedLanguageCache(targetPack.name, targetPackageEntry),
+							currentLanguageHandler,
+							targetPackageFingerprint,
+							"gendered language cache of " + targetCacheDescription)  # type: typing.Optional[StringTable.CompactStringTable], int
 
 					if targetLocalizationStrings is None:
 						try:
-							targetLocalizationStrings = STBL.ParseSTBLFileBytes(targetPackageEntry.Read())  # type: typing.Dict[int, str]
+							with loadProfile.Measure(targetPack.name, "Read", targetPackageEntry.FileSize):
+								targetPackageEntryCompressedBytes = targetPackageEntry.ReadCompressed()  # type: bytes
+
+							with loadProfile.Measure(targetPack.name, "Decompress", targetPackageEntry.FileSizeDecompressed):
+								targetPackageEntryBytes = targetPackageEntry.Decompress(targetPackageEntryCompressedBytes)  # type: bytes
+
+							with loadProfile.Measure(targetPack.name, "Parse", len(targetPackageEntryBytes)):
+								targetLocalizationStrings = STBL.ParseSTBLFileBytes(targetPackageEntryBytes)  # type: typing.Dict[int, str]
 						except:
-							Debug.Log("Failed to read the localization strings of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+							Debug.Log("Failed to read the localization strings of %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 						else:
-							try:
-								_WriteGamePackLanguageCache(
-									targetPack,
-									targetPackageEntry,
-									targetLocalizationStrings,
-									_LanguageCacheInfo(int(currentLanguageHandler.HandlingLanguage), This.Mod.Version, targetPackageModifiedTime))
-							except:
-								Debug.Log("Failed to write the language cache file for the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
-							else:
-								Debug.Log("Read and cached the localization strings of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+							Debug.Log("Read the localization strings of %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+
+					if targetLocalizationStrings is not None and targetLocalizationStringsSourceIndex == len(cacheLocations):
+						with loadProfile.Measure(targetPack.name, "Cache Write"):
+							_WriteLocalCache(
+								lambda cacheLocation: cacheLocation.WriteGamePackLanguageCache(targetPack.name, targetPackageEntry, targetLocalizationStrings, targetCacheInfo),
+								"language cache for " + targetCacheDescription)
 
 					if targetGenderedLocalizationStrings is None and targetLocalizationStrings is not None:
 						try:
-							targetGenderedLocalizationStrings = filterAndFixText(targetLocalizationStrings)  # type: typing.Dict[int, str]
+							with loadProfile.Measure(targetPack.name, "Filter"):
+								targetGenderedLocalizationStrings = StringTable.CompactStringTable.FromDictionary(FilterAndFixLocalizationStrings(currentLanguageHandler, targetLocalizationStrings))  # type: StringTable.CompactStringTable
 						except:
-							Debug.Log("Failed to filter and fix the gendered localization strings of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+							Debug.Log("Failed to filter and fix the gendered localization strings of %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 						else:
-							try:
-								_WriteGamePackGenderedLanguageCache(
-									targetPack,
-									targetPackageEntry,
-									targetGenderedLocalizationStrings,
-									_LanguageCacheInfo(int(currentLanguageHandler.HandlingLanguage), This.Mod.Version, targetPackageModifiedTime))
-							except:
-								Debug.Log("Failed to write the gendered language cache file for the pack '%s' and the STBL entry '%s'." % (targetPack.name, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
-							else:
-								Debug.Log("Filtered, fixed, and cached the gendered localization strings of the package at '%s' and the STBL entry '%s'." % (targetPackageFilePath, targetPackageEntry.IdentifiersToString()), This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
-
-					allLocalizationStrings.update(targetLocalizationStrings)
-					genderedLocalizationStrings.update(targetGenderedLocalizationStrings)
+							Debug.Log("Filtered and fixed the gendered localization strings of %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
+
+					if targetGenderedLocalizationStrings is not None and targetGenderedLocalizationStringsSourceIndex == len(cacheLocations):
+						with loadProfile.Measure(targetPack.name, "Cache Write"):
+							_WriteLocalCache(
+								lambda cacheLocation: cacheLocation.WriteGamePackGenderedLanguageCache(targetPack.name, targetPackageEntry, targetGenderedLocalizationStrings, targetCacheInfo),
+								"gendered language cache for " + targetCacheDescription)
+
+					targetSourceName = LocalizationSources.GetGamePackSourceName(targetPack.name, targetPackageEntry.IdentifiersToString())  # type: str
+
+					with loadProfile.Measure(targetPack.name, "Merge"):
+						if targetLocalizationStrings is not None:
+							allLocalizationStringSources.Merge(allLocalizationStrings, targetLocalizationStrings, targetSourceName)
+
+						if targetGenderedLocalizationStrings is not None:
+							genderedLocalizationStringSources.MergeKeys(targetGenderedLocalizationStrings.keys(), targetSourceName)
+							genderedLocalizationStringTables.append(targetGenderedLocalizationStrings)
 			except:
 				Debug.Log("Failed to read the localization strings of a package file at '%s'." % targetPackageFilePath, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 
@@ -291,111 +309,162 @@ def _AddLocalizationStringsToDictionaries (allLocalizationStrings: typing.Dict[i
 
 	# noinspection PyTypeChecker
 	modSTBLFileKeys = resources.get_all_resources_of_type(570775514)  # type: typing.Tuple[typing.Any, ...]
+	usedModResourceIdentifiers = set()  # type: typing.Set[str]
+
+	modCacheLocations = [ LocalLanguageCache ]  # type: typing.List[LanguageCache.LanguageCacheLocation]  # Installed mods differ between profiles, so mod caches are never shared.
 
 	for targetSTBLFileKey in modSTBLFileKeys:  # type: typing.Any
 		if not currentLanguageHandler.IsHandlingLanguageSTBLFile(("%016x" % targetSTBLFileKey.instance).upper()):
 			continue
 
-		targetSTBLFileLoader = resources.ResourceLoader(targetSTBLFileKey, resource_type = 570775514)  # type: resources.ResourceLoader
-
-		with targetSTBLFileLoader.load() as targetSTBLFileStream:
-			targetLocalizationStrings = STBL.ParseSTBLFileBytes(targetSTBLFileStream.read())  # type: typing.Dict[int, str]
-			targetGenderedLocalizationStrings = filterAndFixText(targetLocalizationStrings)  # type: typing.Dict[int, str]
-
-			allLocalizationStrings.update(allLocalizationStrings)
-			genderedLocalizationStrings.update(targetGenderedLocalizationStrings)
+		targetResourceIdentifiers = LanguageCache.GetModResourceIdentifiers(targetSTBLFileKey.type, targetSTBLFileKey.group, targetSTBLFileKey.instance)  # type: str
+		targetCacheDescription = "the mod STBL resource '%s'" % targetResourceIdentifiers  # type: str
+		usedModResourceIdentifiers.add(targetResourceIdentifiers)
 
-def _WriteGamePackLanguageCache (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry, localizationStrings: typing.Dict[int, str], cacheInfo: _LanguageCacheInfo) -> None:
-	cacheFilePath = _GetGamePackLanguageCacheFilePath(pack, packageEntry)  # type: str
-	cacheInfoFilePath = _GetGamePackLanguageCacheInfoFilePath(pack, packageEntry)  # type: str
-	cacheFilesDirectory = os.path.dirname(cacheFilePath)  # type: str
+		try:
+			with loadProfile.Measure(ModsLoadProfileSourceName, "Read") as targetReadMeasurement:
+				targetSTBLFileLoader = resources.ResourceLoader(targetSTBLFileKey, resource_type = 570775514)  # type: resources.ResourceLoader
 
-	if not os.path.exists(cacheFilesDirectory):
-		os.makedirs(cacheFilesDirectory)
+				with targetSTBLFileLoader.load() as targetSTBLFileStream:
+					targetSTBLFileBytes = targetSTBLFileStream.read()  # type: bytes
 
-	with open(cacheInfoFilePath, "w+") as cacheInfoFile:
-		cacheInfoFile.write(json.JSONEncoder(indent = "\t").encode(cacheInfo.ToDictionary()))
+				targetReadMeasurement.AddBytes(len(targetSTBLFileBytes))
+		except:
+			Debug.Log("Failed to load %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+			continue
 
-	with open(cacheFilePath, "w+") as cacheFile:
-		cacheFile.write(json.JSONEncoder(indent = "\t").encode(localizationStrings))
+		# Mod resources are keyed by their content rather than a package modified time, we don't know which package a resource came from.
+		targetContentChecksum = LanguageCache.GetContentChecksum(targetSTBLFileBytes)  # type: str
+		targetCacheInfo = LanguageCache.LanguageCacheInfo(int(currentLanguageHandler.HandlingLanguage), This.Mod.Version, None, contentChecksum = targetContentChecksum)  # type: LanguageCache.LanguageCacheInfo
+
+		with loadProfile.Measure(ModsLoadProfileSourceName, "Cache Read"):
+			targetLocalizationStrings, targetLocalizationStringsSourceIndex = _ReadCache(
+				modCacheLocations,
+				lambda cacheLocation: cacheLocation.GetModLanguageCacheInfo(targetResourceIdentifiers),
+				lambda cacheLocation: cacheLocation.GetModLanguageCache(targetResourceIdentifiers),
+				currentLanguageHandler,
+				None,
+				"language cache of " + targetCacheDescription,
+				contentChecksum = targetContentChecksum)  # type: typing.Optional[typing.Dict[int, str]], int
+
+			targetGenderedLocalizationStrings, targetGenderedLocalizationStringsSourceIndex = _ReadCache(
+				modCacheLocations,
+				lambda cacheLocation: cacheLocation.GetModGenderedLanguageCacheInfo(targetResourceIdentifiers),
+				lambda cacheLocation: cacheLocation.GetModGenderedLanguageCache(targetResourceIdentifiers),
+				currentLanguageHandler,
+				None,
+				"gendered language cache of " + targetCacheDescription,
+				contentChecksum = targetContentChecksum)  # type: typing.Optional[StringTable.CompactStringTable], int
+
+		if targetLocalizationStrings is None:
+			try:
+				with loadProfile.Measure(ModsLoadProfileSourceName, "Parse", len(targetSTBLFileBytes)):
+					targetLocalizationStrings = STBL.ParseSTBLFileBytes(targetSTBLFileBytes)  # type: typing.Dict[int, str]
+			except:
+				Debug.Log("Failed to read the localization strings of %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+				continue
 
-def _GetGamePackLanguageCache (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> typing.Optional[typing.Dict[int, str]]:
-	cacheFilePath = _GetGamePackLanguageCacheFilePath(pack, packageEntry)  # type: str
-	cacheInfoFilePath = _GetGamePackLanguageCacheInfoFilePath(pack, packageEntry)  # type: str
+			with loadProfile.Measure(ModsLoadProfileSourceName, "Cache Write"):
+				_WriteLocalCache(
+					lambda cacheLocation: cacheLocation.WriteModLanguageCache(targetResourceIdentifiers, targetLocalizationStrings, targetCacheInfo),
+					"language cache for " + targetCacheDescription)
 
-	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
-		return None
+		if targetGenderedLocalizationStrings is None:
+			try:
+				with loadProfile.Measure(ModsLoadProfileSourceName, "Filter"):
+					targetGenderedLocalizationStrings = StringTable.CompactStringTable.FromDictionary(FilterAndFixLocalizationStrings(currentLanguageHandler, targetLocalizationStrings))  # type: StringTable.CompactStringTable
+			except:
+				Debug.Log("Failed to filter and fix the gendered localization strings of %s." % targetCacheDescription, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+				targetGenderedLocalizationStrings = StringTable.CompactStringTable.FromDictionary(dict())
+			else:
+				with loadProfile.Measure(ModsLoadProfileSourceName, "Cache Write"):
+					_WriteLocalCache(
+						lambda cacheLocation: cacheLocation.WriteModGenderedLanguageCache(targetResourceIdentifiers, targetGenderedLocalizationStrings, targetCacheInfo),
+						"gendered language cache for " + targetCacheDescription)
 
-	with open(cacheFilePath, "r") as cacheFile:
-		cacheDictionary = json.JSONDecoder().decode(cacheFile.read())
+		targetSourceName = LocalizationSources.GetModSourceName(targetResourceIdentifiers)  # type: str
 
-	cacheDictionary = { int(cachedLanguageKey): cachedLanguageText for cachedLanguageKey, cachedLanguageText in cacheDictionary.items() }
+		with loadProfile.Measure(ModsLoadProfileSourceName, "Merge"):
+			allLocalizationStringSources.Merge(allLocalizationStrings, targetLocalizationStrings, targetSourceName)
+			genderedLocalizationStringSources.MergeKeys(targetGenderedLocalizationStrings.keys(), targetSourceName)
+			genderedLocalizationStringTables.append(targetGenderedLocalizationStrings)
 
-	return cacheDictionary
+	try:
+		LocalLanguageCache.RemoveUnusedModLanguageCaches(usedModResourceIdentifiers)
+	except:
+		Debug.Log("Failed to remove unused mod language caches.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 
-def _GetGamePackLanguageCacheInfo (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> typing.Optional[_LanguageCacheInfo]:
-	cacheFilePath = _GetGamePackLanguageCacheFilePath(pack, packageEntry)  # type: str
-	cacheInfoFilePath = _GetGamePackLanguageCacheInfoFilePath(pack, packageEntry)  # type: str
+def _GetSharedLanguageCache (languageHandler: LanguageHandlers.LanguageHandlerBase) -> typing.Optional[LanguageCache.LanguageCacheLocation]:
+	sharedCacheDirectoryPath = Settings.SharedLanguageCachePath.Get()  # type: str
 
-	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
+	if sharedCacheDirectoryPath == "":
 		return None
 
-	with open(cacheInfoFilePath, "r") as cacheInfoFile:
-		cacheInfoDictionary = json.JSONDecoder().decode(cacheInfoFile.read())
-
-	return _LanguageCacheInfo.FromDictionary(cacheInfoDictionary)
-
-def _GetGamePackLanguageCacheFilePath (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> str:
-	return os.path.join(GameLanguageCacheDirectoryPath, pack.name, packageEntry.IdentifiersToString().replace(":", "-")) + ".json"
-
-def _GetGamePackLanguageCacheInfoFilePath (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> str:
-	return os.path.join(GameLanguageCacheDirectoryPath, pack.name, packageEntry.IdentifiersToString().replace(":", "-")) + "-info.json"
-
-def _WriteGamePackGenderedLanguageCache (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry, genderedLocalizationStrings: typing.Dict[int, str], cacheInfo: _LanguageCacheInfo) -> None:
-	cacheFilePath = _GetGamePackGenderedLanguageCacheFilePath(pack, packageEntry)  # type: str
-	cacheInfoFilePath = _GetGamePackGenderedLanguageCacheInfoFilePath(pack, packageEntry)  # type: str
-	cacheFilesDirectory = os.path.dirname(cacheFilePath)  # type: str
-
-	if not os.path.exists(cacheFilesDirectory):
-		os.makedirs(cacheFilesDirectory)
-
-	with open(cacheInfoFilePath, "w+") as cacheInfoFile:
-		cacheInfoFile.write(json.JSONEncoder(indent = "\t").encode(cacheInfo.ToDictionary()))
+	if not os.path.isdir(sharedCacheDirectoryPath):
+		Debug.Log("The shared language cache directory at '%s' doesn't exist or cannot be reached, only the local language cache will be used." % sharedCacheDirectoryPath, This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__)
+		return None
 
-	with open(cacheFilePath, "w+") as cacheFile:
-		cacheFile.write(json.JSONEncoder(indent = "\t").encode(genderedLocalizationStrings))
+	try:
+		basePackageFilePaths = languageHandler.GetPackLocalizationPackageFilePaths(Sims4Common.Pack.BASE_GAME)  # type: typing.List[str]
 
-def _GetGamePackGenderedLanguageCache (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> typing.Optional[typing.Dict[int, str]]:
-	cacheFilePath = _GetGamePackGenderedLanguageCacheFilePath(pack, packageEntry)  # type: str
-	cacheInfoFilePath = _GetGamePackGenderedLanguageCacheInfoFilePath(pack, packageEntry)  # type: str
+		if len(basePackageFilePaths) == 0:
+			return None
 
-	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
+		gameBuildKey = LanguageCache.GetGameBuildKey(basePackageFilePaths)  # type: str
+		sharedCacheRootPath = LanguageCache.GetSharedLanguageCacheRootPath(sharedCacheDirectoryPath, gameBuildKey, languageHandler.HandlingLanguage.name, languageHandler.GetHandlerVersion())  # type: str
+	except:
+		Debug.Log("Failed to find the shared language cache for this game build in the directory at '%s'." % sharedCacheDirectoryPath, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 		return None
 
-	with open(cacheFilePath, "r") as cacheFile:
-		cacheDictionary = json.JSONDecoder().decode(cacheFile.read())
-
-	cacheDictionary = { int(cachedLanguageKey): cachedLanguageText for cachedLanguageKey, cachedLanguageText in cacheDictionary.items() }
-
-	return cacheDictionary
+	return LanguageCache.LanguageCacheLocation(sharedCacheRootPath)
+
+def _ReadCache (
+		cacheLocations: typing.List[LanguageCache.LanguageCacheLocation],
+		infoReader: typing.Callable[[LanguageCache.LanguageCacheLocation], typing.Optional[LanguageCache.LanguageCacheInfo]],
+		cacheReader: typing.Callable[[LanguageCache.LanguageCacheLocation], typing.Optional[typing.Mapping[int, str]]],
+		languageHandler: LanguageHandlers.LanguageHandlerBase,
+		packageFingerprint: typing.Optional[str],
+		cacheDescription: str,
+		contentChecksum: typing.Optional[str] = None) -> typing.Tuple[typing.Optional[typing.Mapping[int, str]], int]:
+
+	"""
+	Read the first valid cache from these locations. This will return the cache's localization strings and the index of the location it was
+	found in, or none and the number of locations if no valid cache exists.
+	"""
+
+	minimumCacheHandlerVersion = languageHandler.GetMinimumCacheHandlerVersion()  # type: typing.Optional[Version.Version]
+
+	for cacheLocationIndex, cacheLocation in enumerate(cacheLocations):  # type: int, LanguageCache.LanguageCacheLocation
+		try:
+			cacheInfo = infoReader(cacheLocation)  # type: typing.Optional[LanguageCache.LanguageCacheInfo]
+		except:
+			Debug.Log("Failed to read the %s info file in the cache location at '%s'." % (cacheDescription, cacheLocation.RootPath), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+			continue
 
-def _GetGamePackGenderedLanguageCacheInfo (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> typing.Optional[_LanguageCacheInfo]:
-	cacheFilePath = _GetGamePackGenderedLanguageCacheFilePath(pack, packageEntry)  # type: str
-	cacheInfoFilePath = _GetGamePackGenderedLanguageCacheInfoFilePath(pack, packageEntry)  # type: str
+		if cacheInfo is None or not cacheInfo.IsValid(packageFingerprint, int(languageHandler.HandlingLanguage), minimumCacheHandlerVersion, contentChecksum = contentChecksum):
+			continue
 
-	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
-		return None
+		try:
+			cachedLocalizationStrings = cacheReader(cacheLocation)  # type: typing.Optional[typing.Mapping[int, str]]
+		except:
+			Debug.Log("Failed to read the %s in the cache location at '%s'." % (cacheDescription, cacheLocation.RootPath), This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+			continue
 
-	with open(cacheInfoFilePath, "r") as cacheInfoFile:
-		cacheInfoDictionary = json.JSONDecoder().decode(cacheInfoFile.read())
+		if cachedLocalizationStrings is not None:
+			return cachedLocalizationStrings, cacheLocationIndex
 
-	return _LanguageCacheInfo.FromDictionary(cacheInfoDictionary)
+	return None, len(cacheLocations)
 
-def _GetGamePackGenderedLanguageCacheFilePath (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> str:
-	return os.path.join(GameGenderedLanguageCacheDirectoryPath, pack.name, packageEntry.IdentifiersToString().replace(":", "-")) + ".json"
+def _WriteLocalCache (cacheWriter: typing.Callable[[LanguageCache.LanguageCacheLocation], None], cacheDescription: str) -> None:
+	# Caches are only ever written to the local location while the game loads. Shared locations are read only here, they can be read by several game
+	# instances at once and are filled by the prebuild language cache automation script instead.
 
-def _GetGamePackGenderedLanguageCacheInfoFilePath (pack: Sims4Common.Pack, packageEntry: Package.PackageEntry) -> str:
-	return os.path.join(GameGenderedLanguageCacheDirectoryPath, pack.name, packageEntry.IdentifiersToString().replace(":", "-")) + "-info.json"
+	try:
+		cacheWriter(LocalLanguageCache)
+	except:
+		Debug.Log("Failed to write the %s." % cacheDescription, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+	else:
+		Debug.Log("Cached the %s in the cache location at '%s'." % (cacheDescription, LocalLanguageCache.RootPath), This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
 
 def _LogGameFileStructure () -> None:
 	try:
@@ -408,6 +477,18 @@ def _LogGameFileStructure () -> None:
 	else:
 		Debug.Log("Successfully logged the game's file structure to the file at '%s'." % GameFileStructureFilePath, This.Mod.Namespace, Debug.LogLevels.Info, group = This.Mod.Namespace, owner = __name__)
 
+def _WriteLoadProfile (loadProfile: LoadProfile.LoadProfile) -> None:
+	try:
+		loadProfile.Write(LoadProfileFilePath)
+	except:
+		Debug.Log("Failed to write the language load profile to the file at '%s'." % LoadProfileFilePath, This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__)
+
+def _LoadProfileCollector () -> typing.List[str]:
+	if os.path.exists(LoadProfileFilePath):
+		return [ LoadProfileFilePath ]
+	else:
+		return list()
+
 def _GameFileStructureCollector () -> typing.List[str]:
 	if os.path.exists(GameFileStructureFilePath):
 		return [ GameFileStructureFilePath ]
@@ -499,6 +580,8 @@ def _LocalizationStringHashPatch (originalCallable: typing.Callable, self) -> in
 
 # noinspection PyUnusedLocal
 def _CreateTokensPatch (originalCallable: typing.Callable, tokens_msg, *tokens) -> None:
+	createTokensStartTime = time.perf_counter_ns()  # type: int
+
 	try:
 		# noinspection PyProtectedMember
 		localizationString = tokens_msg._message
@@ -520,6 +603,9 @@ def _CreateTokensPatch (originalCallable: typing.Callable, tokens_msg, *tokens)
 
 		localizationStringText = GenderedLanguage.GetGenderedLocalizationStringText(trueStringHash)  # type: typing.Optional[str]
 
+		if TokenRecorder.Recording and localizationStringText is not None:
+			TokenRecorder.Record(trueStringHash, localizationStringText, trueStringTokens)
+
 		def createTrueValueCleaner (deletingLocalizationString: Localization_pb2.LocalizedString, cleanerTimer: Timer.Timer) -> typing.Callable:
 			def trueValueCleaner () -> None:
 				_trueLocalizationStringValues.pop(deletingLocalizationString, None)
@@ -566,6 +652,8 @@ def _CreateTokensPatch (originalCallable: typing.Callable, tokens_msg, *tokens)
 					_trueLocalizationStringValueDeletionTimers.append(trueValueDeletionTimer)
 	except:
 		Debug.Log("Failed to handle the game's 'create tokens' function.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":" + str(Python.GetLineNumber()), lockThreshold = 2)
+	finally:
+		_createTokensTiming.Record(time.perf_counter_ns() - createTokensStartTime)  # Only the mod's own handling is timed, not the game's function.
 
 	return originalCallable(tokens_msg, *tokens)
 
@@ -573,4 +661,6 @@ _trueLocalizationStringValues = dict()  # type: typing.Dict[Localization_pb2.Loc
 _trueLocalizationStringValueDeletionTimers = list()  # type: typing.List[Timer.Timer]
 _trueLocalizationStringValueDeletionInterval = 60  # type: int
 
+_createTokensTiming = Timing.GetCounter("GenderedLanguageHandler.CreateTokensPatch")  # type: Timing.TimingCounter
+
 _Setup()
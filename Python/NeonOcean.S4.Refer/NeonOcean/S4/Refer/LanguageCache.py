@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import json
+import os
+import typing
+import uuid
+import zlib
+
+from NeonOcean.S4.Main.Tools import Exceptions, Version
+from NeonOcean.S4.Refer.Tools import Package, StringTable
+
+LanguageCacheDirectoryName = "Language Cache"  # type: str
+GenderedLanguageCacheDirectoryName = "Gendered Language Cache"  # type: str
+GameCacheDirectoryName = "Game"  # type: str
+ModCacheDirectoryName = "Mods"  # type: str
+
+class LanguageCacheInfo:
+	_cachedHandlerLanguageSavingKey = "CachedHandlerLanguage"  # type: str
+	_cachedHandlerVersionSavingKey = "CachedHandlerVersion"  # type: str
+	_packageFingerprintSavingKey = "PackageFingerprint"  # type: str
+	_contentChecksumSavingKey = "ContentChecksum"  # type: str
+
+	def __init__ (self, cachedHandlerLanguage: typing.Optional[int], cachedHandlerVersion: typing.Optional[Version.Version], packageFingerprint: typing.Optional[str], contentChecksum: typing.Optional[str] = None):
+		if not isinstance(cachedHandlerLanguage, int) and cachedHandlerLanguage is not None:
+			raise Exceptions.IncorrectTypeException(cachedHandlerLanguage, "cachedHandlerLanguage", (int, None))
+
+		if not isinstance(cachedHandlerVersion, Version.Version) and cachedHandlerVersion is not None:
+			raise Exceptions.IncorrectTypeException(cachedHandlerVersion, "cachedHandlerVersion", (Version.Version, None))
+
+		if not isinstance(packageFingerprint, str) and packageFingerprint is not None:
+			raise Exceptions.IncorrectTypeException(packageFingerprint, "packageFingerprint", (str, None))
+
+		if not isinstance(contentChecksum, str) and contentChecksum is not None:
+			raise Exceptions.IncorrectTypeException(contentChecksum, "contentChecksum", (str, None))
+
+		self.CachedHandlerLanguage = cachedHandlerLanguage  # type: typing.Optional[int]
+		self.CachedHandlerVersion = cachedHandlerVersion  # type: typing.Optional[Version.Version]
+		self.PackageFingerprint = packageFingerprint  # type: typing.Optional[str]
+		self.ContentChecksum = contentChecksum  # type: typing.Optional[str]
+
+	@classmethod
+	def FromDictionary (cls, sourceDictionary: dict) -> LanguageCacheInfo:
+		cachedHandlerLanguage = sourceDictionary.get(cls._cachedHandlerLanguageSavingKey, None)  # type: typing.Optional[int]
+		cachedHandlerVersionString = sourceDictionary.get(cls._cachedHandlerVersionSavingKey, None)  # type: typing.Optional[str]
+
+		if cachedHandlerVersionString is not None:
+			cachedHandlerVersion = Version.Version(cachedHandlerVersionString)  # type: typing.Optional[Version.Version]
+		else:
+			cachedHandlerVersion = None  # type: typing.Optional[Version.Version]
+
+		packageFingerprint = sourceDictionary.get(cls._packageFingerprintSavingKey, None)  # type: typing.Optional[str]
+		contentChecksum = sourceDictionary.get(cls._contentChecksumSavingKey, None)  # type: typing.Optional[str]
+		return cls(cachedHandlerLanguage, cachedHandlerVersion, packageFingerprint, contentChecksum = contentChecksum)
+
+	def ToDictionary (self) -> dict:
+		return {
+			self._cachedHandlerLanguageSavingKey: self.CachedHandlerLanguage,
+			self._cachedHandlerVersionSavingKey: str(self.CachedHandlerVersion),
+			self._packageFingerprintSavingKey: self.PackageFingerprint,
+			self._contentChecksumSavingKey: self.ContentChecksum
+		}
+
+	def IsValid (self, packageFingerprint: typing.Optional[str], handlingLanguage: int, minimumCacheHandlerVersion: typing.Optional[Version.Version], contentChecksum: typing.Optional[str] = None) -> bool:
+		"""
+		Get whether or not the cache this information describes can be used for a package with this fingerprint or resource with this content checksum,
+		and a language handler with these values.
+		"""
+
+		if self.PackageFingerprint != packageFingerprint:
+			return False
+
+		if self.ContentChecksum != contentChecksum:
+			return False
+
+		if self.CachedHandlerLanguage != handlingLanguage:
+			return False
+
+		if self.CachedHandlerVersion is None:
+			return False
+
+		if minimumCacheHandlerVersion is not None and self.CachedHandlerVersion < minimumCacheHandlerVersion:
+			return False
+
+		return True
+
+class LanguageCacheLocation:
+	def __init__ (self, rootPath: str):
+		"""
+		A directory containing a language cache and a gendered language cache. Reading from a location never takes a lock or writes anything, and
+		cache files are always written by replacing them whole, so multiple game instances can safely read the same location. The game only writes to
+		its local location, shared locations are written by the prebuild language cache automation script.
+		:param rootPath: The directory the 'Language Cache' and 'Gendered Language Cache' directories are located in.
+		:type rootPath: str
+		"""
+
+		if not isinstance(rootPath, str):
+			raise Exceptions.IncorrectTypeException(rootPath, "rootPath", (str,))
+
+		self.RootPath = rootPath  # type: str
+
+		self.LanguageCacheDirectoryPath = os.path.join(rootPath, LanguageCacheDirectoryName)  # type: str
+		self.GameLanguageCacheDirectoryPath = os.path.join(self.LanguageCacheDirectoryPath, GameCacheDirectoryName)  # type: str
+
+		self.GenderedLanguageCacheDirectoryPath = os.path.join(rootPath, GenderedLanguageCacheDirectoryName)  # type: str
+		self.GameGenderedLanguageCacheDirectoryPath = os.path.join(self.GenderedLanguageCacheDirectoryPath, GameCacheDirectoryName)  # type: str
+
+		self.ModLanguageCacheDirectoryPath = os.path.join(self.LanguageCacheDirectoryPath, ModCacheDirectoryName)  # type: str
+		self.ModGenderedLanguageCacheDirectoryPath = os.path.join(self.GenderedLanguageCacheDirectoryPath, ModCacheDirectoryName)  # type: str
+
+	def WriteGamePackLanguageCache (self, packName: str, packageEntry: Package.PackageEntry, localizationStrings: typing.Dict[int, str], cacheInfo: LanguageCacheInfo) -> None:
+		_WriteCache(self._GetGamePackLanguageCacheFilePath(packName, packageEntry), self._GetGamePackLanguageCacheInfoFilePath(packName, packageEntry), localizationStrings, cacheInfo)
+
+	def GetGamePackLanguageCache (self, packName: str, packageEntry: Package.PackageEntry) -> typing.Optional[typing.Dict[int, str]]:
+		return _ReadCache(self._GetGamePackLanguageCacheFilePath(packName, packageEntry), self._GetGamePackLanguageCacheInfoFilePath(packName, packageEntry))
+
+	def GetGamePackLanguageCacheInfo (self, packName: str, packageEntry: Package.PackageEntry) -> typing.Optional[LanguageCacheInfo]:
+		return _ReadCacheInfo(self._GetGamePackLanguageCacheFilePath(packName, packageEntry), self._GetGamePackLanguageCacheInfoFilePath(packName, packageEntry))
+
+	def WriteGamePackGenderedLanguageCache (self, packName: str, packageEntry: Package.PackageEntry, genderedLocalizationStrings: typing.Union[typing.Dict[int, str], StringTable.CompactStringTable], cacheInfo: LanguageCacheInfo) -> None:
+		_WriteTableCache(self._GetGamePackGenderedLanguageCacheFilePath(packName, packageEntry), self._GetGamePackGenderedLanguageCacheInfoFilePath(packName, packageEntry), genderedLocalizationStrings, cacheInfo)
+
+	def GetGamePackGenderedLanguageCache (self, packName: str, packageEntry: Package.PackageEntry) -> typing.Optional[StringTable.CompactStringTable]:
+		return _ReadTableCache(self._GetGamePackGenderedLanguageCacheFilePath(packName, packageEntry), self._GetGamePackGenderedLanguageCacheInfoFilePath(packName, packageEntry))
+
+	def GetGamePackGenderedLanguageCacheInfo (self, packName: str, packageEntry: Package.PackageEntry) -> typing.Optional[LanguageCacheInfo]:
+		return _ReadCacheInfo(self._GetGamePackGenderedLanguageCacheFilePath(packName, packageEntry), self._GetGamePackGenderedLanguageCacheInfoFilePath(packName, packageEntry))
+
+	def WriteModLanguageCache (self, resourceIdentifiers: str, localizationStrings: typing.Dict[int, str], cacheInfo: LanguageCacheInfo) -> None:
+		_WriteCache(self._GetModLanguageCacheFilePath(resourceIdentifiers), self._GetModLanguageCacheInfoFilePath(resourceIdentifiers), localizationStrings, cacheInfo)
+
+	def GetModLanguageCache (self, resourceIdentifiers: str) -> typing.Optional[typing.Dict[int, str]]:
+		return _ReadCache(self._GetModLanguageCacheFilePath(resourceIdentifiers), self._GetModLanguageCacheInfoFilePath(resourceIdentifiers))
+
+	def GetModLanguageCacheInfo (self, resourceIdentifiers: str) -> typing.Optional[LanguageCacheInfo]:
+		return _ReadCacheInfo(self._GetModLanguageCacheFilePath(resourceIdentifiers), self._GetModLanguageCacheInfoFilePath(resourceIdentifiers))
+
+	def WriteModGenderedLanguageCache (self, resourceIdentifiers: str, genderedLocalizationStrings: typing.Union[typing.Dict[int, str], StringTable.CompactStringTable], cacheInfo: LanguageCacheInfo) -> None:
+		_WriteTableCache(self._GetModGenderedLanguageCacheFilePath(resourceIdentifiers), self._GetModGenderedLanguageCacheInfoFilePath(resourceIdentifiers), genderedLocalizationStrings, cacheInfo)
+
+	def GetModGenderedLanguageCache (self, resourceIdentifiers: str) -> typing.Optional[StringTable.CompactStringTable]:
+		return _ReadTableCache(self._GetModGenderedLanguageCacheFilePath(resourceIdentifiers), self._GetModGenderedLanguageCacheInfoFilePath(resourceIdentifiers))
+
+	def GetModGenderedLanguageCacheInfo (self, resourceIdentifiers: str) -> typing.Optional[LanguageCacheInfo]:
+		return _ReadCacheInfo(self._GetModGenderedLanguageCacheFilePath(resourceIdentifiers), self._GetModGenderedLanguageCacheInfoFilePath(resourceIdentifiers))
+
+	def RemoveUnusedModLanguageCaches (self, usedResourceIdentifiers: typing.Set[str]) -> int:
+		"""
+		Delete the mod language caches of every resource not in this set, so caches for mods that have been removed or updated don't pile up.
+		:param usedResourceIdentifiers: The identifiers of every mod STBL resource that currently exists.
+		:type usedResourceIdentifiers: typing.Set[str]
+		:return: The number of cache files removed.
+		:rtype: int
+		"""
+
+		removedFileCount = 0  # type: int
+
+		for modCacheDirectoryPath in (self.ModLanguageCacheDirectoryPath, self.ModGenderedLanguageCacheDirectoryPath):  # type: str
+			if not os.path.isdir(modCacheDirectoryPath):
+				continue
+
+			for modCacheFileName in os.listdir(modCacheDirectoryPath):  # type: str
+				modCacheResourceIdentifiers = modCacheFileName.split(".", 1)[0]  # type: str
+
+				if modCacheResourceIdentifiers.endswith("-info"):
+					modCacheResourceIdentifiers = modCacheResourceIdentifiers[:-len("-info")]
+
+				if modCacheResourceIdentifiers in usedResourceIdentifiers:
+					continue
+
+				os.remove(os.path.join(modCacheDirectoryPath, modCacheFileName))
+				removedFileCount += 1
+
+		return removedFileCount
+
+	def _GetGamePackLanguageCacheFilePath (self, packName: str, packageEntry: Package.PackageEntry) -> str:
+		return os.path.join(self.GameLanguageCacheDirectoryPath, packName, packageEntry.IdentifiersToString().replace(":", "-")) + ".json"
+
+	def _GetGamePackLanguageCacheInfoFilePath (self, packName: str, packageEntry: Package.PackageEntry) -> str:
+		return os.path.join(self.GameLanguageCacheDirectoryPath, packName, packageEntry.IdentifiersToString().replace(":", "-")) + "-info.json"
+
+	def _GetGamePackGenderedLanguageCacheFilePath (self, packName: str, packageEntry: Package.PackageEntry) -> str:
+		return os.path.join(self.GameGenderedLanguageCacheDirectoryPath, packName, packageEntry.IdentifiersToString().replace(":", "-")) + ".table"
+
+	def _GetGamePackGenderedLanguageCacheInfoFilePath (self, packName: str, packageEntry: Package.PackageEntry) -> str:
+		return os.path.join(self.GameGenderedLanguageCacheDirectoryPath, packName, packageEntry.IdentifiersToString().replace(":", "-")) + "-info.json"
+
+	def _GetModLanguageCacheFilePath (self, resourceIdentifiers: str) -> str:
+		return os.path.join(self.ModLanguageCacheDirectoryPath, resourceIdentifiers) + ".json"
+
+	def _GetModLanguageCacheInfoFilePath (self, resourceIdentifiers: str) -> str:
+		return os.path.join(self.ModLanguageCacheDirectoryPath, resourceIdentifiers) + "-info.json"
+
+	def _GetModGenderedLanguageCacheFilePath (self, resourceIdentifiers: str) -> str:
+		return os.path.join(self.ModGenderedLanguageCacheDirectoryPath, resourceIdentifiers) + ".table"
+
+	def _GetModGenderedLanguageCacheInfoFilePath (self, resourceIdentifiers: str) -> str:
+		return os.path.join(self.ModGenderedLanguageCacheDirectoryPath, resourceIdentifiers) + "-info.json"
+
+def GetContentChecksum (contentBytes: typing.Union[bytes, bytearray]) -> str:
+	"""
+	Get a short checksum of a resource's bytes, used to tell whether a cached resource has changed.
+	"""
+
+	if not isinstance(contentBytes, (bytes, bytearray)):
+		raise Exceptions.IncorrectTypeException(contentBytes, "contentBytes", (bytes, bytearray))
+
+	return "%s-%08X" % (len(contentBytes), zlib.crc32(contentBytes))
+
+def GetModResourceIdentifiers (typeID: int, groupID: int, instanceID: int) -> str:
+	"""
+	Get the string used to name the cache files of a mod resource with these identifiers.
+	"""
+
+	return "%s-%s-%s" % (typeID, groupID, instanceID)
+
+def GetGameBuildKey (basePackageFilePaths: typing.List[str]) -> str:
+	"""
+	Get a short identifier for the installed game build. This is derived from the names and fingerprints of the base game's localization package
+	files, which change with every game patch. The same build gets the same identifier wherever it is installed.
+	"""
+
+	if not isinstance(basePackageFilePaths, list):
+		raise Exceptions.IncorrectTypeException(basePackageFilePaths, "basePackageFilePaths", (list,))
+
+	buildKeyChecksum = 0  # type: int
+
+	for basePackageFilePath in sorted(basePackageFilePaths):  # type: str
+		basePackageFileDescription = "%s:%s" % (os.path.basename(basePackageFilePath).lower(), Package.GetPackageFingerprint(basePackageFilePath))  # type: str
+		buildKeyChecksum = zlib.crc32(basePackageFileDescription.encode("utf-8"), buildKeyChecksum)
+
+	return "%08X" % buildKeyChecksum
+
+def GetSharedLanguageCacheRootPath (sharedCacheDirectoryPath: str, gameBuildKey: str, handlerLanguageName: str, handlerVersion: Version.Version) -> str:
+	"""
+	Get the root path of the language cache location inside a shared cache directory that matches this game build and language handler.
+	"""
+
+	if not isinstance(sharedCacheDirectoryPath, str):
+		raise Exceptions.IncorrectTypeException(sharedCacheDirectoryPath, "sharedCacheDirectoryPath", (str,))
+
+	if not isinstance(gameBuildKey, str):
+		raise Exceptions.IncorrectTypeException(gameBuildKey, "gameBuildKey", (str,))
+
+	if not isinstance(handlerLanguageName, str):
+		raise Exceptions.IncorrectTypeException(handlerLanguageName, "handlerLanguageName", (str,))
+
+	if not isinstance(handlerVersion, Version.Version):
+		raise Exceptions.IncorrectTypeException(handlerVersion, "handlerVersion", (Version.Version,))
+
+	return os.path.join(sharedCacheDirectoryPath, gameBuildKey, handlerLanguageName, str(handlerVersion))
+
+def _WriteCache (cacheFilePath: str, cacheInfoFilePath: str, localizationStrings: typing.Dict[int, str], cacheInfo: LanguageCacheInfo) -> None:
+	cacheFilesDirectory = os.path.dirname(cacheFilePath)  # type: str
+
+	if not os.path.exists(cacheFilesDirectory):
+		os.makedirs(cacheFilesDirectory, exist_ok = True)
+
+	# The info file is written last, a reader will not use the cache file until an info file exists for it.
+	_WriteFileReplacing(cacheFilePath, json.JSONEncoder(indent = "\t").encode(localizationStrings))
+	_WriteFileReplacing(cacheInfoFilePath, json.JSONEncoder(indent = "\t").encode(cacheInfo.ToDictionary()))
+
+def _ReadCache (cacheFilePath: str, cacheInfoFilePath: str) -> typing.Optional[typing.Dict[int, str]]:
+	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
+		return None
+
+	with open(cacheFilePath, "r") as cacheFile:
+		cacheDictionary = json.JSONDecoder().decode(cacheFile.read())
+
+	cacheDictionary = { int(cachedLanguageKey): cachedLanguageText for cachedLanguageKey, cachedLanguageText in cacheDictionary.items() }
+
+	return cacheDictionary
+
+def _WriteTableCache (cacheFilePath: str, cacheInfoFilePath: str, localizationStrings: typing.Union[typing.Dict[int, str], StringTable.CompactStringTable], cacheInfo: LanguageCacheInfo) -> None:
+	cacheFilesDirectory = os.path.dirname(cacheFilePath)  # type: str
+
+	if not os.path.exists(cacheFilesDirectory):
+		os.makedirs(cacheFilesDirectory, exist_ok = True)
+
+	if not isinstance(localizationStrings, StringTable.CompactStringTable):
+		localizationStrings = StringTable.CompactStringTable.FromDictionary(localizationStrings)
+
+	_WriteFileReplacing(cacheFilePath, localizationStrings.ToBytes())
+	_WriteFileReplacing(cacheInfoFilePath, json.JSONEncoder(indent = "\t").encode(cacheInfo.ToDictionary()))
+
+def _ReadTableCache (cacheFilePath: str, cacheInfoFilePath: str) -> typing.Optional[StringTable.CompactStringTable]:
+	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
+		return None
+
+	# Tables are memory mapped, their strings are copied as bytes when they are merged into the table of all gendered strings. Whoever merges them
+	# needs to close them afterwards, a mapped file cannot be replaced on some systems.
+	return StringTable.CompactStringTable.Open(cacheFilePath, useMemoryMap = True)
+
+def _ReadCacheInfo (cacheFilePath: str, cacheInfoFilePath: str) -> typing.Optional[LanguageCacheInfo]:
+	if not os.path.exists(cacheFilePath) or not os.path.exists(cacheInfoFilePath):
+		return None
+
+	with open(cacheInfoFilePath, "r") as cacheInfoFile:
+		cacheInfoDictionary = json.JSONDecoder().decode(cacheInfoFile.read())
+
+	return LanguageCacheInfo.FromDictionary(cacheInfoDictionary)
+
+def _WriteFileReplacing (filePath: str, fileContent: typing.Union[str, bytes]) -> None:
+	"""
+	Write the file to a temporary path then move it over the target. Readers will see either the old file or the new file, never a partially written one.
+	"""
+
+	temporaryFilePath = filePath + "." + uuid.uuid4().hex + ".tmp"  # type: str
+
+	try:
+		with open(temporaryFilePath, "wb+" if isinstance(fileContent, bytes) else "w+") as temporaryFile:
+			temporaryFile.write(fileContent)
+
+		os.replace(temporaryFilePath, filePath)
+	except:
+		if os.path.exists(temporaryFilePath):
+			os.remove(temporaryFilePath)
+
+		raise
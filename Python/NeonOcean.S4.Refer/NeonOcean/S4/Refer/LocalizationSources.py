@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import array
+import bisect
+import sys
+import typing
+
+from NeonOcean.S4.Main.Tools import Exceptions
+
+class SourceTable:
+	_maximumSourceID = 65535  # type: int
+
+	def __init__ (self):
+		"""
+		Tracks which source supplied each key of a merged localization string table. While merging, the source of each key is kept in a dictionary.
+		Once frozen, keys are stored in a sorted array with a parallel array of small integer source ids, which costs a few bytes per key.
+		"""
+
+		self.SourceNames = list()  # type: typing.List[str]
+		self.SourceConflictCounts = list()  # type: typing.List[int]
+		self.ConflictCount = 0  # type: int
+
+		self._sourceIDs = dict()  # type: typing.Dict[str, int]
+		self._mergingKeySourceIDs = dict()  # type: typing.Dict[int, int]
+
+		self._frozenKeys = array.array("I")  # type: array.array
+		self._frozenKeySourceIDs = array.array("H")  # type: array.array
+
+	@property
+	def IsFrozen (self) -> bool:
+		return len(self._mergingKeySourceIDs) == 0 and len(self._frozenKeys) != 0
+
+	def AddSource (self, sourceName: str) -> int:
+		"""
+		Get the id of the source with this name, adding the source if it doesn't already exist.
+		"""
+
+		if not isinstance(sourceName, str):
+			raise Exceptions.IncorrectTypeException(sourceName, "sourceName", (str,))
+
+		sourceID = self._sourceIDs.get(sourceName, None)  # type: typing.Optional[int]
+
+		if sourceID is not None:
+			return sourceID
+
+		sourceID = len(self.SourceNames)
+
+		if sourceID > self._maximumSourceID:
+			raise Exception("Cannot track more than %s localization string sources." % (self._maximumSourceID + 1))
+
+		self.SourceNames.append(sourceName)
+		self.SourceConflictCounts.append(0)
+		self._sourceIDs[sourceName] = sourceID
+		return sourceID
+
+	def Merge (self, mergingDictionary: typing.Dict[int, str], addingStrings: typing.Dict[int, str], sourceName: str) -> int:
+		"""
+		Add these strings to the merging dictionary, recording this source as the supplier of every key. Keys that already existed in the merging
+		dictionary are counted as conflicts, the new source wins them just like a plain dictionary update would.
+		:return: The number of conflicting keys.
+		:rtype: int
+		"""
+
+		if self.IsFrozen:
+			self._Thaw()
+
+		sourceID = self.AddSource(sourceName)  # type: int
+
+		mergingDictionaryStartLength = len(mergingDictionary)  # type: int
+		mergingDictionary.update(addingStrings)
+
+		conflictCount = len(addingStrings) - (len(mergingDictionary) - mergingDictionaryStartLength)  # type: int
+		self.ConflictCount += conflictCount
+		self.SourceConflictCounts[sourceID] += conflictCount
+
+		self._mergingKeySourceIDs.update(dict.fromkeys(addingStrings, sourceID))
+
+		return conflictCount
+
+	def MergeKeys (self, addingKeys: typing.Collection[int], sourceName: str) -> int:
+		"""
+		Record this source as the supplier of these keys, for string tables that are merged later rather than through a dictionary. Keys this table
+		already recorded are counted as conflicts, the new source wins them.
+		:return: The number of conflicting keys.
+		:rtype: int
+		"""
+
+		if self.IsFrozen:
+			self._Thaw()
+
+		sourceID = self.AddSource(sourceName)  # type: int
+
+		mergingKeyStartCount = len(self._mergingKeySourceIDs)  # type: int
+		self._mergingKeySourceIDs.update(dict.fromkeys(addingKeys, sourceID))
+
+		conflictCount = len(addingKeys) - (len(self._mergingKeySourceIDs) - mergingKeyStartCount)  # type: int
+		self.ConflictCount += conflictCount
+		self.SourceConflictCounts[sourceID] += conflictCount
+
+		return conflictCount
+
+	def Freeze (self) -> None:
+		"""
+		Move the recorded sources into their compact form. Call this once merging is complete.
+		"""
+
+		frozenKeys = sorted(self._mergingKeySourceIDs)  # type: typing.List[int]
+		mergingKeySourceIDs = self._mergingKeySourceIDs  # type: typing.Dict[int, int]
+
+		self._frozenKeys = array.array("I", frozenKeys)
+		self._frozenKeySourceIDs = array.array("H", (mergingKeySourceIDs[frozenKey] for frozenKey in frozenKeys))
+		self._mergingKeySourceIDs = dict()
+
+	def GetSourceID (self, key: int) -> typing.Optional[int]:
+		"""
+		Get the id of the source that supplied this key, or none if the key was never merged.
+		"""
+
+		if len(self._mergingKeySourceIDs) != 0:
+			return self._mergingKeySourceIDs.get(key, None)
+
+		keyIndex = bisect.bisect_left(self._frozenKeys, key)  # type: int
+
+		if keyIndex == len(self._frozenKeys) or self._frozenKeys[keyIndex] != key:
+			return None
+
+		return self._frozenKeySourceIDs[keyIndex]
+
+	def GetSourceName (self, key: int) -> typing.Optional[str]:
+		"""
+		Get the name of the source that supplied this key, or none if the key was never merged.
+		"""
+
+		sourceID = self.GetSourceID(key)  # type: typing.Optional[int]
+
+		if sourceID is None:
+			return None
+
+		return self.SourceNames[sourceID]
+
+	def GetSourceKeys (self, sourceName: str) -> typing.List[int]:
+		"""
+		Get every key this source supplied that was not later replaced by another source.
+		"""
+
+		sourceID = self._sourceIDs.get(sourceName, None)  # type: typing.Optional[int]
+
+		if sourceID is None:
+			return list()
+
+		if len(self._mergingKeySourceIDs) != 0:
+			return [ key for key, keySourceID in self._mergingKeySourceIDs.items() if keySourceID == sourceID ]
+
+		return [ self._frozenKeys[keyIndex] for keyIndex, keySourceID in enumerate(self._frozenKeySourceIDs) if keySourceID == sourceID ]
+
+	def GetKeyCount (self) -> int:
+		if len(self._mergingKeySourceIDs) != 0:
+			return len(self._mergingKeySourceIDs)
+
+		return len(self._frozenKeys)
+
+	def GetMemorySize (self) -> int:
+		"""
+		Get an estimate of the number of bytes this table holds in memory. Key and source id objects in the merging dictionary are not counted, keys are
+		shared with the merged string tables and source ids are small shared integers.
+		"""
+
+		return sys.getsizeof(self) + \
+			   sys.getsizeof(self.SourceNames) + sum(sys.getsizeof(sourceName) for sourceName in self.SourceNames) + \
+			   sys.getsizeof(self._sourceIDs) + sys.getsizeof(self._mergingKeySourceIDs) + \
+			   sys.getsizeof(self._frozenKeys) + sys.getsizeof(self._frozenKeySourceIDs)
+
+	def Reset (self) -> None:
+		self.SourceNames = list()
+		self.SourceConflictCounts = list()
+		self.ConflictCount = 0
+
+		self._sourceIDs = dict()
+		self._mergingKeySourceIDs = dict()
+
+		self._frozenKeys = array.array("I")
+		self._frozenKeySourceIDs = array.array("H")
+
+	def _Thaw (self) -> None:
+		self._mergingKeySourceIDs = dict(zip(self._frozenKeys, self._frozenKeySourceIDs))
+		self._frozenKeys = array.array("I")
+		self._frozenKeySourceIDs = array.array("H")
+
+def GetGamePackSourceName (packName: str, entryIdentifiers: str) -> str:
+	return "Game/%s/%s" % (packName, entryIdentifiers)
+
+def GetModSourceName (resourceIdentifiers: str) -> str:
+	return "Mods/%s" % resourceIdentifiers
+
+def GetLocalizationStringSource (key: int) -> typing.Optional[str]:
+	"""
+	Get the name of the game pack STBL entry or mod STBL resource that supplied the localization string with this key.
+	"""
+
+	return AllLocalizationStringSources.GetSourceName(key)
+
+def GetGenderedLocalizationStringSource (key: int) -> typing.Optional[str]:
+	"""
+	Get the name of the game pack STBL entry or mod STBL resource that supplied the gendered localization string with this key.
+	"""
+
+	return GenderedLocalizationStringSources.GetSourceName(key)
+
+AllLocalizationStringSources = SourceTable()  # type: SourceTable
+GenderedLocalizationStringSources = SourceTable()  # type: SourceTable
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import os
+import typing
+
+from NeonOcean.S4.Main.Tools import Exceptions
+from NeonOcean.S4.Refer import PronounSets, Settings, This
+
+# Pronoun set packs are files holding any number of custom pronoun sets, so sets can be backed up, shared or moved between games without being rebuilt
+# one pair at a time in the edit pronoun set dialog. Importing validates every set and saves the settings once, no matter how many sets are in the pack.
+
+PackVersion = 1  # type: int
+
+DefaultPackFileName = "Pronoun Sets.json"  # type: str
+
+class ImportResult:
+	def __init__ (self):
+		self.AddedCount = 0  # type: int
+		self.ReplacedCount = 0  # type: int
+		self.KeptCount = 0  # type: int  # Sets in the pack that weren't imported because a set with the same identifier exists and replacing was not allowed.
+		self.InvalidCount = 0  # type: int
+		self.DroppedPairCount = 0  # type: int  # Invalid pairs left out of sets that were otherwise valid.
+
+def GetPackFilePath (fileName: str) -> str:
+	"""
+	Get the path of a pack file in this mod's persistent data directory. Packs can only be read from or written to this directory.
+	"""
+
+	if not isinstance(fileName, str):
+		raise Exceptions.IncorrectTypeException(fileName, "fileName", (str,))
+
+	if fileName == "" or os.path.basename(fileName) != fileName:
+		raise ValueError("'%s' is not a valid pack file name." % fileName)
+
+	return os.path.join(This.Mod.PersistentPath, fileName)
+
+def ExportPack (packFilePath: str, setIdentifiers: typing.Optional[typing.Set[str]] = None) -> int:
+	"""
+	Write custom pronoun sets to a pack file.
+	:param packFilePath: The path of the pack file, an existing file will be replaced.
+	:type packFilePath: str
+	:param setIdentifiers: The identifiers of the sets to export. Every custom set will be exported if this is none.
+	:type setIdentifiers: typing.Optional[typing.Set[str]]
+	:return: The number of sets written.
+	"""
+
+	if not isinstance(packFilePath, str):
+		raise Exceptions.IncorrectTypeException(packFilePath, "packFilePath", (str,))
+
+	if not isinstance(setIdentifiers, set) and setIdentifiers is not None:
+		raise Exceptions.IncorrectTypeException(setIdentifiers, "setIdentifiers", (set, None))
+
+	customSets = PronounSets.GetCustomPronounSets()  # type: dict
+
+	if setIdentifiers is not None:
+		customSets = { setIdentifier: setValue for setIdentifier, setValue in customSets.items() if setIdentifier in setIdentifiers }
+
+	packDirectoryPath = os.path.dirname(packFilePath)  # type: str
+
+	if packDirectoryPath != "" and not os.path.exists(packDirectoryPath):
+		os.makedirs(packDirectoryPath)
+
+	temporaryPackFilePath = packFilePath + ".tmp"  # type: str
+
+	with open(temporaryPackFilePath, "w+", encoding = "utf-8") as packFile:
+		packFile.write(json.JSONEncoder(ensure_ascii = False, separators = (",", ":")).encode({
+			"Version": PackVersion,
+			"Sets": customSets
+		}))
+
+	os.replace(temporaryPackFilePath, packFilePath)
+
+	return len(customSets)
+
+def ReadPack (packFilePath: str, importResult: typing.Optional[ImportResult] = None) -> typing.Dict[str, dict]:
+	"""
+	Read and validate the sets in a pack file. Sets that aren't valid are left out, as are invalid pairs in otherwise valid sets.
+	:param importResult: If not none, the number of invalid sets and pairs will be added to this.
+	:type importResult: typing.Optional[ImportResult]
+	:return: The pack's valid sets by identifier.
+	"""
+
+	if not isinstance(packFilePath, str):
+		raise Exceptions.IncorrectTypeException(packFilePath, "packFilePath", (str,))
+
+	with open(packFilePath, encoding = "utf-8") as packFile:
+		pack = json.JSONDecoder().decode(packFile.read())  # type: typing.Any
+
+	if not isinstance(pack, dict):
+		raise ValueError("The pack file '%s' is not a pronoun set pack." % packFilePath)
+
+	if pack.get("Version", None) != PackVersion:
+		raise ValueError("Unsupported pronoun set pack version '%s', expected version '%s'." % (pack.get("Version", None), PackVersion))
+
+	packSets = pack.get("Sets", None)  # type: typing.Any
+
+	if not isinstance(packSets, dict):
+		raise ValueError("The pack file '%s' has no sets." % packFilePath)
+
+	if importResult is None:
+		importResult = ImportResult()
+
+	validSets = dict()  # type: typing.Dict[str, dict]
+
+	for setIdentifier, setValue in packSets.items():  # type: str, typing.Any
+		validSet = _ValidateSet(setValue, importResult)  # type: typing.Optional[dict]
+
+		if validSet is None or setIdentifier == "" or setIdentifier in {"0", "1"}:
+			importResult.InvalidCount += 1
+			continue
+
+		validSets[setIdentifier] = validSet
+
+	return validSets
+
+def ImportPack (packFilePath: str, replaceExisting: bool = True) -> ImportResult:
+	"""
+	Add the sets in a pack file to the custom pronoun sets. The settings are saved once, after every set has been merged.
+	:param replaceExisting: If true, sets in the pack replace custom sets with the same identifier, otherwise the existing sets are kept.
+	:type replaceExisting: bool
+	"""
+
+	if not isinstance(replaceExisting, bool):
+		raise Exceptions.IncorrectTypeException(replaceExisting, "replaceExisting", (bool,))
+
+	importResult = ImportResult()  # type: ImportResult
+	packSets = ReadPack(packFilePath, importResult = importResult)  # type: typing.Dict[str, dict]
+
+	customSets = PronounSets.GetCustomPronounSets()  # type: dict
+
+	for setIdentifier, setValue in packSets.items():  # type: str, dict
+		if setIdentifier in customSets:
+			if not replaceExisting:
+				importResult.KeptCount += 1
+				continue
+
+			importResult.ReplacedCount += 1
+		else:
+			importResult.AddedCount += 1
+
+		customSets[setIdentifier] = setValue
+
+	if importResult.AddedCount != 0 or importResult.ReplacedCount != 0:
+		Settings.CustomPronounSets.Set(customSets)
+
+	return importResult
+
+def _ValidateSet (setValue: typing.Any, importResult: ImportResult) -> typing.Optional[dict]:
+	if not isinstance(setValue, dict):
+		return None
+
+	setTitle = setValue.get("Title", None)  # type: typing.Any
+	setPairs = setValue.get("Set", None)  # type: typing.Any
+
+	if not isinstance(setTitle, str) or not isinstance(setPairs, dict):
+		return None
+
+	validPairs = dict()  # type: typing.Dict[str, typing.Union[int, str, dict]]
+
+	for pairIdentifier, pairValue in setPairs.items():  # type: str, typing.Any
+		validPairValue = _ValidatePairValue(pairValue) if pairIdentifier.count("|") == 1 else None  # type: typing.Union[None, int, str, dict]
+
+		if validPairValue is None:
+			importResult.DroppedPairCount += 1
+			continue
+
+		validPairs[pairIdentifier] = validPairValue
+
+	return {
+		"Title": setTitle,
+		"Set": validPairs
+	}
+
+def _ValidatePairValue (pairValue: typing.Any) -> typing.Union[None, int, str, dict]:
+	if isinstance(pairValue, bool):
+		return None
+
+	if isinstance(pairValue, int):
+		return pairValue if pairValue in (0, 1) else None
+
+	if isinstance(pairValue, str):
+		return pairValue
+
+	if not isinstance(pairValue, dict):
+		return None
+
+	casesDefault = pairValue.get("Default", None)  # type: typing.Any
+	cases = pairValue.get("Cases", dict())  # type: typing.Any
+
+	if (not isinstance(casesDefault, str) and casesDefault is not None) or not isinstance(cases, dict):
+		return None
+
+	validCases = dict()  # type: typing.Dict[str, typing.List[str]]
+
+	for caseTextKey, caseTexts in cases.items():  # type: str, typing.Any
+		if not caseTextKey.isdigit() or not isinstance(caseTexts, list) or not all(isinstance(caseText, str) for caseText in caseTexts):
+			return None
+
+		validCases[caseTextKey] = caseTexts
+
+	validPairValue = { "Cases": validCases }  # type: dict
+
+	if casesDefault is not None:
+		validPairValue["Default"] = casesDefault
+
+	return validPairValue
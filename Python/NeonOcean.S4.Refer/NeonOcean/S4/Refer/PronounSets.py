@@ -1,7 +1,33 @@
 import typing
 
+from NeonOcean.S4.Main import Debug
 from NeonOcean.S4.Main.Tools import Exceptions
-from NeonOcean.S4.Refer import LanguageHandlers, Settings
+from NeonOcean.S4.Refer import LanguageHandlers, Settings, This
+from NeonOcean.S4.Refer.Diagnostics import Timing
+
+class CompiledPairCases:
+	def __init__ (self, default: typing.Optional[str], cases: typing.Dict[int, typing.Tuple[str, ...]]):
+		"""
+		A pronoun set pair value with text that changes depending on the string it appears in.
+		:param default: The text used in strings without a case, or none to use the sim's fallback.
+		:type default: typing.Optional[str]
+		:param cases: The text for each gendered tag pair in a string, by the string's key.
+		:type cases: typing.Dict[int, typing.Tuple[str, ...]]
+		"""
+
+		self.Default = default  # type: typing.Optional[str]
+		self.Cases = cases  # type: typing.Dict[int, typing.Tuple[str, ...]]
+
+class CompiledPronounSet:
+	def __init__ (self, identifier: str, title: typing.Optional[str], pairs: typing.Dict[str, typing.Union[int, str, CompiledPairCases]]):
+		"""
+		A validated pronoun set, ready to be used to correct text. Pair identifiers have been standardized by the language handler the set was compiled
+		for, pairs that would use the sim's fallback are left out.
+		"""
+
+		self.Identifier = identifier  # type: str
+		self.Title = title  # type: typing.Optional[str]
+		self.Pairs = pairs  # type: typing.Dict[str, typing.Union[int, str, CompiledPairCases]]
 
 def GetPronounSet (setIdentifier: str, targetLanguageHandler: typing.Type[LanguageHandlers.LanguageHandlerBase]) -> typing.Optional[dict]:
 	if not isinstance(setIdentifier, str):
@@ -9,6 +35,7 @@ def GetPronounSet (setIdentifier: str, targetLanguageHandler: typing.Type[Langua
 
 	return GetAllPronounSets(targetLanguageHandler).get(setIdentifier, None)
 
+@Timing.Timed("PronounSets.GetAllPronounSets")
 def GetAllPronounSets (targetLanguageHandler: typing.Optional[typing.Type[LanguageHandlers.LanguageHandlerBase]]) -> dict:
 	allSets = dict()  # type: dict
 	allSets.update(GetCustomPronounSets())
@@ -23,3 +50,111 @@ def GetCustomPronounSets () -> dict:
 	customSets.update(Settings.CustomPronounSets.Get())
 
 	return customSets
+
+def GetCustomPronounSetsVersion () -> int:
+	"""
+	Get a number that changes every time the custom pronoun sets change.
+	"""
+
+	return Settings.CustomPronounSets.GetVersion()
+
+def GetCompiledPronounSet (setIdentifier: str, targetLanguageHandler: typing.Type[LanguageHandlers.LanguageHandlerBase]) -> typing.Optional[CompiledPronounSet]:
+	"""
+	Get a compiled custom or standard pronoun set. Sets are compiled the first time one is requested after the custom sets change or the language handler
+	changes, later requests are a dictionary lookup.
+	:param setIdentifier: The set's identifier, in lower case.
+	:type setIdentifier: str
+	"""
+
+	global _compiledSets, _compiledSetsLanguageHandler, _compiledSetsVersion
+
+	customSetsVersion = Settings.CustomPronounSets.GetVersion()  # type: int
+
+	if _compiledSets is None or _compiledSetsLanguageHandler is not targetLanguageHandler or _compiledSetsVersion != customSetsVersion:
+		_compiledSets = CompilePronounSets(GetAllPronounSets(targetLanguageHandler), targetLanguageHandler)
+		_compiledSetsLanguageHandler = targetLanguageHandler
+		_compiledSetsVersion = customSetsVersion
+
+	return _compiledSets.get(setIdentifier, None)
+
+@Timing.Timed("PronounSets.CompilePronounSets")
+def CompilePronounSets (pronounSets: dict, targetLanguageHandler: typing.Type[LanguageHandlers.LanguageHandlerBase]) -> typing.Dict[str, CompiledPronounSet]:
+	"""
+	Validate and compile pronoun sets. Invalid sets and pairs are logged and left out.
+	:return: The compiled sets by their identifiers, in lower case. Where two identifiers only differ by case, the set that comes last wins.
+	"""
+
+	compiledSets = dict()  # type: typing.Dict[str, CompiledPronounSet]
+
+	for setIdentifier, setContainer in pronounSets.items():  # type: str, typing.Any
+		if not isinstance(setIdentifier, str):
+			continue
+
+		if not isinstance(setContainer, dict) or not isinstance(setContainer.get("Set", None), dict):
+			Debug.Log("Found an invalid pronoun set with the identifier '%s'." % setIdentifier, This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":InvalidSet")
+			continue
+
+		setTitle = setContainer.get("Title", None)  # type: typing.Any
+		compiledPairs = _CompilePairs(setIdentifier, setContainer["Set"], targetLanguageHandler)  # type: typing.Dict[str, typing.Union[int, str, CompiledPairCases]]
+
+		compiledSets[setIdentifier.lower()] = CompiledPronounSet(setIdentifier, setTitle if isinstance(setTitle, str) else None, compiledPairs)
+
+	return compiledSets
+
+def _CompilePairs (setIdentifier: str, pairs: dict, targetLanguageHandler: typing.Type[LanguageHandlers.LanguageHandlerBase]) -> typing.Dict[str, typing.Union[int, str, CompiledPairCases]]:
+	compiledPairs = dict()  # type: typing.Dict[str, typing.Union[int, str, CompiledPairCases]]
+
+	for pairIdentifier, pairValue in pairs.items():  # type: str, typing.Any
+		if not isinstance(pairIdentifier, str):
+			continue
+
+		standardPairIdentifier = _StandardizePairIdentifier(pairIdentifier, targetLanguageHandler)  # type: str
+
+		if standardPairIdentifier != pairIdentifier and standardPairIdentifier in pairs:
+			continue  # A pair already written the standard way takes precedence.
+
+		if pairValue is None:
+			continue
+		elif isinstance(pairValue, int):
+			compiledPairs[standardPairIdentifier] = pairValue
+		elif isinstance(pairValue, str):
+			if pairValue == "" or pairValue.isspace():
+				continue
+
+			compiledPairs[standardPairIdentifier] = pairValue
+		elif isinstance(pairValue, dict):
+			compiledPairs[standardPairIdentifier] = _CompilePairCases(pairValue)
+		else:
+			Debug.Log("Unknown gendered pair set value for '%s' in the set '%s'." % (pairIdentifier, setIdentifier), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":UnknownPairValue", lockThreshold = 2)
+
+	return compiledPairs
+
+def _CompilePairCases (pairValue: dict) -> CompiledPairCases:
+	casesDefault = pairValue.get("Default", None)  # type: typing.Any
+	cases = pairValue.get("Cases", None)  # type: typing.Any
+
+	compiledCases = dict()  # type: typing.Dict[int, typing.Tuple[str, ...]]
+
+	if isinstance(cases, dict):
+		for caseTextKey, caseTexts in cases.items():  # type: typing.Union[int, str], typing.Any
+			if isinstance(caseTextKey, str) and caseTextKey.isdigit():
+				caseTextKey = int(caseTextKey)  # Sets saved to the settings file have their text keys turned into strings.
+
+			if not isinstance(caseTextKey, int) or not isinstance(caseTexts, (list, tuple)):
+				continue
+
+			compiledCases[caseTextKey] = tuple(caseTexts)
+
+	return CompiledPairCases(casesDefault if isinstance(casesDefault, str) else None, compiledCases)
+
+def _StandardizePairIdentifier (pairIdentifier: str, targetLanguageHandler: typing.Type[LanguageHandlers.LanguageHandlerBase]) -> str:
+	pairIdentifierParts = pairIdentifier.split("|")  # type: typing.List[str]
+
+	if len(pairIdentifierParts) != 2:
+		return pairIdentifier
+
+	return targetLanguageHandler.GetGenderTagTextIdentifierPart(pairIdentifierParts[0]) + "|" + targetLanguageHandler.GetGenderTagTextIdentifierPart(pairIdentifierParts[1])
+
+_compiledSets = None  # type: typing.Optional[typing.Dict[str, CompiledPronounSet]]
+_compiledSetsLanguageHandler = None  # type: typing.Optional[typing.Type[LanguageHandlers.LanguageHandlerBase]]
+_compiledSetsVersion = None  # type: typing.Optional[int]
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import time
+import typing
+
+import alarms
+import clock
+import services
+import zone
+from NeonOcean.S4.Main import Debug, Director, Language, LoadingShared
+from NeonOcean.S4.Main.Tools import Exceptions
+from NeonOcean.S4.Main.UI import Notifications
+from NeonOcean.S4.Refer import This
+from NeonOcean.S4.Refer.PronounSettings import Base as SettingsBase
+from sims import sim_info
+from sims4 import localization
+
+SliceInterval = 0.1  # type: float  # The number of real seconds between slices of an assignment.
+SliceBudget = 0.004  # type: float  # The number of seconds a slice may spend assigning values before waiting for the next slice.
+ProgressInterval = 10.0  # type: float  # The least number of real seconds between progress notifications of a running assignment.
+
+NotificationTitle = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Title")  # type: Language.String
+StartedNotificationText = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Started_Text")  # type: Language.String
+ProgressNotificationText = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Progress_Text")  # type: Language.String
+FinishedNotificationText = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Finished_Text")  # type: Language.String
+CanceledNotificationText = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Canceled_Text")  # type: Language.String
+FailedNotificationText = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Failed_Text")  # type: Language.String
+FailedCountNotificationText = Language.String(This.Mod.Namespace + ".Pronoun_Settings.Assignment.Notification.Failed_Count_Text")  # type: Language.String
+
+# Assigns pronoun setting values to every sim matching a filter. Sims are worked through in slices run by a real time alarm, each slice stops once its
+# budget is spent so large populations don't stall the game. The values assigned in a slice are written together, with a single update, and the
+# settings are saved once the assignment finishes.
+
+class AssignmentFilter:
+	def __init__ (self, householdID: typing.Optional[int] = None, ageNames: typing.Optional[typing.Set[str]] = None, traitID: typing.Optional[int] = None):
+		"""
+		Decides which sims an assignment applies to. Sims need to match every part of the filter that isn't none.
+		:param householdID: The id of the household sims need to be in.
+		:type householdID: typing.Optional[int]
+		:param ageNames: The names of the ages sims can be, such as 'ADULT' or 'ELDER'. Names are not case sensitive.
+		:type ageNames: typing.Optional[typing.Set[str]]
+		:param traitID: The tuning id of a trait sims need to have.
+		:type traitID: typing.Optional[int]
+		"""
+
+		if not isinstance(householdID, int) and householdID is not None:
+			raise Exceptions.IncorrectTypeException(householdID, "householdID", (int, None))
+
+		if not isinstance(ageNames, set) and ageNames is not None:
+			raise Exceptions.IncorrectTypeException(ageNames, "ageNames", (set, None))
+
+		if not isinstance(traitID, int) and traitID is not None:
+			raise Exceptions.IncorrectTypeException(traitID, "traitID", (int, None))
+
+		self.HouseholdID = householdID  # type: typing.Optional[int]
+		self.AgeNames = { ageName.upper() for ageName in ageNames } if ageNames is not None else None  # type: typing.Optional[typing.Set[str]]
+		self.TraitID = traitID  # type: typing.Optional[int]
+
+	def Matches (self, targetSimInfo: sim_info.SimInfo) -> bool:
+		if self.HouseholdID is not None and targetSimInfo.household_id != self.HouseholdID:
+			return False
+
+		if self.AgeNames is not None and targetSimInfo.age.name not in self.AgeNames:
+			return False
+
+		if self.TraitID is not None:
+			if not any(getattr(trait, "guid64", None) == self.TraitID for trait in targetSimInfo.get_traits()):
+				return False
+
+		return True
+
+class Assignment:
+	def __init__ (self, values: typing.Dict[str, typing.Any], assignmentFilter: AssignmentFilter):
+		"""
+		An assignment of pronoun setting values to every sim matching a filter.
+		:param values: The values to assign, by setting key.
+		:type values: typing.Dict[str, typing.Any]
+		:param assignmentFilter: The filter sims need to match to be assigned the values.
+		:type assignmentFilter: AssignmentFilter
+		"""
+
+		if not isinstance(values, dict):
+			raise Exceptions.IncorrectTypeException(values, "values", (dict,))
+
+		if not isinstance(assignmentFilter, AssignmentFilter):
+			raise Exceptions.IncorrectTypeException(assignmentFilter, "assignmentFilter", (AssignmentFilter,))
+
+		for valueKey in values.keys():  # type: str
+			if not isinstance(valueKey, str):
+				raise Exceptions.IncorrectTypeException(valueKey, "values<Key>", (str,))
+
+			if not SettingsBase._isSetup(valueKey):
+				raise Exception("Cannot assign values to the non setup setting '%s'." % valueKey)
+
+		self.Values = dict(values)  # type: typing.Dict[str, typing.Any]
+		self.Filter = assignmentFilter  # type: AssignmentFilter
+
+		self.CheckedCount = 0  # type: int
+		self.AssignedCount = 0  # type: int
+		self.FailedCount = 0  # type: int
+
+		self._remainingSimIDs = list()  # type: typing.List[int]
+		self._totalCount = 0  # type: int
+		self._alarmHandle = None  # type: typing.Optional[alarms.AlarmHandle]
+		self._lastProgressTime = 0.0  # type: float
+
+	@property
+	def TotalCount (self) -> int:
+		return self._totalCount
+
+	@property
+	def Running (self) -> bool:
+		return self._alarmHandle is not None
+
+	def Start (self) -> None:
+		if self.Running:
+			raise Exception("This assignment is already running.")
+
+		# Only sim ids are taken up front, sims are looked up again when their turn comes in case they were removed in the mean time.
+		self._remainingSimIDs = [ simInfo.sim_id for simInfo in services.sim_info_manager().get_all() ]
+		self._remainingSimIDs.reverse()
+		self._totalCount = len(self._remainingSimIDs)
+		self._lastProgressTime = time.perf_counter()
+
+		self._alarmHandle = alarms.add_alarm_real_time(self, clock.interval_in_real_seconds(SliceInterval), self._OnSliceAlarm, repeating = True, use_sleep_time = False)
+
+	def Stop (self) -> None:
+		if self._alarmHandle is None:
+			return
+
+		alarms.cancel_alarm(self._alarmHandle)
+		self._alarmHandle = None
+
+	def RunSlice (self) -> bool:
+		"""
+		Assign values to sims until the slice budget has been spent.
+		:return: True if every sim has been checked.
+		"""
+
+		simInfoManager = services.sim_info_manager()
+		sliceStartTime = time.perf_counter()  # type: float
+		sliceValues = list()  # type: typing.List[typing.Tuple[str, str, typing.Any]]
+
+		while len(self._remainingSimIDs) != 0 and time.perf_counter() - sliceStartTime < SliceBudget:
+			simID = self._remainingSimIDs.pop()  # type: int
+			simInfo = simInfoManager.get(simID)  # type: typing.Optional[sim_info.SimInfo]
+			self.CheckedCount += 1
+
+			if simInfo is None:
+				continue
+
+			try:
+				if not self.Filter.Matches(simInfo):
+					continue
+			except Exception:
+				self.FailedCount += 1
+				Debug.Log("Failed to check whether a sim with the id '%s' matches a pronoun assignment's filter." % simID, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":FilterFailure")
+				continue
+
+			for valueKey, value in self.Values.items():  # type: str, typing.Any
+				sliceValues.append((str(simID), valueKey, value))
+
+			self.AssignedCount += 1
+
+		if len(sliceValues) != 0:
+			SettingsBase.SetMany(sliceValues, autoSave = False)
+
+		return len(self._remainingSimIDs) == 0
+
+	def _OnSliceAlarm (self, alarmHandle: alarms.AlarmHandle) -> None:
+		try:
+			finished = self.RunSlice()  # type: bool
+		except Exception:
+			Debug.Log("Failed to run a slice of a pronoun assignment.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+			_FinishAssignment(self, failed = True)
+			return
+
+		if finished:
+			_FinishAssignment(self)
+			return
+
+		currentTime = time.perf_counter()  # type: float
+
+		if currentTime - self._lastProgressTime >= ProgressInterval:
+			self._lastProgressTime = currentTime
+			checkedPercentage = self.CheckedCount * 100 // max(self.TotalCount, 1)  # type: int
+			_ShowNotification(ProgressNotificationText, self.CheckedCount, self.TotalCount, checkedPercentage, self.AssignedCount, _GetFailedText(self))
+
+class _Announcer(Director.Announcer):
+	@classmethod
+	def ZoneOnToreDown (cls, zoneReference: zone.Zone, clientReference) -> None:
+		# The game cancels alarms belonging to a zone when it is torn down, the values assigned so far are kept.
+		if _runningAssignment is not None:
+			_FinishAssignment(_runningAssignment, canceled = True)
+
+def StartAssignment (values: typing.Dict[str, typing.Any], assignmentFilter: AssignmentFilter) -> Assignment:
+	"""
+	Start assigning values to every sim matching a filter. An exception will be raised if another assignment is still running.
+	"""
+
+	global _runningAssignment
+
+	if _runningAssignment is not None:
+		raise Exception("Another pronoun assignment is still running.")
+
+	assignment = Assignment(values, assignmentFilter)  # type: Assignment
+	assignment.Start()
+	_runningAssignment = assignment
+
+	_ShowNotification(StartedNotificationText, assignment.TotalCount)
+
+	return assignment
+
+def GetRunningAssignment () -> typing.Optional[Assignment]:
+	return _runningAssignment
+
+def CancelAssignment () -> bool:
+	"""
+	Stop the running assignment, values already assigned are kept.
+	:return: True if an assignment was running.
+	"""
+
+	if _runningAssignment is None:
+		return False
+
+	_FinishAssignment(_runningAssignment, canceled = True)
+	return True
+
+def _FinishAssignment (assignment: Assignment, canceled: bool = False, failed: bool = False) -> None:
+	global _runningAssignment
+
+	assignment.Stop()
+
+	if _runningAssignment is assignment:
+		_runningAssignment = None
+
+	try:
+		SettingsBase.Save()
+	except Exception:
+		Debug.Log("Failed to save pronoun settings after an assignment.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+
+	if failed:
+		resultText = FailedNotificationText  # type: Language.String
+	elif canceled:
+		resultText = CanceledNotificationText  # type: Language.String
+	else:
+		resultText = FinishedNotificationText  # type: Language.String
+
+	_ShowNotification(resultText, assignment.CheckedCount, assignment.TotalCount, assignment.AssignedCount, _GetFailedText(assignment))
+
+def _GetFailedText (assignment: Assignment) -> localization.LocalizedString:
+	if assignment.FailedCount == 0:
+		return Language.CreateLocalizationString("")
+
+	return FailedCountNotificationText.GetLocalizationString(assignment.FailedCount)
+
+def _ShowNotification (text: Language.String, *tokens) -> None:
+	try:
+		notificationArguments = {
+			"title": NotificationTitle.GetCallableLocalizationString(),
+			"text": text.GetCallableLocalizationString(*tokens),
+		}  # type: typing.Dict[str, ...]
+
+		Notifications.ShowNotification(queue = True, **notificationArguments)
+	except Exception:
+		Debug.Log("Failed to show a pronoun assignment notification.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+
+def _OnStop (cause: LoadingShared.UnloadingCauses) -> None:
+	if cause:
+		pass
+
+	if _runningAssignment is not None:
+		_runningAssignment.Stop()
+
+_runningAssignment = None  # type: typing.Optional[Assignment]
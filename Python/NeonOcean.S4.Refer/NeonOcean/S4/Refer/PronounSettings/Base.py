@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import heapq
 import sys
 import types
 import typing
 
+import zone
 from NeonOcean.S4.Refer import Saving, This
-from NeonOcean.S4.Main import Debug, Language, LoadingShared
+from NeonOcean.S4.Refer.Diagnostics import Timing
+from NeonOcean.S4.Main import Debug, Director, Language, LoadingShared
 from NeonOcean.S4.Main.Abstract import Settings as AbstractSettings
 from NeonOcean.S4.Main.Data import Persistence, PersistenceBranched
 from NeonOcean.S4.Main.Tools import Events, Exceptions, Types, Version
@@ -17,7 +20,16 @@ DefaultSettings = None  # type: typing.Optional[Persistence.PersistentSection]
 
 AllSettings = list()  # type: typing.List[typing.Type[Setting]]
 
-_previousValues = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Any]]
+ElideDefaultValues = True  # type: bool  # If true, setting a sim's value to its default resets it instead, so only sims with customized values are saved.
+
+_defaultValues = dict()  # type: typing.Dict[str, typing.Any]
+
+# Writes and override changes mark the branches they touch as dirty as they happen, update events then report only those branches instead of comparing
+# every branch of every setting to the values from the last update.
+_dirtyValues = dict()  # type: typing.Dict[str, typing.Set[str]]  # Dirty branches by setting key.
+_dirtyKeys = set()  # type: typing.Set[str]  # Settings where every branch is dirty, such as after a universal override changed.
+_allValuesDirty = True  # type: bool  # Set until the first update and after loads, when any value may have changed.
+_knownBranches = dict()  # type: typing.Dict[str, typing.Set[str]]  # The branches each setting had values for as of the last update.
 
 _onUpdateWrapper = Events.EventHandler()  # type: Events.EventHandler
 _onLoadWrapper = Events.EventHandler()  # type: Events.EventHandler
@@ -50,8 +62,7 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 	ListPath = "Root"  # type: str
 	ListPriority = 0  # type: typing.Union[float, int]
 
-	_overrides = None  # type: typing.Optional[typing.Dict[str, typing.List[_SettingOverride]]]
-	_universalOverrides = None  # type: typing.Optional[typing.List[_SettingOverride]]
+	_overrideStore = None  # type: typing.Optional[_SettingOverrideStore]
 
 	def __init_subclass__ (cls, **kwargs):
 		super().OnInitializeSubclass()
@@ -87,6 +98,7 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		return False
 
 	@classmethod
+	@Timing.Timed("PronounSettings.Get")
 	def Get (cls, simID: str, ignoreOverride: bool = False) -> typing.Any:
 		"""
 		Get the setting's value.
@@ -103,15 +115,12 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not isinstance(ignoreOverride, bool):
 			raise Exceptions.IncorrectTypeException(ignoreOverride, "ignoreOverride", (bool,))
 
-		if ignoreOverride:
-			return _Get(simID, cls.Key)
+		overrideStore = cls._overrideStore  # type: typing.Optional[_SettingOverrideStore]
 
-		if not cls.IsOverridden(simID):
+		if ignoreOverride or overrideStore is None or not overrideStore.IsOverridden(simID):
 			return _Get(simID, cls.Key)
 
-		activeOverrideIdentifier = cls.GetActiveOverrideIdentifier(simID)  # type: str
-		activeOverrideValue = cls.GetOverrideValue(activeOverrideIdentifier)  # type: typing.Any
-		return activeOverrideValue
+		return overrideStore.GetActiveOverride(simID).Value
 
 	@classmethod
 	def GetAllBranches (cls, ignoreOverrides: bool = False) -> typing.Dict[str, typing.Any]:
@@ -234,28 +243,11 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 
 		value = cls.Verify(value)
 
-		if cls._overrides is None:
-			cls._overrides = dict()
-
-		if cls._universalOverrides is not None:
-			if any(universalOverride.Identifier == overrideIdentifier for universalOverride in cls._universalOverrides):
-				raise Exception("The identifier '" + overrideIdentifier + "' has already been taken by a universal override.")
-
-		for testingBranch, testingOverrides in cls._overrides.items():  # type: str, typing.List[_SettingOverride]
-			for testingOverride in testingOverrides:  # type: _SettingOverride
-				if testingOverride.Identifier == overrideIdentifier:
-					raise Exception("The identifier '" + overrideIdentifier + "' has already been taken by a override for the branch '" + testingBranch + "'.")
-
-		if not simID in cls._overrides:
-			branchOverrides = list()  # type: typing.List[_SettingOverride]
-
-			cls._overrides[simID] = branchOverrides
-			branchOverrides.append(_SettingOverride(value, overrideIdentifier, overridePriority, overrideReasonText))
-		else:
-			branchOverrides = cls._overrides[simID]  # type: typing.List[_SettingOverride]
-			branchOverrides.append(_SettingOverride(value, overrideIdentifier, overridePriority, overrideReasonText))
+		if cls._overrideStore is None:
+			cls._overrideStore = _SettingOverrideStore()
 
-		branchOverrides.sort(key = lambda sortingOverride: sortingOverride.Priority, reverse = True)
+		cls._overrideStore.Add(simID, _SettingOverride(value, overrideIdentifier, overridePriority, overrideReasonText))
+		_MarkDirty(simID, cls.Key)
 		Update()
 
 	@classmethod
@@ -295,20 +287,11 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 
 		value = cls.Verify(value)
 
-		if cls._universalOverrides is None:
-			cls._universalOverrides = list()
-
-		if any(universalOverride.Identifier == overrideIdentifier for universalOverride in cls._universalOverrides):
-			raise Exception("The identifier '" + overrideIdentifier + "' has already been taken by a universal override.")
+		if cls._overrideStore is None:
+			cls._overrideStore = _SettingOverrideStore()
 
-		if cls._overrides is not None:
-			for testingBranch, testingOverrides in cls._overrides.items():  # type: str, typing.List[_SettingOverride]
-				for testingOverride in testingOverrides:  # type: _SettingOverride
-					if testingOverride.Identifier == overrideIdentifier:
-						raise Exception("The identifier '" + overrideIdentifier + "' has already been taken by a override for the branch '" + testingBranch + "'.")
-
-		cls._universalOverrides.append(_SettingOverride(value, overrideIdentifier, overridePriority, overrideReasonText))
-		cls._universalOverrides.sort(key = lambda sortingOverride: sortingOverride.Priority, reverse = True)
+		cls._overrideStore.Add(None, _SettingOverride(value, overrideIdentifier, overridePriority, overrideReasonText))
+		_MarkKeyDirty(cls.Key)
 		Update()
 
 	@classmethod
@@ -325,24 +308,17 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not cls.IsSetup():
 			raise Exception("Cannot remove override of the non setup setting '%s'." % cls.Key)
 
-		if cls._overrides is not None:
-			for testingBranch, testingBranchOverrides in cls._overrides.items():  # type: str, typing.List[_SettingOverride]
-				for testingBranchOverrideIndex in range(len(testingBranchOverrides)):  # type: int
-					testingBranchOverride = testingBranchOverrides[testingBranchOverrideIndex]  # type: _SettingOverride
+		if cls._overrideStore is None or not cls._overrideStore.HasOverride(overrideIdentifier):
+			return
 
-					if testingBranchOverride.Identifier == overrideIdentifier:
-						testingBranchOverrides.pop(testingBranchOverrideIndex)
-						Update()
-						return
+		overrideBranch = cls._overrideStore.Remove(overrideIdentifier)  # type: typing.Optional[str]
 
-		if cls._universalOverrides is not None:
-			for testingUniversalOverrideIndex in range(len(cls._universalOverrides)):  # type: int
-				testingUniversalOverride = cls._universalOverrides[testingUniversalOverrideIndex]  # type: _SettingOverride
+		if overrideBranch is None:
+			_MarkKeyDirty(cls.Key)
+		else:
+			_MarkDirty(overrideBranch, cls.Key)
 
-				if testingUniversalOverride.Identifier == overrideIdentifier:
-					cls._universalOverrides.pop(testingUniversalOverrideIndex)
-					Update()
-					return
+		Update()
 
 	@classmethod
 	def ClearAllOverrides (cls) -> None:
@@ -350,30 +326,30 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		Clear all set overrides.
 		"""
 
-		cls._overrides = None
-		cls._universalOverrides = None
+		if cls._overrideStore is not None:
+			_MarkKeyDirty(cls.Key)
+
+		cls._overrideStore = None
 
 	@classmethod
 	def IsOverridden (cls, simID: str) -> bool:
 		"""
-		Whether or not this setting's value is overridden.
+		Whether or not this setting's value is overridden for this sim, by one of their branch overrides or a universal override.
 		"""
 
 		if not isinstance(simID, str):
 			raise Exceptions.IncorrectTypeException(simID, "simID", (str,))
 
-		if cls._overrides is None and cls._universalOverrides is None:
+		if cls._overrideStore is None:
 			return False
 
-		if (cls._overrides is None or len(cls._overrides) == 0) and (cls._universalOverrides is None or len(cls._universalOverrides) == 0):
-			return False
-
-		return True
+		return cls._overrideStore.IsOverridden(simID)
 
 	@classmethod
 	def IsOverriddenBy (cls, simID: str, overrideIdentifier: str) -> bool:
 		"""
-		Whether or not this sim's setting has an override with this identifier.
+		Whether or not this sim's setting has an override with this identifier. Only overrides on this sim's branch and universal overrides count, an
+		override with this identifier on another sim's branch does not.
 		"""
 
 		if not isinstance(simID, str):
@@ -382,21 +358,10 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not isinstance(overrideIdentifier, str):
 			raise Exceptions.IncorrectTypeException(overrideIdentifier, "overrideIdentifier", (str,))
 
-		if not cls.IsOverridden(simID):
+		if cls._overrideStore is None:
 			return False
 
-		if cls._overrides is not None:
-			for branchOverrides in cls._overrides.values():  # type: typing.List[_SettingOverride]
-				for branchOverride in branchOverrides:  # type: _SettingOverride
-					if branchOverride.Identifier == overrideIdentifier:
-						return True
-
-		if cls._universalOverrides is not None:
-			for universalOverride in cls._universalOverrides:
-				if universalOverride.Identifier == overrideIdentifier:
-					return True
-
-		return False
+		return cls._overrideStore.IsOverriddenBy(simID, overrideIdentifier)
 
 	@classmethod
 	def GetActiveOverrideIdentifier (cls, simID: str) -> str:
@@ -414,30 +379,7 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not cls.IsOverridden(simID):
 			raise Exception("No overrides exist for the setting '" + cls.Key + "' and branch '" + simID + "'.")
 
-		branchOverrideCandidate = None  # type: typing.Optional[_SettingOverride]
-		universalOverrideCandidate = None  # type: typing.Optional[_SettingOverride]
-
-		if cls._overrides is not None and simID in cls._overrides:
-			branchOverrides = cls._overrides[simID]  # type: typing.List[_SettingOverride]
-
-			if len(branchOverrides) != 0:
-				branchOverrideCandidate = cls._overrides[simID][0]
-
-		if cls._universalOverrides is not None and len(cls._universalOverrides) != 0:
-			universalOverrideCandidate = cls._universalOverrides[0]
-
-		if branchOverrideCandidate is None and universalOverrideCandidate is None:
-			raise Exception("The 'IsOverride' method signaled true but we failed to find a valid override.")
-
-		if branchOverrideCandidate is None:
-			return universalOverrideCandidate.Identifier
-		elif universalOverrideCandidate is None:
-			return branchOverrideCandidate.Identifier
-
-		if branchOverrideCandidate.Priority >= universalOverrideCandidate.Priority:
-			return branchOverrideCandidate.Identifier
-		else:
-			return universalOverrideCandidate.Identifier
+		return cls._overrideStore.GetActiveOverride(simID).Identifier
 
 	@classmethod
 	def GetAllOverrideIdentifiers (cls) -> typing.Set[str]:
@@ -445,18 +387,10 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		Get the identifier of all registered overrides in this setting as a set.
 		"""
 
-		allIdentifiers = set()  # type: typing.Set[str]
-
-		if cls._overrides is not None:
-			for branchOverrides in cls._overrides.values():  # type: typing.List[_SettingOverride]
-				for branchOverride in branchOverrides:  # type: _SettingOverride
-					allIdentifiers.add(branchOverride.Identifier)
-
-		if cls._universalOverrides is not None:
-			for universalOverride in cls._universalOverrides:  # type: _SettingOverride
-				allIdentifiers.add(universalOverride.Identifier)
+		if cls._overrideStore is None:
+			return set()
 
-		return allIdentifiers
+		return cls._overrideStore.GetAllIdentifiers()
 
 	@classmethod
 	def GetOverrideValue (cls, overrideIdentifier: str) -> typing.Any:
@@ -471,18 +405,7 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not isinstance(overrideIdentifier, str):
 			raise Exceptions.IncorrectTypeException(overrideIdentifier, "overrideIdentifier", (str,))
 
-		if cls._overrides is not None:
-			for branchOverrides in cls._overrides.values():  # type: typing.List[_SettingOverride]
-				for branchOverride in branchOverrides:  # type: _SettingOverride
-					if branchOverride.Identifier == overrideIdentifier:
-						return branchOverride.Value
-
-		if cls._universalOverrides is not None:
-			for universalOverride in cls._universalOverrides:
-				if universalOverride.Identifier == overrideIdentifier:
-					return universalOverride.Value
-
-		raise Exception("No override with the identifier '" + overrideIdentifier + "' in the setting '" + cls.Key + "'.")
+		return cls._GetOverride(overrideIdentifier).Value
 
 	@classmethod
 	def GetOverridePriority (cls, overrideIdentifier: str) -> typing.Union[float, int]:
@@ -497,18 +420,7 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not isinstance(overrideIdentifier, str):
 			raise Exceptions.IncorrectTypeException(overrideIdentifier, "overrideIdentifier", (str,))
 
-		if cls._overrides is not None:
-			for branchOverrides in cls._overrides.values():  # type: typing.List[_SettingOverride]
-				for branchOverride in branchOverrides:  # type: _SettingOverride
-					if branchOverride.Identifier == overrideIdentifier:
-						return branchOverride.Priority
-
-		if cls._universalOverrides is not None:
-			for universalOverride in cls._universalOverrides:
-				if universalOverride.Identifier == overrideIdentifier:
-					return universalOverride.Priority
-
-		raise Exception("No override with the identifier '" + overrideIdentifier + "' in the setting '" + cls.Key + "'.")
+		return cls._GetOverride(overrideIdentifier).Priority
 
 	@classmethod
 	def GetOverrideReasonText (cls, overrideIdentifier: str) -> typing.Callable[[], localization.LocalizedString]:
@@ -523,18 +435,7 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 		if not isinstance(overrideIdentifier, str):
 			raise Exceptions.IncorrectTypeException(overrideIdentifier, "overrideIdentifier", (str,))
 
-		if cls._overrides is not None:
-			for branchOverrides in cls._overrides.values():  # type: typing.List[_SettingOverride]
-				for branchOverride in branchOverrides:  # type: _SettingOverride
-					if branchOverride.Identifier == overrideIdentifier:
-						return branchOverride.ReasonText
-
-		if cls._universalOverrides is not None:
-			for universalOverride in cls._universalOverrides:
-				if universalOverride.Identifier == overrideIdentifier:
-					return universalOverride.ReasonText
-
-		raise Exception("No override with the identifier '" + overrideIdentifier + "' in the setting '" + cls.Key + "'.")
+		return cls._GetOverride(overrideIdentifier).ReasonText
 
 	@classmethod
 	def CanShowDialog (cls, simID: str) -> bool:
@@ -598,6 +499,15 @@ class Setting(AbstractSettings.SettingBranchedAbstract):
 	def GetSettingIconKey (cls, branch: str) -> typing.Optional[str]:
 		return None
 
+	@classmethod
+	def _GetOverride (cls, overrideIdentifier: str) -> _SettingOverride:
+		override = cls._overrideStore.GetOverride(overrideIdentifier) if cls._overrideStore is not None else None  # type: typing.Optional[_SettingOverride]
+
+		if override is None:
+			raise Exception("No override with the identifier '" + overrideIdentifier + "' in the setting '" + cls.Key + "'.")
+
+		return override
+
 	@classmethod
 	def _OnLoad (cls) -> None:
 		pass
@@ -618,12 +528,196 @@ class _SettingOverride:
 		else:
 			self.ReasonText = lambda *args, **kwargs: Language.GetLocalizationStringByIdentifier(This.Mod.Namespace + ".Settings.Misc.Override.Unknown_Reason")  # type: typing.Callable[[], localization.LocalizedString]
 
+class _SettingOverrideStore:
+	def __init__ (self):
+		"""
+		Holds a setting's overrides, indexed by identifier and kept in a priority heap per branch, so finding a branch's active override or any override
+		by its identifier doesn't require looking through every override. Universal overrides are kept in their own heap.
+		"""
+
+		self._overrides = dict()  # type: typing.Dict[str, typing.Tuple[typing.Optional[str], _SettingOverride]]  # The branch, or none for universal overrides, and the override by identifier.
+		self._branchHeaps = dict()  # type: typing.Dict[str, typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]]
+		self._universalHeap = list()  # type: typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]
+
+		# Heap entries are ordered by negated priority then by the order the overrides were added in, so between overrides with the same priority the
+		# oldest is active, as it was when overrides were kept in sorted lists. Removed overrides are left in their heap until they reach the top of it.
+		self._addedCount = 0  # type: int
+
+	def Add (self, branch: typing.Optional[str], override: _SettingOverride) -> None:
+		"""
+		Add an override to a branch, or to every branch if the branch is none. An exception will be raised if the override's identifier has been taken.
+		"""
+
+		takenOverride = self._overrides.get(override.Identifier, None)  # type: typing.Optional[typing.Tuple[typing.Optional[str], _SettingOverride]]
+
+		if takenOverride is not None:
+			if takenOverride[0] is None:
+				raise Exception("The identifier '" + override.Identifier + "' has already been taken by a universal override.")
+			else:
+				raise Exception("The identifier '" + override.Identifier + "' has already been taken by a override for the branch '" + takenOverride[0] + "'.")
+
+		self._overrides[override.Identifier] = (branch, override)
+
+		if branch is None:
+			overrideHeap = self._universalHeap  # type: typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]
+		else:
+			overrideHeap = self._branchHeaps.setdefault(branch, list())  # type: typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]
+
+		heapq.heappush(overrideHeap, (-override.Priority, self._addedCount, override))
+		self._addedCount += 1
+
+	def Remove (self, identifier: str) -> typing.Optional[str]:
+		"""
+		Remove an override. An exception will be raised if no override has this identifier.
+		:return: The branch the override was removed from, or none if it was a universal override.
+		"""
+
+		branch, override = self._overrides.pop(identifier)  # type: typing.Optional[str], _SettingOverride
+
+		if branch is None:
+			self._DiscardRemovedOverrides(self._universalHeap)
+		else:
+			branchHeap = self._branchHeaps[branch]  # type: typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]
+			self._DiscardRemovedOverrides(branchHeap)
+
+			if len(branchHeap) == 0:
+				del self._branchHeaps[branch]
+
+		return branch
+
+	def HasOverride (self, identifier: str) -> bool:
+		return identifier in self._overrides
+
+	def IsOverridden (self, branch: str) -> bool:
+		return branch in self._branchHeaps or len(self._universalHeap) != 0
+
+	def IsOverriddenBy (self, branch: str, identifier: str) -> bool:
+		storedOverride = self._overrides.get(identifier, None)  # type: typing.Optional[typing.Tuple[typing.Optional[str], _SettingOverride]]
+
+		if storedOverride is None:
+			return False
+
+		return storedOverride[0] is None or storedOverride[0] == branch
+
+	def GetOverride (self, identifier: str) -> typing.Optional[_SettingOverride]:
+		storedOverride = self._overrides.get(identifier, None)  # type: typing.Optional[typing.Tuple[typing.Optional[str], _SettingOverride]]
+
+		if storedOverride is None:
+			return None
+
+		return storedOverride[1]
+
+	def GetActiveOverride (self, branch: str) -> typing.Optional[_SettingOverride]:
+		"""
+		Get the highest priority override affecting this branch. Between a branch and a universal override with the same priority, the branch override is
+		active.
+		"""
+
+		branchHeap = self._branchHeaps.get(branch, None)  # type: typing.Optional[typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]]
+		branchOverride = branchHeap[0][2] if branchHeap else None  # type: typing.Optional[_SettingOverride]
+		universalOverride = self._universalHeap[0][2] if self._universalHeap else None  # type: typing.Optional[_SettingOverride]
+
+		if branchOverride is None:
+			return universalOverride
+		elif universalOverride is None:
+			return branchOverride
+
+		if branchOverride.Priority >= universalOverride.Priority:
+			return branchOverride
+		else:
+			return universalOverride
+
+	def GetAllIdentifiers (self) -> typing.Set[str]:
+		return set(self._overrides.keys())
+
+	def _DiscardRemovedOverrides (self, overrideHeap: typing.List[typing.Tuple[typing.Union[float, int], int, _SettingOverride]]) -> None:
+		# Keeps the top of every heap an override that is still stored, which is all that looking up the active override relies on.
+		while len(overrideHeap) != 0:
+			topOverride = overrideHeap[0][2]  # type: _SettingOverride
+			storedOverride = self._overrides.get(topOverride.Identifier, None)  # type: typing.Optional[typing.Tuple[typing.Optional[str], _SettingOverride]]
+
+			if storedOverride is not None and storedOverride[1] is topOverride:
+				return
+
+			heapq.heappop(overrideHeap)
+
 def GetAllSettings () -> typing.List[typing.Type[Setting]]:
 	return list(AllSettings)
 
+def Save () -> None:
+	SettingsPersistence.Save()
+
 def Update () -> None:
 	SettingsPersistence.Update()
 
+def Compact () -> int:
+	"""
+	Reset every saved value that is equal to its setting's default and intern every saved string value. Values loaded from a save, or saved before default
+	values were elided, are only compacted by this. Update callbacks are not triggered, no value this changes will read any differently.
+	:return: The number of values that were reset.
+	"""
+
+	resetCount = 0  # type: int
+
+	for setting in AllSettings:  # type: typing.Type[Setting]
+		if not setting.IsSetup():
+			continue
+
+		settingDefault = _defaultValues.get(setting.Key, setting.Default)  # type: typing.Any
+
+		for branch in list(setting.GetAllBranchIdentifiers()):  # type: str
+			branchValue = _Get(branch, setting.Key)  # type: typing.Any
+
+			if ElideDefaultValues and branchValue == settingDefault:
+				SettingsPersistence.Reset(branch = branch, key = setting.Key, autoSave = False, autoUpdate = False)
+				resetCount += 1
+			elif isinstance(branchValue, str) and sys.intern(branchValue) is not branchValue:
+				SettingsPersistence.Set(branch, setting.Key, sys.intern(branchValue), autoSave = False, autoUpdate = False)
+
+	return resetCount
+
+def SetMany (values: typing.Iterable[typing.Tuple[str, str, typing.Any]], autoSave: bool = True, autoUpdate: bool = True) -> None:
+	"""
+	Set many setting values at once, saving and triggering update callbacks only once after every value has been set. Update callbacks will receive every
+	changed value in a single event.
+	:param values: The sim ID, the setting key and the new value of every value to be set. An exception will be raised if a value doesn't match its
+	setting's type or has an incorrect value, values before it will still be set, saved and updated.
+	:type values: typing.Iterable[typing.Tuple[str, str, typing.Any]]
+	:param autoSave: If true we will automatically save changes to the save file.
+	:type autoSave: bool
+	:param autoUpdate: If true we will automatically trigger update callbacks.
+	:type autoUpdate: bool
+	"""
+
+	if not isinstance(autoSave, bool):
+		raise Exceptions.IncorrectTypeException(autoSave, "autoSave", (bool,))
+
+	if not isinstance(autoUpdate, bool):
+		raise Exceptions.IncorrectTypeException(autoUpdate, "autoUpdate", (bool,))
+
+	setCount = 0  # type: int
+
+	try:
+		for simID, key, value in values:  # type: str, str, typing.Any
+			if not isinstance(simID, str):
+				raise Exceptions.IncorrectTypeException(simID, "values[%d][0]" % setCount, (str,))
+
+			if not isinstance(key, str):
+				raise Exceptions.IncorrectTypeException(key, "values[%d][1]" % setCount, (str,))
+
+			if not _isSetup(key):
+				raise Exception("Cannot set the non setup setting '%s'." % key)
+
+			_Set(simID, key, value, autoSave = False, autoUpdate = False)
+			setCount += 1
+	finally:
+		if setCount != 0:
+			if autoSave:
+				Save()
+
+			if autoUpdate:
+				Update()
+
 def RegisterOnUpdateCallback (updateCallback: typing.Callable[[types.ModuleType, UpdateEventArguments], None]) -> None:
 	global _onUpdateWrapper
 	_onUpdateWrapper += updateCallback
@@ -640,6 +734,20 @@ def UnregisterOnLoadCallback (loadCallback: typing.Callable[[types.ModuleType, E
 	global _onLoadWrapper
 	_onLoadWrapper -= loadCallback
 
+class _AnnouncerPreemptive(Director.Announcer):
+	@classmethod
+	def ZoneSave (cls, zoneReference: zone.Zone, saveSlotData: typing.Optional[typing.Any] = None) -> None:
+		if SettingsPersistence is None:
+			return
+
+		try:
+			resetCount = Compact()  # type: int
+
+			if resetCount != 0:
+				Save()
+		except Exception:
+			Debug.Log("Failed to compact the pronoun settings before a save.", This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
+
 def _OnInitiate (cause: LoadingShared.LoadingCauses) -> None:
 	global SettingsPersistence, DefaultSettings
 
@@ -665,6 +773,7 @@ def _OnResetSettings () -> None:
 		setting.Reset()
 
 def _Setup (key: str, valueType: type, default, verify: typing.Callable) -> None:
+	_defaultValues[key] = default
 	SettingsPersistence.Setup(key, valueType, default, verify)
 	DefaultSettings.Setup(key, valueType, default, verify)
 
@@ -684,9 +793,29 @@ def _ValueIsSet (simID: str, key: str) -> bool:
 	return SettingsPersistence.ValueIsSet(simID, key)
 
 def _Set (simID: str, key: str, value: typing.Any, autoSave: bool = True, autoUpdate: bool = True) -> None:
+	_MarkDirty(simID, key)
+
+	if ElideDefaultValues and key in _defaultValues and value == _defaultValues[key]:
+		SettingsPersistence.Reset(branch = simID, key = key, autoSave = autoSave, autoUpdate = autoUpdate)
+		return
+
+	if isinstance(value, str):
+		# Most sims share a few set identifiers, interning them lets every branch hold the same string object.
+		value = sys.intern(value)
+
 	SettingsPersistence.Set(simID, key, value, autoSave = autoSave, autoUpdate = autoUpdate)
 
 def _Reset (simID: str = None, key: str = None, autoSave: bool = True, autoUpdate: bool = True) -> None:
+	if simID is None and key is None:
+		_MarkAllDirty()
+	elif simID is None:
+		_MarkKeyDirty(key)
+	elif key is None:
+		for setting in AllSettings:  # type: typing.Type[Setting]
+			_MarkDirty(simID, setting.Key)
+	else:
+		_MarkDirty(simID, key)
+
 	SettingsPersistence.Reset(branch = simID, key = key, autoSave = autoSave, autoUpdate = autoUpdate)
 
 def _InvokeOnUpdateWrapperEvent (changedSettings: typing.Dict[str, typing.Set[str]]) -> UpdateEventArguments:
@@ -711,50 +840,71 @@ def _InvokeOnLoadWrapperEvent () -> Events.EventArguments:
 
 	return eventArguments
 
+def _MarkDirty (simID: str, key: str) -> None:
+	dirtyBranches = _dirtyValues.get(key, None)  # type: typing.Optional[typing.Set[str]]
+
+	if dirtyBranches is None:
+		_dirtyValues[key] = { simID }
+	else:
+		dirtyBranches.add(simID)
+
+def _MarkKeyDirty (key: str) -> None:
+	_dirtyKeys.add(key)
+
+def _MarkAllDirty () -> None:
+	global _allValuesDirty
+	_allValuesDirty = True
+
+def _GetAllChangedBranches (key: str) -> typing.Set[str]:
+	# Every branch the setting has a value for now or had one for at the last update, so branches that were reset are reported too.
+	currentBranches = SettingsPersistence.GetAllBranchIdentifiers(key)  # type: typing.Set[str]
+	changedBranches = set(currentBranches)  # type: typing.Set[str]
+	changedBranches.update(_knownBranches.get(key, set()))
+
+	_knownBranches[key] = set(currentBranches)
+	return changedBranches
+
 # noinspection PyUnusedLocal
 def _OnUpdateCallback (owner: Persistence.Persistent, eventArguments: Events.EventArguments) -> None:
-	global _previousValues
+	global _dirtyValues, _dirtyKeys, _allValuesDirty
 
-	allSettings = GetAllSettings()  # type: typing.List[typing.Type[Setting]]
+	dirtyValues = _dirtyValues  # type: typing.Dict[str, typing.Set[str]]
+	dirtyKeys = _dirtyKeys  # type: typing.Set[str]
+	allValuesDirty = _allValuesDirty  # type: bool
 
-	currentValues = dict()  # type: typing.Dict[str, typing.Dict[str, typing.Any]]
-	changedSettings = dict()  # type: typing.Dict[str, typing.Set[str]]
+	# Cleared before the event is invoked, so anything the callbacks change is reported by the next update.
+	_dirtyValues = dict()
+	_dirtyKeys = set()
+	_allValuesDirty = False
 
-	for setting in allSettings:  # type: typing.Type[Setting]
-		settingValues = setting.GetAllBranches()  # type: typing.Dict[str, typing.Any]
-		currentValues[setting.Key] = settingValues
+	changedSettings = dict()  # type: typing.Dict[str, typing.Set[str]]
 
-		if not setting.Key in _previousValues:
-			settingAllBranches = setting.GetAllBranchIdentifiers()  # type: typing.Set[str]
-			changedSettings[setting.Key] = settingAllBranches
+	for setting in AllSettings:  # type: typing.Type[Setting]
+		if allValuesDirty or setting.Key in dirtyKeys:
+			changedSettings[setting.Key] = _GetAllChangedBranches(setting.Key)
 			continue
 
-		changedBranches = set()  # type: typing.Set[str]
-
-		settingPreviousValues = _previousValues[setting.Key]  # type: typing.Dict[str, typing.Any]
+		dirtyBranches = dirtyValues.get(setting.Key, None)  # type: typing.Optional[typing.Set[str]]
 
-		for settingBranch, settingValue in settingValues.items():  # type: str, typing.Any
-			if settingBranch not in settingPreviousValues:
-				changedBranches.add(settingBranch)
-				continue
-
-			if settingValue != settingPreviousValues[settingBranch]:
-				changedBranches.add(setting.Key)
-				continue
+		if dirtyBranches is None:
+			continue
 
-		for settingPreviousBranch, settingPreviousValue in settingPreviousValues.items():  # type: str, typing.Any
-			if settingPreviousBranch not in settingValues:
-				changedBranches.add(settingPreviousBranch)
-				continue
+		knownBranches = _knownBranches.setdefault(setting.Key, set())  # type: typing.Set[str]
 
-		changedSettings[setting.Key] = changedBranches
+		for dirtyBranch in dirtyBranches:  # type: str
+			if _ValueIsSet(dirtyBranch, setting.Key):
+				knownBranches.add(dirtyBranch)
+			else:
+				knownBranches.discard(dirtyBranch)
 
-	_previousValues = currentValues
+		changedSettings[setting.Key] = dirtyBranches
 
 	_InvokeOnUpdateWrapperEvent(changedSettings)
 
 # noinspection PyUnusedLocal
 def _OnLoadCallback (owner: Persistence.Persistent, eventArguments: Events.EventArguments) -> None:
+	_MarkAllDirty()
+
 	for setting in AllSettings:  # type: Setting
 		try:
 			# noinspection PyProtectedMember
@@ -36,9 +36,15 @@ class PronounFallback(SettingsTypes.PronounFallbackDialogSetting):
 def GetAllSettings () -> typing.List[typing.Type[SimSettingsBase.Setting]]:
 	return SimSettingsBase.GetAllSettings()
 
+def Save () -> None:
+	SimSettingsBase.Save()
+
 def Update () -> None:
 	SimSettingsBase.Update()
 
+def SetMany (values: typing.Iterable[typing.Tuple[str, str, typing.Any]], autoSave: bool = True, autoUpdate: bool = True) -> None:
+	SimSettingsBase.SetMany(values, autoSave = autoSave, autoUpdate = autoUpdate)
+
 def RegisterOnUpdateCallback (updateCallback: typing.Callable[[types.ModuleType, SimSettingsBase.UpdateEventArguments], None]) -> None:
 	SimSettingsBase.RegisterOnUpdateCallback(updateCallback)
 
@@ -4,7 +4,7 @@ import typing
 
 import services
 import zone
-from NeonOcean.S4.Refer import This
+from NeonOcean.S4.Refer import Saving, This
 from NeonOcean.S4.Main import Debug, Director
 from NeonOcean.S4.Main.Tools import Exceptions
 from sims import sim_info
@@ -13,12 +13,26 @@ from statistics import statistic, statistic_tracker
 
 LastSimIDStatisticID = 9391266768967019788  # type: int
 
+_lastSimIDStatisticType = None  # type: typing.Optional[typing.Type[statistic.Statistic]]
+_confirmedSimIDs = set()  # type: typing.Set[int]  # Sims known to have their current id in their last sim id statistic, cleared whenever a zone loads.
+
 class _AnnouncerPreemptive(Director.Announcer):
+	@classmethod
+	def ZoneLoad (cls, zoneReference: zone.Zone) -> None:
+		global _lastSimIDStatisticType
+
+		_lastSimIDStatisticType = None
+		_confirmedSimIDs.clear()
+
 	@classmethod
 	def ZoneSave (cls, zoneReference: zone.Zone, saveSlotData: typing.Optional[typing.Any] = None) -> None:
 		for simInfo in services.sim_info_manager().get_all():
+			if simInfo.id in _confirmedSimIDs:
+				continue
+
 			try:
-				UpdateLastSimID(simInfo)
+				if UpdateLastSimID(simInfo):
+					_confirmedSimIDs.add(simInfo.id)
 			except:
 				Debug.Log("Failed to update the last sim id for a sim with the id '%s'." % simInfo.id, This.Mod.Namespace, Debug.LogLevels.Exception, group = This.Mod.Namespace, owner = __name__)
 
@@ -26,22 +40,9 @@ def GetLastSimID (targetSimInfo: sim_info.SimInfo) -> typing.Optional[int]:
 	if not isinstance(targetSimInfo, sim_info.SimInfo):
 		Exceptions.IncorrectTypeException(targetSimInfo, "targetSimInfo", (sim_info.SimInfo,))
 
-	lastSimIDStatisticType = services.get_instance_manager(resources.Types.STATISTIC).get(LastSimIDStatisticID, None)  # type: typing.Optional[typing.Type[statistic.Statistic]]
-
-	if lastSimIDStatisticType is None:
-		Debug.Log("Could not find the last sim id statistic type.\nTarget Sim ID: %s" % str(targetSimInfo.id), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":MissingLastSimIDStatisticType")
-		return None
-
-	lastSimIDStatisticTracker = targetSimInfo.get_tracker(lastSimIDStatisticType)  # type: typing.Optional[statistic_tracker.StatisticTracker]
-
-	if lastSimIDStatisticTracker is None:
-		Debug.Log("Could not find the last sim id statistic's tracker in the target sim.\nTarget Sim ID: %s" % str(targetSimInfo.id), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":MissingLastSimIDStatisticTracker")
-		return None
-
-	lastSimIDStatistic = lastSimIDStatisticTracker.get_statistic(lastSimIDStatisticType, add = True)  # type: typing.Optional[statistic.Statistic]
+	lastSimIDStatistic = _GetLastSimIDStatistic(targetSimInfo)  # type: typing.Optional[statistic.Statistic]
 
 	if lastSimIDStatistic is None:
-		Debug.Log("Could not retrieve a sim's last sim id statistic\nTarget Sim ID: %s" % str(targetSimInfo.id), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":MissingLastSimIDStatistic")
 		return None
 
 	lastSimID = lastSimIDStatistic.get_value()  # type: int
@@ -51,15 +52,41 @@ def GetLastSimID (targetSimInfo: sim_info.SimInfo) -> typing.Optional[int]:
 	else:
 		return lastSimID
 
-def UpdateLastSimID (targetSimInfo: sim_info.SimInfo) -> None:
+def UpdateLastSimID (targetSimInfo: sim_info.SimInfo) -> bool:
+	"""
+	Store the sim's current id in their last sim id statistic.
+	:return: True if the statistic holds the sim's current id afterwards.
+	"""
+
 	if not isinstance(targetSimInfo, sim_info.SimInfo):
 		Exceptions.IncorrectTypeException(targetSimInfo, "targetSimInfo", (sim_info.SimInfo,))
 
-	lastSimIDStatisticType = services.get_instance_manager(resources.Types.STATISTIC).get(LastSimIDStatisticID, None)  # type: typing.Optional[typing.Type[statistic.Statistic]]
+	lastSimIDStatistic = _GetLastSimIDStatistic(targetSimInfo)  # type: typing.Optional[statistic.Statistic]
+
+	if lastSimIDStatistic is None:
+		return False
+
+	if lastSimIDStatistic.get_value() == targetSimInfo.id:
+		return True
+
+	lastSimIDStatistic.set_value(targetSimInfo.id)
+	Saving.ClearSimSimsSectionBranchKey(targetSimInfo.id)
+	return True
+
+def _GetLastSimIDStatisticType () -> typing.Optional[typing.Type[statistic.Statistic]]:
+	global _lastSimIDStatisticType
+
+	if _lastSimIDStatisticType is None:
+		_lastSimIDStatisticType = services.get_instance_manager(resources.Types.STATISTIC).get(LastSimIDStatisticID, None)
+
+	return _lastSimIDStatisticType
+
+def _GetLastSimIDStatistic (targetSimInfo: sim_info.SimInfo) -> typing.Optional[statistic.Statistic]:
+	lastSimIDStatisticType = _GetLastSimIDStatisticType()  # type: typing.Optional[typing.Type[statistic.Statistic]]
 
 	if lastSimIDStatisticType is None:
 		Debug.Log("Could not find the last sim id statistic type.\nTarget Sim ID: %s" % str(targetSimInfo.id), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":MissingLastSimIDStatisticType")
-		return
+		return None
 
 	lastSimIDStatisticTracker = targetSimInfo.get_tracker(lastSimIDStatisticType)  # type: typing.Optional[statistic_tracker.StatisticTracker]
 
@@ -67,10 +94,10 @@ def UpdateLastSimID (targetSimInfo: sim_info.SimInfo) -> None:
 		Debug.Log("Could not find the last sim id statistic's tracker in the target sim.\nTarget Sim ID: %s" % str(targetSimInfo.id), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":MissingLastSimIDStatisticTracker")
 		return None
 
-	lastSimIDStatistic = lastSimIDStatisticTracker.get_statistic(lastSimIDStatisticType, add = True)  # type: statistic.Statistic
+	lastSimIDStatistic = lastSimIDStatisticTracker.get_statistic(lastSimIDStatisticType, add = True)  # type: typing.Optional[statistic.Statistic]
 
 	if lastSimIDStatistic is None:
 		Debug.Log("Could not retrieve a sim's last sim id statistic\nTarget Sim ID: %s" % str(targetSimInfo.id), This.Mod.Namespace, Debug.LogLevels.Error, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":MissingLastSimIDStatistic")
-		return
+		return None
 
-	lastSimIDStatistic.set_value(targetSimInfo.id)
+	return lastSimIDStatistic
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import typing
+
 from NeonOcean.S4.Refer import This
 from NeonOcean.S4.Refer.Saving import LastSimID
-from NeonOcean.S4.Main import Debug
+from NeonOcean.S4.Main import Debug, Director
 from NeonOcean.S4.Main.Saving import Save, SaveShared, SectionSims, SectionStandard
 from NeonOcean.S4.Main.Tools import Exceptions, Python
 from sims import sim_info
@@ -11,6 +13,13 @@ _savingObject: SaveShared.Save
 _simsSection: SectionSims.SectionSims
 _allSimsSection: SectionStandard.SectionStandard
 
+_branchKeys = dict()  # type: typing.Dict[int, str]  # Sims section branch keys by current sim id, cleared whenever a zone loads.
+
+class _Announcer(Director.Announcer):
+	@classmethod
+	def ZoneLoad (cls, zoneReference) -> None:
+		ClearSimSimsSectionBranchKeys()
+
 def GetSavingObject () -> SaveShared.Save:
 	return _savingObject
 
@@ -31,25 +40,43 @@ def GetSimSimsSectionBranchKey (targetSimInfo: sim_info.SimInfo) -> str:
 
 	currentSimID = targetSimInfo.id
 
+	branchKey = _branchKeys.get(currentSimID, None)  # type: typing.Optional[str]
+
+	if branchKey is not None:
+		return branchKey
+
 	try:
 		lastSimID = LastSimID.GetLastSimID(targetSimInfo)
 	except:
 		Debug.Log("Could not retrieve the last sim id for a sim with the current id of '%s'." % currentSimID, This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":" + str(Python.GetLineNumber()), lockThreshold = 5)
-		lastSimID = None
+		return str(currentSimID)
 
 	currentSimIDString = str(currentSimID)  # type: str
 	lastSimIDString = str(lastSimID)  # type: str
 
 	if lastSimID is None or lastSimID == 0:
-		return currentSimIDString
+		branchKey = currentSimIDString
+	else:
+		if lastSimID != currentSimID:
+			Debug.Log("Found a sim that seems to have changed their sim id. Current ID: %s Last ID: %s" % (currentSimID, lastSimID), This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":" + str(Python.GetLineNumber()), lockThreshold = 5)
 
-	if lastSimID != currentSimID:
-		Debug.Log("Found a sim that seems to have changed their sim id. Current ID: %s Last ID: %s" % (currentSimID, lastSimID), This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__, lockIdentifier = __name__ + ":" + str(Python.GetLineNumber()), lockThreshold = 5)
+		if not GetSimsSection().BranchExists(lastSimIDString):
+			branchKey = currentSimIDString
+		else:
+			branchKey = lastSimIDString
 
-	if not GetSimsSection().BranchExists(lastSimIDString):
-		return currentSimIDString
-	else:
-		return lastSimIDString
+	_branchKeys[currentSimID] = branchKey
+	return branchKey
+
+def ClearSimSimsSectionBranchKey (simID: int) -> None:
+	"""
+	Forget the sims section branch key cached for the sim with this current id, the next request for it will look it up again.
+	"""
+
+	_branchKeys.pop(simID, None)
+
+def ClearSimSimsSectionBranchKeys () -> None:
+	_branchKeys.clear()
 
 def _Setup () -> None:
 	global _savingObject, _simsSection, _allSimsSection
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import os
+import shutil
 import sys
 import types
 import typing
+import uuid
 
+import alarms
+import clock
+import services
+import zone
 from NeonOcean.S4.Refer import This
-from NeonOcean.S4.Main import Debug, Language, LoadingShared
+from NeonOcean.S4.Refer.Diagnostics import Timing
+from NeonOcean.S4.Main import Debug, Director, Language, LoadingShared
 from NeonOcean.S4.Main.Abstract import Settings as AbstractSettings
 from NeonOcean.S4.Main.Data import Persistence
 from NeonOcean.S4.Main.Tools import Events, Exceptions, Types, Version
@@ -18,8 +25,15 @@ SettingsFilePath = os.path.join(This.Mod.PersistentPath, "Settings.json")  # typ
 SettingsPersistence = None  # type: typing.Optional[Persistence.PersistentFile]
 AllSettings = list()  # type: typing.List[typing.Type[Setting]]
 
+SaveDelay = 5.0  # type: float  # The number of real seconds changes are held before the settings file is written.
+
 _previousValues = dict()  # type: typing.Dict[str, typing.Any]
 
+# Changes that would save the settings file only mark it as needing to be saved, the file is then written once after the save delay, or sooner if the
+# game saves, the zone is torn down or the mod unloads. Editing a custom pronoun set pair by pair would otherwise rewrite every set after each pair.
+_savePending = False  # type: bool
+_saveAlarmHandle = None  # type: typing.Optional[alarms.AlarmHandle]
+
 _onUpdateWrapper = Events.EventHandler()  # type: Events.EventHandler
 _onLoadWrapper = Events.EventHandler()  # type: Events.EventHandler
 
@@ -79,6 +93,7 @@ class Setting(AbstractSettings.SettingAbstract):
 		return False
 
 	@classmethod
+	@Timing.Timed("Settings.Get")
 	def Get (cls, ignoreOverride: bool = False) -> typing.Any:
 		"""
 		Get the setting's value.
@@ -411,7 +426,24 @@ def Load () -> None:
 	SettingsPersistence.Load()
 
 def Save () -> None:
-	SettingsPersistence.Save()
+	"""
+	Write the settings file now, including any changes waiting for the save delay.
+	"""
+
+	global _savePending
+
+	_CancelSaveAlarm()
+	_savePending = False
+
+	_WriteSettingsFile()
+
+def Flush () -> None:
+	"""
+	Write the settings file now if any changes are waiting for the save delay.
+	"""
+
+	if _savePending:
+		Save()
 
 def Update () -> None:
 	SettingsPersistence.Update()
@@ -432,6 +464,15 @@ def UnregisterOnLoadCallback (loadCallback: typing.Callable[[types.ModuleType, E
 	global _onLoadWrapper
 	_onLoadWrapper -= loadCallback
 
+class _Announcer(Director.Announcer):
+	@classmethod
+	def ZoneSave (cls, zoneReference: zone.Zone, saveSlotData: typing.Optional[typing.Any] = None) -> None:
+		_FlushSafely()
+
+	@classmethod
+	def ZoneOnToreDown (cls, zoneReference: zone.Zone, clientReference) -> None:
+		_FlushSafely()
+
 def _OnInitiate (cause: LoadingShared.LoadingCauses) -> None:
 	global SettingsPersistence
 
@@ -479,10 +520,79 @@ def _Get (key: str) -> typing.Any:
 	return SettingsPersistence.Get(key)
 
 def _Set (key: str, value: typing.Any, autoSave: bool = True, autoUpdate: bool = True) -> None:
-	SettingsPersistence.Set(key, value, autoSave = autoSave, autoUpdate = autoUpdate)
+	SettingsPersistence.Set(key, value, autoSave = False, autoUpdate = autoUpdate)
+
+	if autoSave:
+		_RequestSave()
 
 def _Reset (key: str = None, autoSave: bool = True, autoUpdate: bool = True) -> None:
-	SettingsPersistence.Reset(key = key, autoSave = autoSave, autoUpdate = autoUpdate)
+	SettingsPersistence.Reset(key = key, autoSave = False, autoUpdate = autoUpdate)
+
+	if autoSave:
+		_RequestSave()
+
+def _RequestSave () -> None:
+	global _savePending, _saveAlarmHandle
+
+	_savePending = True
+
+	if _saveAlarmHandle is not None:
+		return
+
+	if services.current_zone() is None:
+		# Alarms only run inside a zone, anywhere else the file is written right away.
+		Save()
+		return
+
+	_saveAlarmHandle = alarms.add_alarm_real_time(sys.modules[__name__], clock.interval_in_real_seconds(SaveDelay), _OnSaveAlarm, use_sleep_time = False)
+
+# noinspection PyUnusedLocal
+def _OnSaveAlarm (alarmHandle: alarms.AlarmHandle) -> None:
+	global _saveAlarmHandle
+
+	_saveAlarmHandle = None
+	_FlushSafely()
+
+def _CancelSaveAlarm () -> None:
+	global _saveAlarmHandle
+
+	if _saveAlarmHandle is None:
+		return
+
+	try:
+		alarms.cancel_alarm(_saveAlarmHandle)
+	except Exception:
+		pass
+
+	_saveAlarmHandle = None
+
+def _FlushSafely () -> None:
+	try:
+		Flush()
+	except Exception:
+		Debug.Log("Failed to save settings.", This.Mod.Namespace, Debug.LogLevels.Warning, group = This.Mod.Namespace, owner = __name__)
+
+def _WriteSettingsFile () -> None:
+	# The persistent file writes the settings file in place. A copy of the previous file is kept under a unique temporary name while it does so, and is
+	# moved back if saving fails, so a failed save can't leave a half written settings file behind.
+
+	if not os.path.exists(SettingsFilePath):
+		SettingsPersistence.Save()
+		return
+
+	backupSettingsFilePath = SettingsFilePath + "." + uuid.uuid4().hex + ".tmp"  # type: str
+
+	try:
+		shutil.copy2(SettingsFilePath, backupSettingsFilePath)
+
+		try:
+			SettingsPersistence.Save()
+		except:
+			os.replace(backupSettingsFilePath, SettingsFilePath)
+			raise
+	finally:
+		if os.path.exists(backupSettingsFilePath):
+			os.remove(backupSettingsFilePath)
 
 def _InvokeOnUpdateWrapperEvent (changedSettings: typing.Set[str]) -> UpdateEventArguments:
 	updateEventArguments = UpdateEventArguments(changedSettings)  # type: UpdateEventArguments
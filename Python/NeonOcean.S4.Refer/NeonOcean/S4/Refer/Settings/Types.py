@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import typing
+
 from NeonOcean.S4.Main import Language
 from NeonOcean.S4.Main.Tools import Exceptions, Version
 from NeonOcean.S4.Refer.Settings import Base as SettingsBase, Dialogs as SettingsDialogs
@@ -8,6 +10,26 @@ from sims4 import localization
 class CustomPronounSetsSetting(SettingsBase.Setting):
 	Type = dict
 
+	_version = 0  # type: int
+
+	@classmethod
+	def GetVersion (cls) -> int:
+		"""
+		Get a number that changes every time the custom pronoun sets are set, reset or loaded. Anything built from the sets can be kept until this changes.
+		"""
+
+		return cls._version
+
+	@classmethod
+	def Set (cls, value: typing.Any, autoSave: bool = True, autoUpdate: bool = True) -> None:
+		cls._version += 1
+		return super().Set(value, autoSave = autoSave, autoUpdate = autoUpdate)
+
+	@classmethod
+	def Reset (cls, autoSave: bool = True, autoUpdate: bool = True) -> None:
+		cls._version += 1
+		super().Reset(autoSave = autoSave, autoUpdate = autoUpdate)
+
 	@classmethod
 	def Verify (cls, value: dict, lastChangeVersion: Version.Version = None) -> dict:
 		if not isinstance(value, dict):
@@ -25,6 +47,34 @@ class CustomPronounSetsSetting(SettingsBase.Setting):
 
 		return Language.CreateLocalizationString("")
 
+	@classmethod
+	def _OnLoad (cls) -> None:
+		cls._version += 1
+
+class HiddenPathSetting(SettingsBase.Setting):
+	Type = str
+
+	@classmethod
+	def IsHidden (cls) -> bool:
+		return True
+
+	@classmethod
+	def Verify (cls, value: str, lastChangeVersion: Version.Version = None) -> str:
+		if not isinstance(value, str):
+			raise Exceptions.IncorrectTypeException(value, "value", (str,))
+
+		if not isinstance(lastChangeVersion, Version.Version) and lastChangeVersion is not None:
+			raise Exceptions.IncorrectTypeException(lastChangeVersion, "lastChangeVersion", (Version.Version, "None"))
+
+		return value
+
+	@classmethod
+	def GetValueText (cls, value: str) -> localization.LocalizedString:
+		if not isinstance(value, str):
+			raise Exceptions.IncorrectTypeException(value, "value", (str,))
+
+		return Language.CreateLocalizationString(value)
+
 class CustomPronounSetsDialogSetting(CustomPronounSetsSetting):
 	Dialog = SettingsDialogs.CustomPronounSetsDialog
 	EditPronounSetDialog = SettingsDialogs.EditPronounSetDialog
@@ -12,6 +12,16 @@ class CustomPronounSets(SettingsTypes.CustomPronounSetsDialogSetting):
 	Key = "Custom_Pronoun_Sets"  # type: str
 	Default = dict()  # type: dict
 
+class SharedLanguageCachePath(SettingsTypes.HiddenPathSetting):
+	IsSetting = True  # type: bool
+
+	Key = "Shared_Language_Cache_Path"  # type: str
+	Default = ""  # type: str
+	# A directory that language caches built for the installed game can be shared through, such as a network drive or a directory outside the
+	# user data folder. Caches in this directory are looked for first and are never written by the game, they are built with the prebuild language
+	# cache automation script, so multiple game installs and profiles can point to the same directory. Leave this empty to only use the cache in this
+	# mod's persistent data folder.
+
 def GetSettingsFilePath () -> str:
 	return SettingsBase.SettingsFilePath
 
@@ -40,10 +40,22 @@ class PackageEntry:
 		Read, decompress and return this entry's bytes.
 		"""
 
+		return self.Decompress(self.ReadCompressed())
+
+	def ReadCompressed (self) -> bytes:
+		"""
+		Read and return this entry's bytes as they are stored in the package, without decompressing them.
+		"""
+
 		with open(self.PackageFilePath, mode = "rb") as packageFile:
 			packageFile.seek(self.FilePosition)
 
-			compressedFileBytes = packageFile.read(self.FileSize)
+			return packageFile.read(self.FileSize)
+
+	def Decompress (self, compressedFileBytes: bytes) -> bytes:
+		"""
+		Decompress bytes read from this entry.
+		"""
 
 		if self.CompressionType == CompressionType.Uncompressed:
 			fileBytes = compressedFileBytes  # type: bytes
@@ -140,6 +152,43 @@ def GetPackageLocalizationStrings (packageFilePath: str) -> typing.List[PackageE
 
 		return validEntries
 
+def GetPackageFingerprint (packageFilePath: str) -> str:
+	"""
+	Get a short identifier for the contents of the package file at this path, made from the file's size and a checksum of its header and index. The
+	index records the position and size of every entry, so the identifier changes whenever the package's contents change, but not when the file is
+	copied, moved or only has its modified time changed.
+	:param packageFilePath: The file path of the target package, an exception will be raised if the file does not exist or is not a valid file type.
+	:type packageFilePath: str
+	"""
+
+	if not isinstance(packageFilePath, str):
+		raise Exceptions.IncorrectTypeException(packageFilePath, "packageFilePath", (str, ))
+
+	byteOrder = "little"  # type: str
+	headerSize = 96  # type: int
+
+	with open(packageFilePath, mode = "rb") as packageFile:
+		header = packageFile.read(headerSize)  # type: bytes
+
+		# noinspection SpellCheckingInspection
+		if len(header) != headerSize or header[0:4] != b"DBPF":
+			# noinspection SpellCheckingInspection
+			raise Exception("Invalid package file identifier, expected 'DBPF'.")
+
+		indexRecordPositionLow = int.from_bytes(header[40:44], byteOrder)  # type: int
+		indexRecordSize = int.from_bytes(header[44:48], byteOrder)  # type: int
+		indexRecordPosition = int.from_bytes(header[64:72], byteOrder)  # type: int
+
+		packageFile.seek(indexRecordPosition if indexRecordPosition != 0 else indexRecordPositionLow)
+		indexRecordBytes = packageFile.read(indexRecordSize)  # type: bytes
+
+		packageFileSize = packageFile.seek(0, io.SEEK_END)  # type: int
+
+	fingerprintChecksum = zlib.crc32(header[32:])  # The header's creation and modification dates, just before this, are left out.
+	fingerprintChecksum = zlib.crc32(indexRecordBytes, fingerprintChecksum)
+
+	return "%s-%08X" % (packageFileSize, fingerprintChecksum)
+
 def _DecompressInternalCompressionPackageFile (compressedFileBytes: bytes) -> bytes:
 	"""
 	https://modthesims.info/wiki.php?title=Sims_3:DBPF/Compression
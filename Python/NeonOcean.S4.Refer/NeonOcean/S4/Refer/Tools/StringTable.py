@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import array
+import bisect
+import itertools
+import mmap
+import sys
+import typing
+
+from NeonOcean.S4.Main.Tools import Exceptions
+
+class CompactStringTable:
+	"""
+	A read only localization string table. Keys are kept in a sorted array, with a parallel array of offsets into a single UTF-8 blob holding every
+	string, so a table costs roughly its text size plus eight bytes per entry. Lookups are a binary search over the keys.
+
+	File layout, all numbers are unsigned and in the byte order indicated by the byte order mark:
+	identifier (4 bytes, "NOST") | version (2 bytes) | byte order mark (2 bytes) | entry count (4 bytes) | blob length (4 bytes) |
+	keys (4 bytes each) | offsets (4 bytes each, entry count + 1 of them) | blob
+	"""
+
+	FileIdentifier = b"NOST"  # type: bytes
+	FileVersion = 1  # type: int
+
+	_byteOrderMark = 0xFEFF  # type: int
+	_headerLength = 16  # type: int
+
+	def __init__ (self, keys: typing.Sequence[int], offsets: typing.Sequence[int], blob: typing.Union[bytes, memoryview], memoryMap: typing.Optional[mmap.mmap] = None):
+		if len(offsets) != len(keys) + 1:
+			raise ValueError("A string table needs exactly one more offset than it has keys.")
+
+		self._keys = keys  # type: typing.Sequence[int]
+		self._offsets = offsets  # type: typing.Sequence[int]
+		self._blob = blob  # type: typing.Union[bytes, memoryview]
+		self._memoryMap = memoryMap  # type: typing.Optional[mmap.mmap]
+
+	def __len__ (self) -> int:
+		return len(self._keys)
+
+	def __contains__ (self, key: int) -> bool:
+		return self._GetKeyIndex(key) is not None
+
+	def __getitem__ (self, key: int) -> str:
+		keyIndex = self._GetKeyIndex(key)  # type: typing.Optional[int]
+
+		if keyIndex is None:
+			raise KeyError(key)
+
+		return self._GetText(keyIndex)
+
+	def __iter__ (self) -> typing.Iterator[int]:
+		return iter(self._keys)
+
+	def get (self, key: int, default: typing.Any = None) -> typing.Any:
+		keyIndex = self._GetKeyIndex(key)  # type: typing.Optional[int]
+
+		if keyIndex is None:
+			return default
+
+		return self._GetText(keyIndex)
+
+	def keys (self) -> typing.Iterable[int]:
+		return self._keys
+
+	def items (self) -> typing.Iterator[typing.Tuple[int, str]]:
+		for keyIndex in range(len(self._keys)):  # type: int
+			yield self._keys[keyIndex], self._GetText(keyIndex)
+
+	def Close (self) -> None:
+		"""
+		Release the memory map this table reads from, if it has one. The table cannot be used afterwards.
+		"""
+
+		if self._memoryMap is not None:
+			self._keys = array.array("I")
+			self._offsets = array.array("I", (0,))
+			self._blob = b""
+
+			self._memoryMap.close()
+			self._memoryMap = None
+
+	def GetMemorySize (self) -> int:
+		"""
+		Get the number of bytes this table holds in memory. Memory mapped tables only count their arrays, their text is paged in from the file.
+		"""
+
+		memorySize = sys.getsizeof(self)  # type: int
+		countedBufferIDs = set()  # type: typing.Set[int]
+
+		for tableBuffer in (self._keys, self._offsets, self._blob):  # type: typing.Union[typing.Sequence[int], bytes, memoryview]
+			memorySize += sys.getsizeof(tableBuffer)
+
+			if not isinstance(tableBuffer, memoryview) or self._memoryMap is not None:
+				continue
+
+			# The size of a view doesn't include the memory it looks into. Tables read from bytes have views into the file's bytes, which only need
+			# counting once.
+			if id(tableBuffer.obj) in countedBufferIDs:
+				continue
+
+			countedBufferIDs.add(id(tableBuffer.obj))
+			memorySize += sys.getsizeof(tableBuffer.obj) if isinstance(tableBuffer.obj, (bytes, bytearray)) else tableBuffer.nbytes
+
+		return memorySize
+
+	def ToBytes (self) -> bytes:
+		byteOrder = sys.byteorder  # type: str
+
+		keysArray = self._keys if isinstance(self._keys, array.array) else array.array("I", self._keys)  # type: array.array
+		offsetsArray = self._offsets if isinstance(self._offsets, array.array) else array.array("I", self._offsets)  # type: array.array
+
+		header = self.FileIdentifier + \
+				 self.FileVersion.to_bytes(2, byteOrder) + \
+				 self._byteOrderMark.to_bytes(2, byteOrder) + \
+				 len(self._keys).to_bytes(4, byteOrder) + \
+				 len(self._blob).to_bytes(4, byteOrder)  # type: bytes
+
+		return b"".join((header, keysArray.tobytes(), offsetsArray.tobytes(), bytes(self._blob)))
+
+	@classmethod
+	def FromDictionary (cls, localizationStrings: typing.Mapping[int, str]) -> CompactStringTable:
+		keys = array.array("I", sorted(localizationStrings.keys()))  # type: array.array
+		encodedTexts = [ localizationStrings[key].encode("utf-8") for key in keys ]  # type: typing.List[bytes]
+
+		offsets = array.array("I", (0,))  # type: array.array
+		offsets.extend(itertools.accumulate(len(encodedText) for encodedText in encodedTexts))
+
+		return cls(keys, offsets, b"".join(encodedTexts))
+
+	@classmethod
+	def Merge (cls, tables: typing.Sequence[CompactStringTable]) -> CompactStringTable:
+		"""
+		Combine these tables into a new table, later tables replace the strings of earlier tables with the same key. Strings are copied between the
+		tables' blobs as bytes and never decoded, so merging tables read from memory mapped files only pages in their text once.
+		"""
+
+		keyLocations = dict()  # type: typing.Dict[int, typing.Tuple[int, int]]
+
+		for tableIndex, table in enumerate(tables):  # type: int, CompactStringTable
+			if not isinstance(table, CompactStringTable):
+				raise Exceptions.IncorrectTypeException(table, "tables[%d]" % tableIndex, (CompactStringTable,))
+
+			keyLocations.update(zip(table._keys, zip(itertools.repeat(tableIndex), range(len(table._keys)))))
+
+		keys = array.array("I", sorted(keyLocations))  # type: array.array
+		textSlices = list()  # type: typing.List[typing.Union[bytes, memoryview]]
+
+		for key in keys:  # type: int
+			tableIndex, keyIndex = keyLocations[key]
+			table = tables[tableIndex]
+			textSlices.append(table._blob[table._offsets[keyIndex]:table._offsets[keyIndex + 1]])
+
+		offsets = array.array("I", (0,))  # type: array.array
+		offsets.extend(itertools.accumulate(len(textSlice) for textSlice in textSlices))
+
+		return cls(keys, offsets, b"".join(textSlices))
+
+	@classmethod
+	def FromBytes (cls, tableBytes: typing.Union[bytes, bytearray, memoryview, mmap.mmap], memoryMap: typing.Optional[mmap.mmap] = None) -> CompactStringTable:
+		"""
+		Read a table from its file bytes. When the file's byte order matches this machine's, the table reads directly from these bytes without
+		copying them.
+		"""
+
+		tableView = memoryview(tableBytes)  # type: memoryview
+
+		if len(tableView) < cls._headerLength or bytes(tableView[0:4]) != cls.FileIdentifier:
+			raise ValueError("Invalid string table file identifier, expected '%s'." % cls.FileIdentifier.decode("ascii"))
+
+		byteOrder = sys.byteorder  # type: str
+
+		if int.from_bytes(tableView[6:8], byteOrder) != cls._byteOrderMark:
+			byteOrder = "big" if byteOrder == "little" else "little"
+			swapBytes = True  # type: bool
+		else:
+			swapBytes = False  # type: bool
+
+		version = int.from_bytes(tableView[4:6], byteOrder)  # type: int
+
+		if version != cls.FileVersion:
+			raise ValueError("Invalid string table file version, expected '%s', got '%s'." % (cls.FileVersion, version))
+
+		entryCount = int.from_bytes(tableView[8:12], byteOrder)  # type: int
+		blobLength = int.from_bytes(tableView[12:16], byteOrder)  # type: int
+
+		keysStart = cls._headerLength  # type: int
+		offsetsStart = keysStart + entryCount * 4  # type: int
+		blobStart = offsetsStart + (entryCount + 1) * 4  # type: int
+
+		if len(tableView) != blobStart + blobLength:
+			raise ValueError("String table file length does not match the length its header indicates.")
+
+		if swapBytes:
+			keys = array.array("I", bytes(tableView[keysStart:offsetsStart]))  # type: typing.Sequence[int]
+			keys.byteswap()
+			offsets = array.array("I", bytes(tableView[offsetsStart:blobStart]))  # type: typing.Sequence[int]
+			offsets.byteswap()
+		else:
+			keys = tableView[keysStart:offsetsStart].cast("I")  # type: typing.Sequence[int]
+			offsets = tableView[offsetsStart:blobStart].cast("I")  # type: typing.Sequence[int]
+
+		return cls(keys, offsets, tableView[blobStart:], memoryMap = memoryMap)
+
+	@classmethod
+	def Open (cls, filePath: str, useMemoryMap: bool = False) -> CompactStringTable:
+		"""
+		Read a table from a file.
+		:param useMemoryMap: If true, the file will be memory mapped rather than read, the table's text will then only be paged in as it is looked up.
+		Call the table's close method once it is no longer needed, the file cannot be replaced on some systems while it is mapped.
+		:type useMemoryMap: bool
+		"""
+
+		if not isinstance(filePath, str):
+			raise Exceptions.IncorrectTypeException(filePath, "filePath", (str,))
+
+		with open(filePath, "rb") as tableFile:
+			if not useMemoryMap:
+				return cls.FromBytes(tableFile.read())
+
+			tableMemoryMap = mmap.mmap(tableFile.fileno(), 0, access = mmap.ACCESS_READ)  # type: mmap.mmap
+
+		return cls.FromBytes(tableMemoryMap, memoryMap = tableMemoryMap)
+
+	def _GetKeyIndex (self, key: int) -> typing.Optional[int]:
+		keyIndex = bisect.bisect_left(self._keys, key)  # type: int
+
+		if keyIndex == len(self._keys) or self._keys[keyIndex] != key:
+			return None
+
+		return keyIndex
+
+	def _GetText (self, keyIndex: int) -> str:
+		return str(self._blob[self._offsets[keyIndex]:self._offsets[keyIndex + 1]], "utf-8")
@@ -0,0 +1,3 @@
+from NeonOcean.S4.Refer.Diagnostics import ImportTiming as _ImportTiming
+
+_ImportTiming.Install()